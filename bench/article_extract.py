@@ -0,0 +1,59 @@
+"""Compares the legacy whole-page `get_text` scrape with the article extractor.
+
+For each HTML page reports parse time, characters / estimated tokens sent to
+the LLM, and whether a title and published date were found:
+
+    python bench/article_extract.py [--repeat 20] [page.html ...]
+
+Defaults to the fixtures in bench/fixtures/. Those are synthetic: a news article,
+a portal page and a blog post with typical chrome (nav, share bars, comments,
+related links), padded with filler text. Pass saved real pages for numbers that
+reflect actual sites.
+"""
+import argparse
+import glob
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from daylight.articles import article_to_source, extract_article  # noqa: E402
+from daylight.extraction import MAX_SOURCE_CHARS, estimate_tokens  # noqa: E402
+
+FIXTURES = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures", "*.html")
+
+
+def legacy_scrape(body):
+    """The previous fetch_content_from_url body: html.parser + get_text on everything."""
+    from bs4 import BeautifulSoup
+    return BeautifulSoup(body, 'html.parser').get_text(separator=' ')[:MAX_SOURCE_CHARS]
+
+
+def timed(fn, body, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        result = fn(body)
+    return result, (time.perf_counter() - start) * 1000 / repeat
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("pages", nargs="*")
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    print(f"{'page':<22}{'KB':>6}  {'legacy ms':>9} {'tokens':>7}  {'new ms':>7} {'tokens':>7}  title / published")
+    for path in args.pages or sorted(glob.glob(FIXTURES)):
+        with open(path, "rb") as f:
+            body = f.read()
+        old_text, old_ms = timed(legacy_scrape, body, args.repeat)
+        article, new_ms = timed(extract_article, body, args.repeat)
+        new_text = article_to_source(article)
+        found = f"{'✓' if article['title'] else '✗'} / {article['published'] or '✗'}"
+        print(f"{os.path.basename(path):<22}{len(body) // 1024:>6}  {old_ms:>9.1f} {estimate_tokens(old_text):>7}"
+              f"  {new_ms:>7.1f} {estimate_tokens(new_text):>7}  {found}")
+
+
+if __name__ == "__main__":
+    main()
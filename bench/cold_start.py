@@ -0,0 +1,65 @@
+"""Measures cold-start and per-rerun time of each page with Streamlit's AppTest.
+
+Each page runs in a fresh interpreter, so the first run pays for every import and
+client construction; the following runs are plain reruns. Supabase points at a
+closed local port, so queries fail fast and the numbers show page overhead rather
+than network time.
+
+    python bench/cold_start.py [--root PATH] [--reruns 10]
+
+Pass --root to measure another checkout (e.g. a `git worktree` of an older commit).
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+PAGES = ["home.py", "pages/1_The_Vault.py", "pages/2_Investigations.py", "pages/3_Futures_Desk.py"]
+BENCH_ENV = {"SUPABASE_URL": "http://127.0.0.1:9", "SUPABASE_KEY": "bench-key", "OPENAI_API_KEY": "bench-key"}
+
+
+def run_page(root, page, reruns):
+    """Runs inside the child interpreter: returns cold and rerun timings in ms."""
+    sys.path.insert(0, root)
+    os.chdir(root)
+    from streamlit.testing.v1 import AppTest
+
+    at = AppTest.from_file(os.path.join(root, page), default_timeout=60)
+    started = time.perf_counter()
+    at.run()
+    cold = (time.perf_counter() - started) * 1000
+    samples = []
+    for _ in range(reruns):
+        started = time.perf_counter()
+        at.run()
+        samples.append((time.perf_counter() - started) * 1000)
+    return {"page": page, "cold_ms": cold, "rerun_ms": statistics.median(samples), "errors": len(at.exception)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--root", default=REPO_ROOT)
+    parser.add_argument("--reruns", type=int, default=10)
+    parser.add_argument("--child", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    root = os.path.abspath(args.root)
+
+    if args.child:
+        print(json.dumps(run_page(root, args.child, args.reruns)))
+        return
+
+    env = dict(os.environ, **BENCH_ENV)
+    print(f"{'page':<28}{'cold ms':>10}{'rerun ms':>10}{'errors':>8}")
+    for page in PAGES:
+        out = subprocess.run([sys.executable, __file__, "--root", root, "--reruns", str(args.reruns), "--child", page],
+                             env=env, capture_output=True, text=True, check=True)
+        result = json.loads(out.stdout.strip().splitlines()[-1])
+        print(f"{page:<28}{result['cold_ms']:>10.0f}{result['rerun_ms']:>10.1f}{result['errors']:>8}")
+
+
+if __name__ == "__main__":
+    main()
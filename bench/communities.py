@@ -0,0 +1,86 @@
+"""Sanity checks and timings for the label-propagation communities in daylight/analytics.py.
+
+- two disjoint triangles (and an isolated node) must come back as 3 communities;
+- a random graph (2,000 entities, 10,000 relationships, no structure) must not stay
+  mostly singletons;
+- a planted partition (8 groups, 1% of relationships across groups) must recover
+  the groups: the 8 largest communities must hold 85% of the entities, with
+  purity against the planted labels above 0.9.
+
+Prints PASS / FAIL per check and exits non-zero if any fails.
+
+    python bench/communities.py [--seeds 3]
+"""
+import argparse
+import os
+import sys
+import time
+from collections import Counter
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from daylight.analytics import label_propagation  # noqa: E402
+
+
+def symmetric(edges, n):
+    import numpy as np
+    from scipy import sparse
+
+    rows = [a for a, _ in edges] + [b for _, b in edges]
+    cols = [b for _, b in edges] + [a for a, _ in edges]
+    return sparse.csr_matrix((np.ones(len(rows)), (rows, cols)), shape=(n, n))
+
+
+def random_edges(rng, n, m, groups=None, across=1.0):
+    """m distinct undirected edges; with `groups`, only a fraction `across` of cross-group draws is kept."""
+    edges = set()
+    while len(edges) < m:
+        a, b = (int(v) for v in rng.integers(0, n, 2))
+        if a == b or (groups is not None and groups[a] != groups[b] and rng.random() >= across):
+            continue
+        edges.add((min(a, b), max(a, b)))
+    return list(edges)
+
+
+def main():
+    import numpy as np
+
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--seeds", type=int, default=3)
+    args = parser.parse_args()
+    failures = 0
+
+    def report(name, ok, detail):
+        nonlocal failures
+        failures += not ok
+        print(f"  {name:<28}{'PASS' if ok else 'FAIL'}  {detail}")
+
+    labels = label_propagation(symmetric([(0, 1), (1, 2), (0, 2), (3, 4), (4, 5), (3, 5)], 7))
+    report("two_triangles", labels[0] == labels[1] == labels[2] != labels[3] == labels[4] == labels[5] != labels[6],
+           f"labels {labels.tolist()}")
+
+    for seed in range(args.seeds):
+        rng = np.random.default_rng(seed)
+        A = symmetric(random_edges(rng, 2000, 10_000), 2000)
+        started = time.perf_counter()
+        labels = label_propagation(A)
+        ms = (time.perf_counter() - started) * 1000
+        sizes = np.bincount(labels)
+        singletons = int((sizes == 1).sum())
+        report(f"random_graph seed={seed}", singletons < 200, f"{len(sizes)} communities, {singletons} singletons, {ms:.0f} ms")
+
+        groups = rng.integers(0, 8, 2000)
+        A = symmetric(random_edges(rng, 2000, 10_000, groups, across=0.01), 2000)
+        started = time.perf_counter()
+        labels = label_propagation(A)
+        ms = (time.perf_counter() - started) * 1000
+        purity = sum(Counter(groups[labels == c]).most_common(1)[0][1] for c in range(labels.max() + 1)) / 2000
+        top8 = np.sort(np.bincount(labels))[-8:].sum() / 2000
+        report(f"planted_partition seed={seed}", purity > 0.9 and top8 > 0.85,
+               f"{labels.max() + 1} communities, largest 8 hold {top8:.0%}, purity {purity:.3f}, {ms:.0f} ms")
+
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
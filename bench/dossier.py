@@ -0,0 +1,102 @@
+"""Compares the legacy FPDF dossier with the streaming, cached one.
+
+Builds a synthetic ledger (30% entities, 50% relationships, 10% hypotheses, 10%
+leads) and reports render time, peak traced memory and size, then the time to
+serve the same case again from the dossier cache:
+
+    python bench/dossier.py [--rows 20000]
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("DAYLIGHT_CACHE_DIR", tempfile.mkdtemp(prefix="daylight-bench-"))
+
+from daylight import dossier  # noqa: E402
+from daylight.ledger import ledger_version  # noqa: E402
+
+CASE = {"id": 1, "title": "Bench", "status": "Active", "description": "Map the network behind the shipments. " * 20}
+KEY_PLAYERS = [{"name": f"Person {i}", "type": "Person", "pagerank": 0.1 / (i + 1), "degree": 40 - i, "community": i % 3} for i in range(10)]
+
+
+def make_ledger(rows):
+    random.seed(0)
+    items = []
+    for i in range(rows):
+        r = random.random()
+        if r < .3: row = {"type": "Entity: Person", "content": f"Person {i}"}
+        elif r < .8: row = {"type": "Relationship", "content": f"Person {i}|funds|Org {i}"}
+        elif r < .9: row = {"type": "Hypothesis", "content": "Who benefits? " + "lorem ipsum dolor sit amet " * 10}
+        else: row = {"type": "Lead", "content": f"[📂 Archive: Thing {i}](https://en.wikipedia.org/wiki/Thing_{i})"}
+        items.append({"id": i + 1, "investigation_id": 1, **row})
+    return items
+
+
+def legacy_dossier(case_data, intel_data):
+    """The pre-streaming create_case_dossier: five filtering passes, whole document in FPDF."""
+    from fpdf import FPDF
+    pdf = FPDF()
+    pdf.add_page()
+
+    def sanitize(text):
+        return text.encode('latin-1', 'replace').decode('latin-1')
+
+    pdf.set_font("Arial", "B", 20)
+    pdf.cell(0, 10, sanitize(f"OPERATION: {case_data['title'].upper()}"), ln=True, align="C")
+    pdf.set_font("Arial", "I", 10)
+    pdf.cell(0, 10, sanitize(f"Status: {case_data['status']} | Date: {time.strftime('%Y-%m-%d')}"), ln=True, align="C")
+    pdf.line(10, 30, 200, 30)
+    pdf.ln(10)
+    pdf.set_font("Arial", "B", 12)
+    pdf.cell(0, 10, "1. MISSION OBJECTIVE", ln=True)
+    pdf.set_font("Arial", "", 11)
+    pdf.multi_cell(0, 7, sanitize(case_data['description']))
+    pdf.set_font("Arial", "", 10)
+    for ent in [i for i in intel_data if "Entity" in i['type']]:
+        pdf.cell(0, 7, sanitize(f"- {ent['content']} ({ent['type'].replace('Entity: ', '')})"), ln=True)
+    for link in [i for i in intel_data if "Relationship" in i['type']]:
+        parts = link['content'].split('|')
+        pdf.cell(0, 7, sanitize(f"- {parts[0]} -> {parts[1]} -> {parts[2]}"), ln=True)
+    for h in [i for i in intel_data if "Hypothesis" in i['type']]:
+        pdf.multi_cell(0, 7, sanitize(f"* {h['content']}"))
+    for l in [i for i in intel_data if "Lead" in i['type']]:
+        pdf.multi_cell(0, 6, sanitize(f"- {l['content']}"))
+    return pdf.output(dest="S").encode("latin-1")
+
+
+def measure(fn):
+    """Times one untraced run, then repeats it under tracemalloc for the memory peak."""
+    started = time.perf_counter()
+    result = fn()
+    elapsed = (time.perf_counter() - started) * 1000
+    tracemalloc.start()
+    fn()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return result, elapsed, peak
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=20000)
+    args = parser.parse_args()
+    items = make_ledger(args.rows)
+    version = ledger_version(items)
+
+    legacy, legacy_ms, legacy_peak = measure(lambda: legacy_dossier(CASE, items))
+    path, new_ms, new_peak = measure(lambda: dossier.build_dossier(CASE, items, version, KEY_PLAYERS))
+    _, cached_ms, _ = measure(lambda: dossier.cached_dossier(CASE, version))
+
+    print(f"rows={args.rows}")
+    print(f"legacy FPDF   {legacy_ms:8.0f} ms  peak {legacy_peak / 1e6:6.1f} MB  {len(legacy) // 1024} KB")
+    print(f"streaming     {new_ms:8.0f} ms  peak {new_peak / 1e6:6.1f} MB  {os.path.getsize(path) // 1024} KB")
+    print(f"cached        {cached_ms:8.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,151 @@
+"""Concurrency check for the Futures Desk escrow functions against a real Postgres.
+
+Creates throwaway `analyst_scores` / `predictions` tables in a scratch schema,
+installs sql/006_futures_escrow.sql there and hammers it from many threads:
+
+- bets: one analyst with 1,000 points places many bets at once; exactly
+  floor(1000 / wager) may succeed and the balance must never go negative;
+- resolutions: every open bet is resolved as "won" by several threads at once;
+  each must pay out exactly once.
+
+The same bet storm is replayed through the old read-modify-write path (read the
+score, write score - wager, insert) for comparison. Each escrow action is one
+statement, i.e. one round trip. Exits non-zero if an invariant is broken.
+
+    python bench/escrow_concurrency.py --dsn postgresql://localhost/postgres [--threads 32]
+
+The DSN defaults to $DATABASE_URL. Needs psycopg (pip install "psycopg[binary]").
+"""
+import argparse
+import json
+import os
+import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SCHEMA = "escrow_bench"
+START = 1000
+TABLES = """
+create table analyst_scores (id bigint generated by default as identity primary key,
+                             user_name text not null, score integer not null);
+create table predictions (id bigint generated by default as identity primary key,
+                          created_at timestamptz not null default now(), user_name text, claim text,
+                          deadline date, confidence integer, wager integer, status text, outcome text);
+"""
+
+
+def connect(dsn):
+    import psycopg
+    conn = psycopg.connect(dsn, autocommit=True)
+    conn.execute(f"set search_path to {SCHEMA}")
+    return conn
+
+
+def setup(dsn):
+    import psycopg
+    with psycopg.connect(dsn, autocommit=True) as conn:
+        conn.execute(f"drop schema if exists {SCHEMA} cascade")
+        conn.execute(f"create schema {SCHEMA}")
+        conn.execute(f"set search_path to {SCHEMA}")
+        conn.execute(TABLES)
+        with open(os.path.join(REPO_ROOT, "sql", "006_futures_escrow.sql")) as f:
+            conn.execute(f.read())
+
+
+def reset(conn):
+    conn.execute("truncate analyst_scores, predictions")
+    conn.execute("insert into analyst_scores (user_name, score) values ('analyst', %s)", (START,))
+
+
+def storm(dsn, threads, attempts, action):
+    """Runs action(conn, i) for i in range(attempts) on `threads` connections started together."""
+    threads = min(threads, attempts)
+    local = threading.local()
+    barrier = threading.Barrier(threads)
+    conns = []
+
+    def conn():
+        if not hasattr(local, "conn"):
+            local.conn = connect(dsn)
+            conns.append(local.conn)
+            barrier.wait()
+        return local.conn
+
+    with ThreadPoolExecutor(threads) as pool:
+        results = list(pool.map(lambda i: action(conn(), i), range(attempts)))
+    for c in conns:
+        c.close()
+    return results
+
+
+def escrow_bet(conn, i, wager):
+    row = conn.execute("select place_prediction('analyst', %s, current_date + 7, 50, %s)", (f"claim {i}", wager)).fetchone()
+    return row[0]["ok"]
+
+
+def legacy_bet(conn, i, wager):
+    # The pre-escrow page: read, check, write back, insert (three round trips).
+    score = conn.execute("select score from analyst_scores where user_name = 'analyst'").fetchone()[0]
+    if wager > score:
+        return False
+    conn.execute("update analyst_scores set score = %s where user_name = 'analyst'", (score - wager,))
+    conn.execute("insert into predictions (user_name, claim, deadline, confidence, wager, status) "
+                 "values ('analyst', %s, current_date + 7, 50, %s, 'Open')", (f"claim {i}", wager))
+    return True
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--dsn", default=os.environ.get("DATABASE_URL"))
+    parser.add_argument("--threads", type=int, default=32)
+    parser.add_argument("--bets", type=int, default=200)
+    parser.add_argument("--wager", type=int, default=30)
+    parser.add_argument("--resolvers", type=int, default=4, help="threads resolving each bet at once")
+    args = parser.parse_args()
+    if not args.dsn:
+        parser.error("pass --dsn or set DATABASE_URL")
+
+    setup(args.dsn)
+    admin = connect(args.dsn)
+    expected_bets = START // args.wager
+    report, failures = {"threads": args.threads, "bets_attempted": args.bets, "wager": args.wager}, []
+
+    # 1. Concurrent bets through the escrow function.
+    reset(admin)
+    placed = sum(storm(args.dsn, args.threads, args.bets, lambda c, i: escrow_bet(c, i, args.wager)))
+    score = admin.execute("select score from analyst_scores where user_name = 'analyst'").fetchone()[0]
+    open_bets = admin.execute("select count(*) from predictions where status = 'Open'").fetchone()[0]
+    report["escrow"] = {"accepted": placed, "expected": expected_bets, "final_score": score,
+                        "predictions": open_bets, "round_trips_per_bet": 1}
+    if placed != expected_bets or open_bets != placed or score != START - placed * args.wager or score < 0:
+        failures.append("escrow bets")
+
+    # 2. Every open bet resolved as won by several threads at once.
+    ids = [r[0] for r in admin.execute("select id from predictions where status = 'Open'").fetchall()]
+    paid = storm(args.dsn, args.threads, len(ids) * args.resolvers, lambda c, i: c.execute(
+        "select resolve_prediction(%s, true)", (ids[i % len(ids)],)).fetchone()[0]["ok"])
+    final = admin.execute("select score from analyst_scores where user_name = 'analyst'").fetchone()[0]
+    expected_final = START - placed * args.wager + placed * args.wager * 2
+    report["resolve"] = {"calls": len(paid), "payouts": sum(paid), "expected_payouts": len(ids),
+                         "final_score": final, "expected_score": expected_final, "round_trips_per_resolution": 1}
+    if sum(paid) != len(ids) or final != expected_final:
+        failures.append("escrow resolutions")
+
+    # 3. The same bet storm through the old read-modify-write path, for comparison.
+    reset(admin)
+    placed = sum(storm(args.dsn, args.threads, args.bets, lambda c, i: legacy_bet(c, i, args.wager)))
+    score = admin.execute("select score from analyst_scores where user_name = 'analyst'").fetchone()[0]
+    report["legacy"] = {"accepted": placed, "expected": expected_bets, "final_score": score,
+                        "points_unaccounted": START - placed * args.wager - score, "round_trips_per_bet": 3}
+
+    admin.execute(f"drop schema {SCHEMA} cascade")
+    admin.close()
+    report["ok"] = not failures
+    print(json.dumps(report, indent=2))
+    if failures:
+        sys.exit(f"invariants broken: {', '.join(failures)}")
+
+
+if __name__ == "__main__":
+    main()
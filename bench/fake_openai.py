@@ -0,0 +1,117 @@
+"""Deterministic stand-in for the OpenAI chat completions endpoint.
+
+Serves `POST /v1/chat/completions` on a local port. Answers depend only on the
+request, so runs are repeatable:
+
+- extraction prompts (asking for "entities") get the capitalised names found in
+  the input as entities (or, failing that, its most frequent long words), with
+  consecutive names linked;
+- hypothesis prompts get three fixed hypotheses;
+- anything else gets a short Markdown brief quoting the input's first lines.
+
+`GET /stats` returns the number of completions served. Point the SDK at it with
+OPENAI_BASE_URL=http://127.0.0.1:<port>/v1. Use `start()` in-process, or run
+`python bench/fake_openai.py --port 8765` on its own.
+"""
+import argparse
+import hashlib
+import json
+import re
+import threading
+import time
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+TYPES = ["Person", "Organization", "Event"]
+LABELS = ["funds", "meets", "owns", "advises"]
+_NAME = re.compile(r"\b([A-Z][a-z]+(?: [A-Z][a-z]+)+)\b")
+_WORD = re.compile(r"\b[a-z]{6,}\b")
+MAX_ENTITIES = 12
+
+
+def answer(system_prompt, user_content):
+    """The completion text for one system + user prompt."""
+    if '"entities"' in system_prompt:
+        names = list(dict.fromkeys(_NAME.findall(user_content)))[:MAX_ENTITIES]
+        if not names:
+            counts = Counter(_WORD.findall(user_content.lower()))
+            names = [word.title() for word, _ in sorted(counts.items(), key=lambda kv: (-kv[1], kv[0]))[:MAX_ENTITIES]]
+        pick = lambda name, options: options[int(hashlib.md5(name.encode()).hexdigest(), 16) % len(options)]
+        return json.dumps({
+            "entities": [{"name": name, "type": pick(name, TYPES)} for name in names],
+            "relationships": [{"source": a, "target": b, "label": pick(a + b, LABELS)} for a, b in zip(names, names[1:])],
+        })
+    if "hypotheses" in system_prompt:
+        return json.dumps({"hypotheses": ["The largest funder gains leverage over the outcome.",
+                                          "A shell company hides the real beneficiary.",
+                                          "The timing points to a coordinated campaign."]})
+    lines = [line.strip() for line in user_content.splitlines() if line.strip()][:3]
+    return "### Briefing\n" + "\n".join(f"* {line[:120]}" for line in lines)
+
+
+class FakeOpenAI(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address=("127.0.0.1", 0), latency_s=0.0):
+        super().__init__(address, _Handler)
+        self.latency_s = latency_s
+        self.completions = 0
+        self.lock = threading.Lock()
+
+    @property
+    def base_url(self):
+        return f"http://{self.server_address[0]}:{self.server_address[1]}/v1"
+
+
+class _Handler(BaseHTTPRequestHandler):
+    def log_message(self, *args):
+        pass
+
+    def _json(self, status, payload):
+        body = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        if self.path.rstrip("/").endswith("/stats"):
+            return self._json(200, {"completions": self.server.completions})
+        self._json(404, {"error": {"message": "not found"}})
+
+    def do_POST(self):
+        if not self.path.rstrip("/").endswith("/chat/completions"):
+            return self._json(404, {"error": {"message": "not found"}})
+        request = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+        messages = request.get("messages", [])
+        system = next((m["content"] for m in messages if m["role"] == "system"), "")
+        user = next((m["content"] for m in messages if m["role"] == "user"), "")
+        if self.server.latency_s:
+            time.sleep(self.server.latency_s)
+        content = answer(system, user)
+        with self.server.lock:
+            self.server.completions += 1
+        self._json(200, {
+            "id": "chatcmpl-bench", "object": "chat.completion", "created": 0, "model": request.get("model", "bench"),
+            "choices": [{"index": 0, "message": {"role": "assistant", "content": content}, "finish_reason": "stop"}],
+            "usage": {"prompt_tokens": len(system + user) // 4, "completion_tokens": len(content) // 4,
+                      "total_tokens": (len(system + user) + len(content)) // 4},
+        })
+
+
+def start(latency_s=0.0, port=0):
+    """Starts the server on a daemon thread and returns it (see `.base_url`)."""
+    server = FakeOpenAI(("127.0.0.1", port), latency_s)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency-ms", type=float, default=0)
+    args = parser.parse_args()
+    server = FakeOpenAI(("127.0.0.1", args.port), args.latency_ms / 1000)
+    print(f"OPENAI_BASE_URL={server.base_url}")
+    server.serve_forever()
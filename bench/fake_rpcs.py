@@ -0,0 +1,143 @@
+"""Python versions of the sql/ functions, for `FakeSupabase(rpcs=RPCS)`.
+
+Each takes the fake database plus the RPC's named parameters and returns what
+the Postgres function returns. They follow the SQL closely enough for the pages
+to behave normally; ranking and locking are simplified.
+"""
+import re
+from datetime import date, datetime, timedelta, timezone
+
+
+def _rows(db, table):
+    return db.tables.setdefault(table, [])
+
+
+def _terms(query):
+    terms, excluded = [], []
+    for negate, phrase, word in re.findall(r'(-?)"([^"]*)"|(\S+)', query.lower()):
+        if word == "or":
+            continue
+        if word.startswith("-"):
+            negate, word = "-", word[1:]
+        if phrase or word:
+            (excluded if negate else terms).append(phrase or word)
+    return terms, excluded
+
+
+def search_archive(db, query, max_results=25, region_filter=None):
+    terms, excluded = _terms(query)
+    hits = []
+    for row in _rows(db, "news_archive"):
+        if region_filter and row.get("region") != region_filter:
+            continue
+        title, desc = (row.get("title") or "").lower(), (row.get("description") or "").lower()
+        if any(t in title or t in desc for t in excluded):
+            continue
+        rank = sum(2 * title.count(t) + desc.count(t) for t in terms)
+        if rank:
+            hits.append({**row, "rank": float(rank)})
+    hits.sort(key=lambda r: -r["rank"])
+    return hits[:max_results]
+
+
+def claim_evidence(db, p_limit=10, p_stale_after="15 minutes"):
+    now = datetime.now(timezone.utc)
+    stale = (now - timedelta(seconds=int(str(p_stale_after).split()[0]))).isoformat()   # "<n> seconds"
+    due = sorted((r for r in _rows(db, "evidence_locker") if r.get("status") == "pending"
+                  or (r.get("status") == "processing" and (r.get("claimed_at") or "") < stale)),
+                 key=lambda r: (r["created_at"], r["id"]))[:p_limit]
+    for row in due:
+        row.update(status="processing", claimed_at=now.isoformat())
+    return [dict(r) for r in due]
+
+
+def search_evidence(db, query, max_results=20):
+    terms, excluded = _terms(query)
+    hits = []
+    for row in _rows(db, "evidence_locker"):
+        head = f"{row.get('filename') or ''} {row.get('description') or ''}".lower()
+        meta = " ".join(str(v) for v in (row.get("metadata") or {}).values()).lower()
+        text = (row.get("extracted_text") or "").lower()
+        if any(t in head or t in meta or t in text for t in excluded):
+            continue
+        rank = sum(4 * head.count(t) + 2 * meta.count(t) + text.count(t) for t in terms)
+        if rank:
+            at = min((text.find(t) for t in terms if t in text), default=-1)
+            snippet = (row.get("extracted_text") or "")[max(at - 60, 0):at + 120] if at >= 0 else ""
+            hits.append({**{k: v for k, v in row.items() if k not in ("extracted_text", "content_hash")},
+                         "rank": float(rank), "snippet": snippet})
+    hits.sort(key=lambda r: -r["rank"])
+    return hits[:max_results]
+
+
+def dashboard_stats(db, recent_limit=3, case_limit=24):
+    newest = lambda rows: sorted(rows, key=lambda r: (r.get("created_at") or "", r.get("id", 0)), reverse=True)
+    active = [c for c in _rows(db, "investigations") if c.get("status") == "Active"]
+    return {
+        "active_cases": len(active),
+        "signals": len(_rows(db, "news_archive")),
+        "evidence": len(_rows(db, "evidence_locker")),
+        "flash": [{k: r.get(k) for k in ("source", "title", "created_at")} for r in newest(_rows(db, "news_archive"))[:recent_limit]],
+        "cases": [{k: c.get(k) for k in ("id", "title", "status")} for c in newest(active)[:case_limit]],
+    }
+
+
+def _score_row(db, user, starting=None):
+    row = next((r for r in _rows(db, "analyst_scores") if r["user_name"] == user), None)
+    if row is None and starting is not None:
+        row = db._new_row("analyst_scores", {"user_name": user, "score": starting})
+        _rows(db, "analyst_scores").append(row)
+    return row
+
+
+def place_prediction(db, p_user, p_claim, p_deadline, p_confidence, p_wager, p_starting_score=1000):
+    row = _score_row(db, p_user, p_starting_score)
+    if row["score"] < p_wager:
+        return {"ok": False, "score": row["score"], "prediction_id": None}
+    row["score"] -= p_wager
+    prediction = db._new_row("predictions", {"user_name": p_user, "claim": p_claim, "deadline": str(p_deadline),
+                                             "confidence": p_confidence, "wager": p_wager, "status": "Open", "outcome": None})
+    _rows(db, "predictions").append(prediction)
+    return {"ok": True, "score": row["score"], "prediction_id": prediction["id"]}
+
+
+def resolve_predictions(db, p_ids, p_won):
+    by_id = {r["id"]: r for r in _rows(db, "predictions")}
+    resolved = won = paid = 0
+    analysts = set()
+    for pred_id, verdict in dict(zip(p_ids, p_won)).items():
+        pred = by_id.get(pred_id)
+        if pred is None or pred["status"] != "Open":
+            continue
+        pred.update(status="Resolved", outcome="Correct" if verdict else "Incorrect")
+        resolved += 1
+        if verdict:
+            won += 1
+            paid += pred["wager"] * 2
+            row = _score_row(db, pred["user_name"])
+            if row is not None:
+                row["score"] += pred["wager"] * 2
+                analysts.add(pred["user_name"])
+    return {"resolved": resolved, "won": won, "paid_out": paid, "analysts_paid": len(analysts)}
+
+
+def resolve_prediction(db, p_id, p_won):
+    pred = next((r for r in _rows(db, "predictions") if r["id"] == p_id), None)
+    result = resolve_predictions(db, [p_id], [p_won])
+    if not result["resolved"]:
+        return {"ok": False, "user_name": None, "payout": 0, "score": None}
+    row = _score_row(db, pred["user_name"])
+    return {"ok": True, "user_name": pred["user_name"], "payout": result["paid_out"], "score": row and row["score"]}
+
+
+def resolve_expired_predictions(db, p_as_of=None, p_grace_days=7, p_limit=1000):
+    cutoff = str((date.fromisoformat(p_as_of) if p_as_of else date.today()) - timedelta(days=p_grace_days))
+    due = sorted((r for r in _rows(db, "predictions") if r["status"] == "Open" and str(r["deadline"]) < cutoff),
+                 key=lambda r: (str(r["deadline"]), r["id"]))[:p_limit]
+    for pred in due:
+        pred.update(status="Resolved", outcome="Expired")
+    return {"expired": len(due)}
+
+
+RPCS = {fn.__name__: fn for fn in (search_archive, dashboard_stats, place_prediction, resolve_prediction,
+                                   resolve_predictions, resolve_expired_predictions, claim_evidence, search_evidence)}
@@ -0,0 +1,292 @@
+"""In-memory stand-in for the Supabase/PostgREST client used by the benchmarks.
+
+Supports the query-builder subset the pages use (select with projection and
+count, eq/neq/gt/gte/lt/lte/in_/ilike/or_ filters, order, limit, range, insert,
+upsert, update, delete, rpc) and counts every `execute()` as one round trip.
+`storage.from_(bucket)` keeps uploaded objects in memory (upload, download,
+get_public_url).
+
+Install it before a page runs with `install(FakeSupabase(tables))`; it replaces
+`supabase.create_client`, so both old and new checkouts pick it up.
+"""
+import copy
+import itertools
+import re
+import threading
+from datetime import datetime, timezone
+
+
+class Response:
+    def __init__(self, data, count=None):
+        self.data = data
+        self.count = count
+
+
+def _coerce(value, sample):
+    """Converts a filter string to the type of the stored value it is compared with."""
+    if isinstance(value, str) and sample is not None and not isinstance(sample, str):
+        if isinstance(sample, bool):
+            return value.lower() == "true"
+        try:
+            return type(sample)(value)
+        except (TypeError, ValueError):
+            return value
+    return value
+
+
+def _split_top(expr):
+    """Splits a PostgREST logic string on commas that are not inside parentheses or quotes."""
+    parts, depth, quoted, current = [], 0, False, ""
+    for ch in expr:
+        if ch == '"':
+            quoted = not quoted
+        elif not quoted and ch == "(":
+            depth += 1
+        elif not quoted and ch == ")":
+            depth -= 1
+        if ch == "," and depth == 0 and not quoted:
+            parts.append(current)
+            current = ""
+        else:
+            current += ch
+    parts.append(current)
+    return parts
+
+
+OPS = {
+    "eq": lambda a, b: a == b,
+    "neq": lambda a, b: a != b,
+    "gt": lambda a, b: a is not None and a > b,
+    "gte": lambda a, b: a is not None and a >= b,
+    "lt": lambda a, b: a is not None and a < b,
+    "lte": lambda a, b: a is not None and a <= b,
+    "is": lambda a, b: a is None if b in (None, "null") else a == b,
+}
+
+
+def _logic_predicate(expr):
+    """Builds a row predicate from an `or=(...)` body such as `a.lt.1,and(b.eq.2,c.gt.3)`."""
+    clauses = []
+    for part in _split_top(expr):
+        if part.startswith("and(") or part.startswith("or("):
+            kind, inner = part.split("(", 1)
+            sub = _logic_predicate(inner[:-1])
+            clauses.append(sub if kind == "or" else _and_predicate(inner[:-1]))
+            continue
+        column, op, value = part.split(".", 2)
+        value = value[1:-1] if value.startswith('"') else value
+        clauses.append(lambda row, c=column, o=op, v=value: OPS[o](row.get(c), _coerce(v, row.get(c))))
+    return lambda row: any(c(row) for c in clauses)
+
+
+def _and_predicate(expr):
+    preds = [_logic_predicate(p) for p in _split_top(expr)]
+    return lambda row: all(p(row) for p in preds)
+
+
+class Query:
+    def __init__(self, db, table):
+        self.db = db
+        self.table = table
+        self.action = "select"
+        self.columns = "*"
+        self.count = None
+        self.filters = []
+        self.orders = []
+        self.bounds = None
+        self.payload = None
+        self.options = {}
+
+    # --- verbs ---
+
+    def select(self, columns="*", count=None):
+        self.columns, self.count = columns, count
+        return self
+
+    def insert(self, rows, **options):
+        self.action, self.payload, self.options = "insert", rows, options
+        return self
+
+    def upsert(self, rows, on_conflict="id", ignore_duplicates=False, **options):
+        self.action, self.payload = "upsert", rows
+        self.options = {"on_conflict": on_conflict, "ignore_duplicates": ignore_duplicates, **options}
+        return self
+
+    def update(self, values):
+        self.action, self.payload = "update", values
+        return self
+
+    def delete(self):
+        self.action = "delete"
+        return self
+
+    # --- filters and modifiers ---
+
+    def _filter(self, column, op, value):
+        self.filters.append(lambda row: OPS[op](row.get(column), _coerce(value, row.get(column))))
+        return self
+
+    def eq(self, column, value): return self._filter(column, "eq", value)
+    def neq(self, column, value): return self._filter(column, "neq", value)
+    def gt(self, column, value): return self._filter(column, "gt", value)
+    def gte(self, column, value): return self._filter(column, "gte", value)
+    def lt(self, column, value): return self._filter(column, "lt", value)
+    def lte(self, column, value): return self._filter(column, "lte", value)
+    def is_(self, column, value): return self._filter(column, "is", value)
+
+    def in_(self, column, values):
+        values = list(values)
+        self.filters.append(lambda row: row.get(column) in values)
+        return self
+
+    def ilike(self, column, pattern):
+        regex = re.compile("^" + re.escape(pattern).replace("%", ".*").replace("_", ".") + "$", re.I | re.S)
+        self.filters.append(lambda row: row.get(column) is not None and bool(regex.match(str(row.get(column)))))
+        return self
+
+    def or_(self, expr):
+        self.filters.append(_logic_predicate(expr))
+        return self
+
+    def order(self, column, desc=False):
+        self.orders.append((column, desc))
+        return self
+
+    def limit(self, n):
+        self.bounds = (0, n - 1) if self.bounds is None else (self.bounds[0], self.bounds[0] + n - 1)
+        return self
+
+    def range(self, start, end):
+        self.bounds = (start, end)
+        return self
+
+    # --- execution ---
+
+    def _matching(self, rows):
+        return [r for r in rows if all(f(r) for f in self.filters)]
+
+    def _project(self, row):
+        if self.columns.strip() == "*":
+            return dict(row)
+        return {c.strip(): row.get(c.strip()) for c in self.columns.split(",")}
+
+    def execute(self):
+        return self.db._execute(self)
+
+
+class FakeBucket:
+    def __init__(self, db, name):
+        self.db, self.name = db, name
+
+    def upload(self, path, file, file_options=None):
+        with self.db.lock:
+            self.db.round_trips += 1
+            if path in self.db.objects.setdefault(self.name, {}) and str((file_options or {}).get("upsert")) != "true":
+                raise Exception(f"object {path} already exists")
+            self.db.objects[self.name][path] = bytes(file)
+
+    def download(self, path):
+        with self.db.lock:
+            self.db.round_trips += 1
+            return self.db.objects.get(self.name, {})[path]
+
+    def get_public_url(self, path):
+        return f"https://fake.supabase.local/storage/v1/object/public/{self.name}/{path}"
+
+
+class FakeStorage:
+    def __init__(self, db):
+        self.db = db
+
+    def from_(self, bucket):
+        return FakeBucket(self.db, bucket)
+
+
+class FakeSupabase:
+    """Thread-safe in-memory database that looks like a supabase.Client to the pages."""
+
+    def __init__(self, tables=None, unique=None, rpcs=None, defaults=None):
+        self.tables = {name: [dict(r) for r in rows] for name, rows in (tables or {}).items()}
+        self.unique = {"news_archive": ("url",), **(unique or {})}
+        self.rpcs = dict(rpcs or {})
+        self.defaults = dict(defaults or {})   # table -> column defaults for new rows
+        self.objects = {}                      # bucket -> {path: bytes}
+        self.storage = FakeStorage(self)
+        self.round_trips = 0
+        self.lock = threading.RLock()
+        self._ids = itertools.count(1 + max((r.get("id", 0) for rows in self.tables.values() for r in rows
+                                             if isinstance(r.get("id", 0), int)), default=0))
+
+    def table(self, name):
+        return Query(self, name)
+
+    def rpc(self, name, params=None):
+        db = self
+
+        class _Call:
+            def execute(self):
+                with db.lock:
+                    db.round_trips += 1
+                    return Response(db.rpcs[name](db, **(params or {})))
+        return _Call()
+
+    def _new_row(self, table, row):
+        row = {**self.defaults.get(table, {}), **row}
+        row.setdefault("id", next(self._ids))
+        row.setdefault("created_at", datetime.now(timezone.utc).isoformat())
+        return row
+
+    def _execute(self, q):
+        with self.lock:
+            self.round_trips += 1
+            rows = self.tables.setdefault(q.table, [])
+            if q.action == "select":
+                matched = q._matching(rows)
+                for column, desc in reversed(q.orders):
+                    matched.sort(key=lambda r: (r.get(column) is None, r.get(column)), reverse=desc)
+                count = len(matched) if q.count else None
+                if q.bounds:
+                    matched = matched[q.bounds[0]:q.bounds[1] + 1]
+                return Response([q._project(r) for r in copy.deepcopy(matched)], count)
+
+            if q.action in ("insert", "upsert"):
+                payload = q.payload if isinstance(q.payload, list) else [q.payload]
+                keys = tuple(k.strip() for k in q.options.get("on_conflict", "").split(",") if k.strip()) \
+                    or self.unique.get(q.table, ())
+                index = {tuple(r.get(k) for k in keys): r for r in rows} if keys else {}
+                written = []
+                for item in payload:
+                    key = tuple(item.get(k) for k in keys) if keys else None
+                    existing = index.get(key) if keys else None
+                    if existing is not None:
+                        if q.action == "insert":
+                            raise Exception(f"duplicate key value violates unique constraint on {q.table}{keys}")
+                        if q.options.get("ignore_duplicates"):
+                            continue
+                        existing.update(item)
+                        written.append(dict(existing))
+                        continue
+                    row = self._new_row(q.table, item)
+                    rows.append(row)
+                    if keys:
+                        index[key] = row
+                    written.append(dict(row))
+                return Response(written)
+
+            matched = q._matching(rows)
+            if q.action == "update":
+                for row in matched:
+                    row.update(q.payload)
+                return Response([dict(r) for r in matched])
+            if q.action == "delete":
+                ids = {id(r) for r in matched}
+                self.tables[q.table] = [r for r in rows if id(r) not in ids]
+                return Response([dict(r) for r in matched])
+            raise ValueError(q.action)
+
+
+def install(fake):
+    """Makes `supabase.create_client(...)` return `fake` for the rest of the process."""
+    import supabase
+    supabase.create_client = lambda *args, **kwargs: fake
+    return fake
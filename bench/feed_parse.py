@@ -0,0 +1,96 @@
+"""Compares the legacy whole-document feed parser with the streaming one.
+
+Reports parse time and peak traced memory per feed for synthetic RSS 2.0, RDF and
+Atom documents (and any saved feed files passed on the command line):
+
+    python bench/feed_parse.py [--items 20000] [saved_feed.xml ...]
+"""
+import argparse
+import os
+import re
+import sys
+import time
+import tracemalloc
+import xml.etree.ElementTree as ET
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from daylight.feeds import CHUNK_SIZE, parse_feed  # noqa: E402
+
+FEED = {'source': 'Bench', 'country': 'XX', 'region': 'WEST'}
+BODY = "&lt;p&gt;Lorem &lt;b&gt;ipsum&lt;/b&gt; dolor sit amet, consectetur adipiscing elit.&lt;/p&gt;" * 8
+
+
+def make_rss(n):
+    items = "".join(f"<item><title>Story {i}</title><link>https://example.com/{i}</link><description>{BODY}</description></item>" for i in range(n))
+    return f'<?xml version="1.0"?><rss version="2.0"><channel><title>Bench</title>{items}</channel></rss>'.encode()
+
+
+def make_rdf(n):
+    items = "".join(f'<item rdf:about="https://example.com/{i}"><title>Story {i}</title><link>https://example.com/{i}</link><description>{BODY}</description></item>' for i in range(n))
+    return ('<?xml version="1.0"?><rdf:RDF xmlns:rdf="http://www.w3.org/1999/02/22-rdf-syntax-ns#" xmlns="http://purl.org/rss/1.0/">'
+            f'<channel rdf:about="https://example.com"><title>Bench</title></channel>{items}</rdf:RDF>').encode()
+
+
+def make_atom(n):
+    items = "".join(f'<entry><title>Story {i}</title><link rel="alternate" href="https://example.com/{i}"/><summary type="html">{BODY}</summary></entry>' for i in range(n))
+    return f'<?xml version="1.0"?><feed xmlns="http://www.w3.org/2005/Atom"><title>Bench</title>{items}</feed>'.encode()
+
+
+def legacy_parse(content, limit=5):
+    """The pre-streaming parser: build the full tree, then keep the first `limit` items."""
+    root = ET.fromstring(content)
+    items = []
+    is_atom = 'feed' in root.tag.lower()
+    iter_items = root.findall('{http://www.w3.org/2005/Atom}entry') if is_atom else root.findall('.//item')
+    for item in iter_items[:limit]:
+        if is_atom:
+            title = item.findtext('{http://www.w3.org/2005/Atom}title')
+            desc = item.findtext('{http://www.w3.org/2005/Atom}summary')
+        else:
+            title = item.findtext('title')
+            desc = item.findtext('description')
+        clean_desc = re.sub('<[^<]+?>', '', str(desc))[:200] + "..." if desc else "No description."
+        if title:
+            items.append({'title': title, 'description': clean_desc})
+    return items
+
+
+def measure(fn):
+    tracemalloc.start()
+    started = time.perf_counter()
+    result = fn()
+    elapsed = (time.perf_counter() - started) * 1000
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, elapsed, peak
+
+
+def chunked(content):
+    for start in range(0, len(content), CHUNK_SIZE):
+        yield content[start:start + CHUNK_SIZE]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--items", type=int, default=20000, help="items per synthetic feed")
+    parser.add_argument("files", nargs="*", help="saved feed documents to include")
+    args = parser.parse_args()
+
+    docs = [("rss2", make_rss(args.items)), ("rdf", make_rdf(args.items)), ("atom", make_atom(args.items))]
+    for path in args.files:
+        with open(path, "rb") as fh:
+            docs.append((os.path.basename(path), fh.read()))
+
+    print(f"{'feed':<20}{'size':>10}  {'legacy ms':>10}{'legacy peak':>13}  {'stream ms':>10}{'stream peak':>13}{'read':>10}")
+    for name, content in docs:
+        old, old_ms, old_peak = measure(lambda: legacy_parse(content))
+        stats = {}
+        new, new_ms, new_peak = measure(lambda: parse_feed(FEED, chunked(content), stats=stats))
+        if len(old) != len(new):
+            print(f"  ! {name}: legacy found {len(old)} items, streaming found {len(new)}")
+        print(f"{name:<20}{len(content) // 1024:>8}KB  {old_ms:>10.1f}{old_peak // 1024:>11}KB  {new_ms:>10.1f}{new_peak // 1024:>11}KB{stats['bytes'] // 1024:>8}KB")
+
+
+if __name__ == "__main__":
+    main()
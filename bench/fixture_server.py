@@ -0,0 +1,93 @@
+"""Local HTTP server for RSS feeds and HTML articles used by the benchmarks.
+
+- `/feeds/<n>.xml?items=K`: a deterministic RSS 2.0 feed with K items, sent with
+  an ETag and answered with 304 when the client already has it;
+- `/articles/<file>`: a page from bench/fixtures (e.g. news_article.html).
+
+`GET /stats` returns requests served and bytes sent. Use `start()` in-process,
+or run `python bench/fixture_server.py --port 8766` on its own.
+"""
+import argparse
+import os
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+FIXTURES = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+BODY = "&lt;p&gt;Officials from Northwind Logistics met Meridian Capital over the shipments.&lt;/p&gt;" * 3
+
+
+def make_feed(feed_id, items):
+    entries = "".join(
+        f"<item><title>Feed {feed_id} story {i}: talks resume amid ceasefire pressure</title>"
+        f"<link>https://example.com/{feed_id}/{i}</link><description>{BODY}</description>"
+        f"<pubDate>Mon, 05 Jan 2026 {i % 24:02d}:00:00 GMT</pubDate></item>"
+        for i in range(items))
+    return (f'<?xml version="1.0" encoding="UTF-8"?><rss version="2.0"><channel><title>Feed {feed_id}</title>'
+            f"{entries}</channel></rss>").encode()
+
+
+class FixtureServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address=("127.0.0.1", 0)):
+        super().__init__(address, _Handler)
+        self.requests = 0
+        self.bytes_sent = 0
+        self.lock = threading.Lock()
+
+    @property
+    def base_url(self):
+        return f"http://{self.server_address[0]}:{self.server_address[1]}"
+
+
+class _Handler(BaseHTTPRequestHandler):
+    def log_message(self, *args):
+        pass
+
+    def _send(self, status, body=b"", content_type="text/plain", headers=None):
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+        with self.server.lock:
+            self.server.requests += 1
+            self.server.bytes_sent += len(body)
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        if url.path == "/stats":
+            body = f'{{"requests": {self.server.requests}, "bytes": {self.server.bytes_sent}}}'.encode()
+            return self._send(200, body, "application/json")
+        if url.path.startswith("/feeds/") and url.path.endswith(".xml"):
+            feed_id = url.path[len("/feeds/"):-len(".xml")]
+            items = int(parse_qs(url.query).get("items", ["20"])[0])
+            etag = f'"feed-{feed_id}-{items}"'
+            if self.headers.get("If-None-Match") == etag:
+                return self._send(304, headers={"ETag": etag})
+            return self._send(200, make_feed(feed_id, items), "application/rss+xml", {"ETag": etag})
+        if url.path.startswith("/articles/"):
+            path = os.path.join(FIXTURES, os.path.basename(url.path))
+            if os.path.isfile(path):
+                with open(path, "rb") as f:
+                    return self._send(200, f.read(), "text/html")
+        self._send(404, b"not found")
+
+
+def start(port=0):
+    """Starts the server on a daemon thread and returns it (see `.base_url`)."""
+    server = FixtureServer(("127.0.0.1", port))
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--port", type=int, default=8766)
+    args = parser.parse_args()
+    server = FixtureServer(("127.0.0.1", args.port))
+    print(f"serving {server.base_url}")
+    server.serve_forever()
@@ -0,0 +1,332 @@
+"""Conformance checks for the storage backends behind daylight.repository.
+
+Runs one set of checks against each backend and prints PASS / FAIL per check:
+
+- sqlite: a fresh database file in a temporary directory;
+- fake: SupabaseRepository over bench/fake_supabase.py with the sql/ functions
+  from bench/fake_rpcs.py, which exercises every PostgREST query chain offline;
+- supabase: the project in SUPABASE_URL / SUPABASE_KEY (opt-in with --live). It
+  writes rows tagged with a run id and cannot remove all of them, so point it
+  at a scratch project with sql/ applied.
+
+Checks only look at rows they created and at counter deltas, so they also hold
+on a database that already has data. Also reports the median latency of a few
+hot reads. Exits non-zero if any check fails.
+
+    python bench/repository_conformance.py [--backends sqlite,fake] [--live]
+"""
+import argparse
+import hashlib
+import io
+import os
+import statistics
+import sys
+import tempfile
+import threading
+import time
+import traceback
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, timedelta
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(BENCH_DIR))
+sys.path.insert(0, BENCH_DIR)
+
+from daylight.repository import SupabaseRepository, open_repository  # noqa: E402
+
+CHECKS = []
+COLUMNS = "id, created_at, source, country, region, title, url, description"
+POSITION_COLUMNS = "id, created_at, user_name, claim, deadline, confidence, wager"
+
+
+def check(fn):
+    CHECKS.append(fn)
+    return fn
+
+
+def _ids_desc(rows):
+    ids = [r['id'] for r in rows]
+    return ids == sorted(ids, reverse=True)
+
+
+@check
+def cases(repo, tag):
+    before = repo.dashboard_stats(3, 1000)['active_cases']
+    first = repo.create_case(f"{tag} case A", "objective")
+    second = repo.create_case(f"{tag} case B", "objective")
+    assert first['id'] and first['status'] == "Active" and first['created_at']
+    assert repo.get_case(second['id'])['title'] == f"{tag} case B"
+    mine = [c for c in repo.list_cases() if c['title'].startswith(tag)]
+    assert [c['id'] for c in mine] == [second['id'], first['id']], "list_cases is not newest first"
+    active = [c for c in repo.list_active_cases() if c['id'] in (first['id'], second['id'])]
+    assert set(active[0]) == {"id", "title"} and [c['id'] for c in active] == [second['id'], first['id']]
+    assert repo.dashboard_stats(3, 1000)['active_cases'] == before + 2
+    repo.delete_case(first['id'])
+    assert repo.get_case(first['id']) is None
+    assert repo.dashboard_stats(3, 1000)['active_cases'] == before + 1
+
+
+@check
+def ledger(repo, tag):
+    case = repo.create_case(f"{tag} ledger", "")
+    row = lambda kind, content: {"investigation_id": case['id'], "type": kind, "content": content}
+    first = repo.add_ledger_rows([row("Entity: Person", "Ada"), row("Entity: Person", "Ada"), row("Lead", "[a](b)")])
+    assert len(first) == 2 and all(r['id'] and r['created_at'] for r in first), "in-batch duplicate not skipped"
+    again = repo.add_ledger_rows([row("Lead", "[a](b)"), row("Hypothesis", "h")])
+    assert [r['content'] for r in again] == ["h"], "row already on file was inserted again"
+    assert repo.add_ledger_rows([]) == []
+    items = repo.case_ledger(case['id'])
+    assert len(items) == 3 and _ids_desc(items), "ledger is not newest first"
+    assert repo.ledger_probe(case['id']) == (3, items[0]['id'])
+    repo.delete_ledger_rows([items[0]['id'], items[1]['id']])
+    assert repo.ledger_probe(case['id']) == (1, items[2]['id'])
+    assert repo.ledger_probe(-1) == (0, 0)
+    repo.delete_case(case['id'])
+
+
+def _archive(repo, tag, n=7):
+    rows = [{"source": "Wire", "country": "XX", "region": "Europe" if i % 2 else "Asia", "url": f"https://{tag}/{i}",
+             "title": f"{tag} story {i}", "description": "routine coverage"} for i in range(n)]
+    repo.add_archive_items(rows)
+    return rows
+
+
+@check
+def archive_pages(repo, tag):
+    before = repo.dashboard_stats(3, 1)['signals']
+    rows = _archive(repo, tag)
+    repo.add_archive_items(rows[:3])  # duplicates by url are skipped
+    assert repo.dashboard_stats(3, 1)['signals'] == before + len(rows)
+    for region in (None, "Europe"):
+        seen, cursor = [], None
+        while True:
+            page = repo.archive_page(COLUMNS, 2, region, cursor)
+            assert all(set(r) == {c.strip() for c in COLUMNS.split(",")} for r in page)
+            seen.extend(page)
+            if len(page) < 2:
+                break
+            cursor = (page[-1]['created_at'], page[-1]['id'])
+        mine = [r for r in seen if r['url'].startswith(f"https://{tag}/")]
+        expected = [r for r in rows if region is None or r['region'] == region]
+        assert len(mine) == len(expected), f"pagination lost or repeated rows (region {region})"
+        assert _ids_desc(seen) and len({r['id'] for r in seen}) == len(seen)
+    flash = repo.dashboard_stats(3, 1)['flash']
+    assert [f['title'] for f in flash] == [f"{tag} story {i}" for i in (6, 5, 4)]
+
+
+@check
+def archive_search(repo, tag):
+    word = "zq" + uuid.uuid4().hex[:8]
+    repo.add_archive_items([
+        {"source": "A", "country": "XX", "region": "Europe", "url": f"https://{tag}/s1", "title": f"{word} summit", "description": "talks"},
+        {"source": "B", "country": "XX", "region": "Asia", "url": f"https://{tag}/s2", "title": "talks", "description": f"about {word}"},
+        {"source": "C", "country": "XX", "region": "Asia", "url": f"https://{tag}/s3", "title": f"{word} ceasefire", "description": ""},
+    ])
+    hits = repo.search_archive(word, 10)
+    assert [h['source'] for h in hits][:1] in (["A"], ["C"]) and len(hits) == 3, "title match must outrank description"
+    assert all(isinstance(h['rank'], float) for h in hits) and hits[0]['rank'] >= hits[-1]['rank']
+    assert {h['source'] for h in repo.search_archive(f"{word} -ceasefire", 10)} == {"A", "B"}
+    assert {h['source'] for h in repo.search_archive(word, 10, "Asia")} == {"B", "C"}
+    assert {h['source'] for h in repo.search_archive(f'"{word} summit"', 10)} == {"A"}
+    assert repo.search_archive("   ", 10) == []
+
+
+@check
+def feed_registry(repo, tag):
+    active, failing = repo.feed_health()
+    feeds = [{"source": f"{tag} {i}", "country": "XX", "region": "Global", "url": f"https://{tag}/feed/{i}.xml"} for i in range(3)]
+    repo.register_feeds(feeds)
+    repo.register_feeds(feeds[:1])
+    assert repo.feed_health() == (active + 3, failing)
+    rows, offset = [], 0
+    while True:
+        page = repo.active_feeds("id, source, country, region, url, failure_count", offset, 2)
+        rows.extend(page)
+        if len(page) < 2:
+            break
+        offset += 2
+    mine = [r for r in rows if r['source'].startswith(tag)]
+    assert len(mine) == 3 and [r['id'] for r in rows] == sorted(r['id'] for r in rows)
+    repo.update_feeds([{**mine[0], "failure_count": 2, "last_error": "timeout"}])
+    assert repo.feed_health() == (active + 3, failing + 1)
+
+
+@check
+def evidence(repo, tag):
+    before = repo.dashboard_stats(1, 1)['evidence']
+    word = tag.replace("-", "")
+    data = f"{tag} exhibit\n".encode() * 100_000   # a few chunks
+    digest = hashlib.sha256(data).hexdigest()
+    key = f"{digest[:2]}/{digest}.txt"
+    url = repo.store_evidence_file(key, io.BytesIO(data), len(data), "text/plain")
+    assert repo.store_evidence_file(key, io.BytesIO(data), len(data), "text/plain") == url
+    assert repo.read_evidence_file(key) == data
+    row = {"filename": f"{tag}.txt", "file_url": url, "media_type": "text", "description": "note", "content_hash": digest,
+           "storage_key": key, "size_bytes": len(data), "mime_type": "text/plain", "status": "pending"}
+    stored = repo.add_evidence(row)
+    assert stored['id'] and stored['filename'] == f"{tag}.txt" and stored['status'] == "pending"
+    duplicate = repo.add_evidence({**row, "filename": f"{tag}-copy.txt"})
+    assert duplicate['id'] == stored['id'] and duplicate['filename'] == f"{tag}.txt", "duplicate content stored twice"
+    assert repo.find_evidence(digest)['id'] == stored['id'] and repo.find_evidence(f"{tag}-missing") is None
+    assert repo.dashboard_stats(1, 1)['evidence'] == before + 1
+
+    claimed = repo.claim_evidence(1000, 900)
+    assert stored['id'] in [r['id'] for r in claimed] and all(r['status'] == "processing" for r in claimed)
+    assert stored['id'] not in [r['id'] for r in repo.claim_evidence(1000, 900)], "claimed row handed out twice"
+    assert stored['id'] in [r['id'] for r in repo.claim_evidence(1000, -1)], "stale claim not handed out again"
+
+    repo.update_evidence(stored['id'], {"status": "ready", "metadata": {"author": f"{word}author", "pages": 3},
+                                        "extracted_text": f"the {word}witness signed the ledger"})
+    hits = repo.search_evidence(f"{word}witness")
+    assert [h['id'] for h in hits] == [stored['id']] and hits[0]['status'] == "ready"
+    assert hits[0]['metadata']['author'] == f"{word}author" and hits[0]['rank'] > 0 and hits[0]['snippet']
+    assert [h['id'] for h in repo.search_evidence(f"{word}author")] == [stored['id']], "metadata not indexed"
+    assert repo.search_evidence(f"{word}witness -{word}author") == []
+
+
+@check
+def escrow(repo, tag):
+    user = f"{tag}-analyst"
+    assert repo.analyst_score(user) is None
+    repo.open_account(user, 100)
+    repo.open_account(user, 999)  # existing accounts are left alone
+    assert repo.analyst_score(user) == 100
+    deadline = date.today() + timedelta(days=30)
+    bet = repo.place_prediction(user, "claim", deadline, 70, 60, 1000)
+    assert bet['ok'] and bet['score'] == 40 and bet['prediction_id']
+    refused = repo.place_prediction(user, "claim", deadline, 70, 60, 1000)
+    assert refused == {"ok": False, "score": 40, "prediction_id": None}
+    first = repo.resolve_prediction(bet['prediction_id'], True)
+    assert first == {"ok": True, "user_name": user, "payout": 120, "score": 160}
+    assert not repo.resolve_prediction(bet['prediction_id'], True)['ok'], "paid out twice"
+    newcomer = repo.place_prediction(f"{tag}-new", "claim", deadline, 50, 10, 1000)
+    assert newcomer['ok'] and newcomer['score'] == 990
+
+
+@check
+def bulk_resolution(repo, tag):
+    user = f"{tag}-bulk"
+    deadline = date.today() + timedelta(days=1)
+    ids = [repo.place_prediction(user, f"claim {i}", deadline, 60, 10, 100)['prediction_id'] for i in range(4)]
+    result = repo.resolve_predictions(ids[:3] + [ids[0]], [True, False, True, True])
+    assert result == {"resolved": 3, "won": 2, "paid_out": 40, "analysts_paid": 1}, result
+    assert repo.analyst_score(user) == 100 - 40 + 40
+    assert repo.resolve_predictions(ids[:3], [True] * 3)['resolved'] == 0
+    history = repo.resolved_predictions(50)
+    assert {h['id'] for h in history} >= set(ids[:3]) and set(history[0]) == {"id", "user_name", "claim", "outcome"}
+
+
+@check
+def positions_and_expiry(repo, tag):
+    user = f"{tag}-positions"
+    today = date.today()
+    ids = [repo.place_prediction(user, f"claim {i}", today - timedelta(days=20 - i), 60, 1, 100)['prediction_id']
+           for i in range(5)]
+    seen, cursor = [], None
+    while True:
+        page = repo.open_predictions(POSITION_COLUMNS, 2, cursor)
+        seen.extend(page)
+        if len(page) < 2:
+            break
+        cursor = (page[-1]['created_at'], page[-1]['id'])
+    mine = [r['id'] for r in seen if r['user_name'] == user]
+    assert mine == sorted(ids, reverse=True), "open positions are not newest first"
+    overdue, cursor = [], None
+    while True:
+        page = repo.open_predictions(POSITION_COLUMNS, 2, cursor, overdue_before=today)
+        overdue.extend(page)
+        if len(page) < 2:
+            break
+        cursor = (str(page[-1]['deadline']), page[-1]['id'])
+    keys = [(str(r['deadline']), r['id']) for r in overdue]
+    assert keys == sorted(keys) and [r['id'] for r in overdue if r['user_name'] == user] == ids
+    # Deadlines 20..16 days ago; with 17 grace days only the three oldest are due.
+    assert repo.resolve_expired_predictions(17, 1000, as_of=today) >= 3
+    still_open = {r['id'] for r in repo.open_predictions(POSITION_COLUMNS, 1000) if r['user_name'] == user}
+    assert still_open == set(ids[3:])
+
+
+@check
+def concurrent_bets(repo, tag, threads=16, bets=40, wager=30):
+    user = f"{tag}-storm"
+    repo.open_account(user, 1000)
+    barrier = threading.Barrier(threads)
+
+    def bet(i):
+        if i < threads:
+            barrier.wait()
+        return repo.place_prediction(user, f"storm {i}", date.today(), 50, wager, 1000)['ok']
+
+    with ThreadPoolExecutor(max_workers=threads) as pool:
+        accepted = sum(pool.map(bet, range(bets)))
+    assert accepted == 1000 // wager, f"{accepted} bets accepted"
+    assert repo.analyst_score(user) == 1000 - accepted * wager
+
+
+def read_latency(repo, tag, reads=200):
+    """Median ms of the hot reads behind a page rerun: case, ledger, probe, archive page."""
+    case = repo.create_case(f"{tag} latency", "")
+    repo.add_ledger_rows([{"investigation_id": case['id'], "type": "Lead", "content": str(i)} for i in range(50)])
+    timings = {}
+    for name, fn in [("get_case", lambda: repo.get_case(case['id'])), ("case_ledger", lambda: repo.case_ledger(case['id'])),
+                     ("ledger_probe", lambda: repo.ledger_probe(case['id'])), ("archive_page", lambda: repo.archive_page(COLUMNS, 50))]:
+        samples = []
+        for _ in range(reads):
+            started = time.perf_counter()
+            fn()
+            samples.append((time.perf_counter() - started) * 1000)
+        timings[name] = statistics.median(samples)
+    return timings
+
+
+def backends(names, workdir):
+    for name in names:
+        if name == "sqlite":
+            yield name, open_repository("sqlite", path=os.path.join(workdir, "conformance.sqlite3"))
+        elif name == "fake":
+            from fake_rpcs import RPCS
+            from fake_supabase import FakeSupabase
+            defaults = {"feed_registry": {"active": True, "failure_count": 0}}
+            unique = {"analyst_scores": ("user_name",), "feed_registry": ("url",), "evidence_locker": ("content_hash",)}
+            yield name, SupabaseRepository(FakeSupabase(unique=unique, rpcs=RPCS, defaults=defaults))
+        elif name == "supabase":
+            from supabase import create_client
+            yield name, SupabaseRepository(create_client(os.environ["SUPABASE_URL"], os.environ["SUPABASE_KEY"]))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--backends", default="sqlite,fake", help="comma-separated: sqlite, fake, supabase")
+    parser.add_argument("--live", action="store_true", help="also run against SUPABASE_URL (writes rows)")
+    parser.add_argument("--only", help="comma-separated check names")
+    args = parser.parse_args()
+    names = args.backends.split(",") + (["supabase"] if args.live and "supabase" not in args.backends else [])
+    only = set(args.only.split(",")) if args.only else None
+
+    failures = 0
+    with tempfile.TemporaryDirectory() as workdir:
+        for name, repo in backends(names, workdir):
+            tag = f"conf-{uuid.uuid4().hex[:8]}"
+            print(f"== {name} ({type(repo).__name__})")
+            for fn in CHECKS:
+                if only and fn.__name__ not in only:
+                    continue
+                started = time.perf_counter()
+                try:
+                    fn(repo, tag)
+                    status = "PASS"
+                except Exception as e:
+                    failures += 1
+                    status = f"FAIL  {type(e).__name__}: {e}"
+                    if not isinstance(e, AssertionError):
+                        traceback.print_exc()
+                print(f"  {fn.__name__:<22} {(time.perf_counter() - started) * 1000:7.1f} ms  {status}")
+            latency = read_latency(repo, tag)
+            print("  median read ms: " + ", ".join(f"{k} {v:.3f}" for k, v in latency.items()))
+    print("all backends conform" if not failures else f"{failures} check(s) failed")
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,340 @@
+"""Offline benchmark suite: every page and pipeline against local stand-ins.
+
+Nothing touches the network. Supabase is the in-memory PostgREST stand-in
+(bench/fake_supabase.py, with the sql/ functions from bench/fake_rpcs.py), OpenAI
+is a deterministic local chat endpoint (bench/fake_openai.py), and feeds and
+articles come from a local fixture server (bench/fixture_server.py). Each scenario
+runs in a fresh interpreter with an empty cache directory, so its peak RSS is its
+own:
+
+- pages (home, vault, investigations, futures): cold run and median rerun time,
+  database round trips per rerun, exceptions;
+- actions (analyze a source URL, place a bet): time, round trips, model calls;
+- ingest: one worker pass over the fixture feeds, then a revalidation pass
+  (items/s, round trips);
+- dossier: PDF render time and peak traced memory for a large ledger.
+
+Results go to a JSON file (default bench/results/<commit>.json). Pass a previous
+results file as --baseline to list metrics that got worse by more than
+--tolerance; --check makes that an exit status:
+
+    python bench/suite.py [--root PATH] [--only home,ingest] [--out FILE] [--baseline FILE] [--check]
+
+Pass --root to measure another checkout (e.g. a `git worktree` of an older commit).
+Scenarios that an older checkout cannot run are recorded with their error.
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import resource
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.request
+from datetime import date, datetime, timedelta, timezone
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+REPO_ROOT = os.path.dirname(BENCH_DIR)
+SCENARIOS = ["home", "vault", "investigations", "futures", "analyze", "bet", "ingest", "dossier"]
+PAGES = {"home": "home.py", "vault": "pages/1_The_Vault.py", "investigations": "pages/2_Investigations.py",
+         "futures": "pages/3_Futures_Desk.py", "analyze": "pages/2_Investigations.py", "bet": "pages/3_Futures_Desk.py"}
+CASE_TITLE = "Operation Bench"
+USER = "Analyst_01"
+# Metrics where a larger value is better, and workload sizes that are not compared;
+# every other numeric metric is a cost.
+HIGHER_IS_BETTER = ("items_per_s",)
+NOT_COMPARED = ("wall_s", "rows", "feeds", "items", "rows_written", "placed")
+
+
+def make_tables(ledger_entities=400, ledger_links=1200, archive_rows=500):
+    """Deterministic data for every table the pages read."""
+    rng = random.Random(0)
+    now = datetime.now(timezone.utc)
+    stamp = lambda minutes: (now - timedelta(minutes=minutes)).isoformat()
+    regions = ["RUSSIA", "WEST", "MIDEAST", "ASIA", "UKRAINE"]
+    archive = [{"id": 100_000 + i, "created_at": stamp(i), "source": f"Source {i % 9}", "country": "🌐 XX",
+                "region": regions[i % len(regions)], "title": f"Signal {i}: talks resume amid ceasefire pressure",
+                "url": f"https://example.com/{i}", "description": "Lorem ipsum dolor sit amet. " * 6}
+               for i in range(archive_rows)]
+    cases = [{"id": 1, "created_at": stamp(0), "title": CASE_TITLE, "description": "Map the shipment network.", "status": "Active"}]
+    cases += [{"id": 2 + i, "created_at": stamp(i + 1), "title": f"Operation {i}", "description": "",
+               "status": "Active" if i % 3 else "Closed"} for i in range(30)]
+    names = [f"{rng.choice(['Northwind', 'Meridian', 'Cobalt', 'Harbor', 'Sable'])} Holdings {i}" for i in range(ledger_entities)]
+    ledger, row_id = [], 200_000
+    for i, name in enumerate(names):
+        row_id += 1
+        ledger.append({"id": row_id, "created_at": stamp(5000 - i), "investigation_id": 1,
+                       "type": rng.choice(["Entity: Person", "Entity: Organization", "Entity: Event"]), "content": name})
+    hubs = names[:25]
+    for i in range(ledger_links):
+        row_id += 1
+        source = rng.choice(hubs) if rng.random() < .5 else rng.choice(names)
+        ledger.append({"id": row_id, "created_at": stamp(3000 - i), "investigation_id": 1, "type": "Relationship",
+                       "content": f"{source}|{rng.choice(['funds', 'meets', 'owns'])}|{rng.choice(names)}"})
+    for i in range(50):
+        row_id += 1
+        ledger.append({"id": row_id, "created_at": stamp(1000 - i), "investigation_id": 1, "type": "Hypothesis",
+                       "content": f"Hypothesis {i}: who benefits from the delays?"})
+    today = date.today()
+    predictions = [{"id": 300_000 + i, "created_at": stamp(i), "user_name": f"Analyst_{i % 7:02d}", "claim": f"Claim {i}",
+                    "deadline": str(today + timedelta(days=i % 40 - 10)), "confidence": 50 + i % 50, "wager": 10 + i % 5 * 10,
+                    "status": "Open" if i < 300 else "Resolved", "outcome": None if i < 300 else "Correct"}
+                   for i in range(400)]
+    scores = [{"id": 400_000 + i, "user_name": f"Analyst_{i:02d}", "score": 1000} for i in range(7)]
+    evidence = [{"id": 500_000 + i, "created_at": stamp(i), "file_name": f"exhibit_{i}.pdf"} for i in range(20)]
+    return {"news_archive": archive, "investigations": cases, "intel_ledger": ledger, "predictions": predictions,
+            "analyst_scores": scores, "evidence_locker": evidence, "feed_registry": []}
+
+
+# --- child side: one scenario per interpreter ---
+
+def _stats(url):
+    with urllib.request.urlopen(url, timeout=5) as response:
+        return json.loads(response.read())
+
+
+def _setup(root):
+    sys.path.insert(0, root)
+    sys.path.insert(0, BENCH_DIR)
+    os.chdir(root)
+    from fake_rpcs import RPCS
+    from fake_supabase import FakeSupabase, install
+
+    # The pages pause for a second after a successful write; skip those pauses.
+    real_sleep = time.sleep
+    page_dirs = {root, os.path.join(root, "pages")}
+
+    def sleep(seconds):
+        if os.path.dirname(sys._getframe(1).f_code.co_filename) in page_dirs:
+            return
+        real_sleep(seconds)
+    time.sleep = sleep
+    return install(FakeSupabase(make_tables(), unique={"analyst_scores": ("user_name",)}, rpcs=RPCS))
+
+
+def _open(root, scenario):
+    from streamlit.testing.v1 import AppTest
+    at = AppTest.from_file(os.path.join(root, PAGES[scenario]), default_timeout=300)
+    at.run()
+    if PAGES[scenario] == PAGES["investigations"]:
+        at.sidebar.selectbox[0].select(CASE_TITLE)
+        at.run()
+    return at
+
+
+def _timed(fake, fn):
+    before, started = fake.round_trips, time.perf_counter()
+    fn()
+    return (time.perf_counter() - started) * 1000, fake.round_trips - before
+
+
+def page_scenario(root, scenario, reruns):
+    fake = _setup(root)
+    started = time.perf_counter()
+    at = _open(root, scenario)
+    cold = (time.perf_counter() - started) * 1000
+    samples = [_timed(fake, at.run) for _ in range(reruns)]
+    return {"cold_ms": cold, "rerun_ms": statistics.median(s[0] for s in samples),
+            "round_trips_per_rerun": statistics.median(s[1] for s in samples),
+            "round_trips_total": fake.round_trips, "errors": len(at.exception)}
+
+
+def analyze_scenario(root, fixtures_url, openai_url):
+    fake = _setup(root)
+    at = _open(root, "analyze")
+    completions = _stats(f"{openai_url}/stats")["completions"]
+    fetches = _stats(f"{fixtures_url}/stats")["requests"]
+    ledger_rows = len(fake.tables["intel_ledger"])
+    next(t for t in at.text_area if t.label.startswith("Source Material")).set_value(f"{fixtures_url}/articles/news_article.html")
+    button = next(b for b in at.button if b.label == "🔍 Analyze Source")
+    ms, trips = _timed(fake, lambda: button.click().run())
+    return {"analyze_ms": ms, "round_trips": trips, "completions": _stats(f"{openai_url}/stats")["completions"] - completions,
+            "fetches": _stats(f"{fixtures_url}/stats")["requests"] - fetches - 1,
+            "rows_written": len(fake.tables["intel_ledger"]) - ledger_rows, "errors": len(at.exception)}
+
+
+def bet_scenario(root):
+    fake = _setup(root)
+    at = _open(root, "bet")
+    open_bets = sum(1 for p in fake.tables["predictions"] if p["status"] == "Open")
+    next(t for t in at.text_input if t.label == "I predict that...").input("Oil closes above $100")
+    button = next(b for b in at.button if b.label == "🔒 Lock Prediction")
+    ms, trips = _timed(fake, lambda: button.click().run())
+    placed = sum(1 for p in fake.tables["predictions"] if p["status"] == "Open") - open_bets
+    return {"bet_ms": ms, "round_trips": trips, "placed": placed, "errors": len(at.exception)}
+
+
+def ingest_scenario(root, fixtures_url, feeds, items):
+    fake = _setup(root)
+    from daylight.ingest_worker import IngestWorker
+    try:
+        from daylight.repository import SupabaseRepository
+        store = SupabaseRepository(fake)
+    except ImportError:  # checkouts from before the repository layer take the client itself
+        store = fake
+
+    past = (datetime.now(timezone.utc) - timedelta(minutes=1)).isoformat()
+    fake.tables["feed_registry"] = [{
+        "id": i + 1, "source": f"Feed {i}", "country": "🌐 XX", "region": "WEST", "url": f"{fixtures_url}/feeds/{i}.xml?items={items}",
+        "active": True, "item_limit": items, "poll_interval_s": 900, "next_poll_at": past, "last_polled_at": None,
+        "publish_rate": 0, "failure_count": 0, "last_error": None, "etag": None, "last_modified": None,
+    } for i in range(feeds)]
+    archived = len(fake.tables["news_archive"])
+    ms, trips = _timed(fake, lambda: IngestWorker(store, batch_size=500).run(once=True))
+    new_items = len(fake.tables["news_archive"]) - archived
+    # Second pass: every feed is due again and answers 304 to the stored ETag.
+    for row in fake.tables["feed_registry"]:
+        row["next_poll_at"] = past
+    revalidate_ms, revalidate_trips = _timed(fake, lambda: IngestWorker(store, batch_size=500).run(once=True))
+    return {"feeds": feeds, "items": new_items, "ingest_ms": ms, "items_per_s": new_items / (ms / 1000),
+            "round_trips": trips, "revalidate_ms": revalidate_ms, "revalidate_round_trips": revalidate_trips,
+            "archived_after_revalidate": len(fake.tables["news_archive"]) - archived - new_items}
+
+
+def dossier_scenario(root, rows):
+    sys.path.insert(0, root)
+    sys.path.insert(0, BENCH_DIR)
+    os.chdir(root)
+    import tracemalloc
+    from daylight.dossier import build_dossier
+    from daylight.ledger import ledger_version
+    from dossier import CASE, KEY_PLAYERS, make_ledger  # bench/dossier.py, after the checkout's modules
+
+    items = make_ledger(rows)
+    version = ledger_version(items)
+    started = time.perf_counter()
+    path = build_dossier(CASE, items, version, KEY_PLAYERS)
+    render = (time.perf_counter() - started) * 1000
+    tracemalloc.start()
+    build_dossier(CASE, items, version + "-traced", KEY_PLAYERS)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return {"rows": rows, "render_ms": render, "traced_peak_mb": peak / 1e6, "pdf_mb": os.path.getsize(path) / 1e6}
+
+
+def run_child(args):
+    root = os.path.abspath(args.root)
+    fixtures_url, openai_url = os.environ["BENCH_FIXTURES_URL"], os.environ["BENCH_OPENAI_URL"]
+    if args.child in ("home", "vault", "investigations", "futures"):
+        result = page_scenario(root, args.child, args.reruns)
+    elif args.child == "analyze":
+        result = analyze_scenario(root, fixtures_url, openai_url)
+    elif args.child == "bet":
+        result = bet_scenario(root)
+    elif args.child == "ingest":
+        result = ingest_scenario(root, fixtures_url, args.feeds, args.items)
+    else:
+        result = dossier_scenario(root, args.dossier_rows)
+    result["peak_rss_mb"] = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    return result
+
+
+# --- parent side ---
+
+def git_commit(root):
+    try:
+        sha = subprocess.run(["git", "-C", root, "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True).stdout.strip()
+        dirty = bool(subprocess.run(["git", "-C", root, "status", "--porcelain", "--untracked-files=no"],
+                                    capture_output=True, text=True).stdout.strip())
+        return sha + ("-dirty" if dirty else "")
+    except Exception:
+        return "unknown"
+
+
+def run_scenario(args, root, scenario, env):
+    command = [sys.executable, __file__, "--root", root, "--child", scenario, "--reruns", str(args.reruns),
+               "--feeds", str(args.feeds), "--items", str(args.items), "--dossier-rows", str(args.dossier_rows)]
+    started = time.perf_counter()
+    out = subprocess.run(command, env=dict(env, DAYLIGHT_CACHE_DIR=tempfile.mkdtemp(prefix="daylight-bench-")),
+                         capture_output=True, text=True)
+    lines = out.stdout.strip().splitlines()
+    try:
+        result = json.loads(lines[-1])
+    except (IndexError, ValueError):
+        result = {"error": (out.stderr.strip().splitlines() or ["no output"])[-1][:500]}
+    result["wall_s"] = time.perf_counter() - started
+    return result
+
+
+def compare(results, baseline, tolerance):
+    """Returns [(scenario, metric, old, new, change)] for metrics worse by more than `tolerance`."""
+    worse = []
+    for scenario, metrics in results.items():
+        old_metrics = baseline.get("results", {}).get(scenario, {})
+        for metric, new in metrics.items():
+            old = old_metrics.get(metric)
+            if metric in NOT_COMPARED or not isinstance(new, (int, float)) or not isinstance(old, (int, float)) or isinstance(new, bool):
+                continue
+            if metric in HIGHER_IS_BETTER:
+                change = (old - new) / old if old else 0.0
+            else:
+                change = (new - old) / old if old else (1.0 if new > old else 0.0)
+            if change > tolerance and abs(new - old) > 1:
+                worse.append((scenario, metric, old, new, change))
+    return worse
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--root", default=REPO_ROOT)
+    parser.add_argument("--only", help="comma-separated scenarios (default: all)")
+    parser.add_argument("--out", help="results file (default bench/results/<commit>.json)")
+    parser.add_argument("--baseline", help="earlier results file to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="allowed relative slowdown before flagging")
+    parser.add_argument("--check", action="store_true", help="exit with status 1 if anything regressed")
+    parser.add_argument("--reruns", type=int, default=5)
+    parser.add_argument("--feeds", type=int, default=100)
+    parser.add_argument("--items", type=int, default=50)
+    parser.add_argument("--dossier-rows", type=int, default=20000)
+    parser.add_argument("--openai-latency-ms", type=float, default=0)
+    parser.add_argument("--child", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.child:
+        print(json.dumps(run_child(args)))
+        return
+
+    sys.path.insert(0, BENCH_DIR)
+    import fake_openai
+    import fixture_server
+
+    root = os.path.abspath(args.root)
+    scenarios = args.only.split(",") if args.only else SCENARIOS
+    fixtures, openai = fixture_server.start(), fake_openai.start(args.openai_latency_ms / 1000)
+    env = dict(os.environ, SUPABASE_URL="http://127.0.0.1:9", SUPABASE_KEY="bench-key", OPENAI_API_KEY="bench-key",
+               OPENAI_BASE_URL=openai.base_url, BENCH_OPENAI_URL=openai.base_url, BENCH_FIXTURES_URL=fixtures.base_url)
+
+    commit = git_commit(root)
+    results = {}
+    for scenario in scenarios:
+        results[scenario] = run_scenario(args, root, scenario, env)
+        shown = ", ".join(f"{k}={v:.1f}" if isinstance(v, float) else f"{k}={v}" for k, v in results[scenario].items())
+        print(f"{scenario:<15}{shown}")
+
+    import streamlit
+    report = {"meta": {"commit": commit, "root": root, "created_at": datetime.now(timezone.utc).isoformat(),
+                       "python": platform.python_version(), "streamlit": streamlit.__version__, "platform": platform.platform(),
+                       "args": {k: v for k, v in vars(args).items() if k not in ("child", "out", "baseline", "check")}},
+              "results": results}
+    out = args.out or os.path.join(BENCH_DIR, "results", f"{commit}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(out)), exist_ok=True)
+    with open(out, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"results written to {out}")
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        worse = compare(results, baseline, args.tolerance)
+        print(f"compared with {baseline['meta']['commit']}: {len(worse)} regressions over {args.tolerance:.0%}")
+        for scenario, metric, old, new, change in worse:
+            print(f"  {scenario}.{metric}: {old:.1f} -> {new:.1f} ({change:+.0%})")
+        if worse and args.check:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+"""Measures The Vault's render time against an in-memory 500-row archive.
+
+Runs the page under AppTest with bench.fake_supabase standing in for the database,
+and reports median rerun time, widgets created per rerun and round trips per rerun:
+
+    python bench/vault_render.py [--root PATH] [--rows 500] [--reruns 10]
+
+Pass --root to measure another checkout (e.g. a `git worktree` of an older commit).
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+from datetime import datetime, timedelta, timezone
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+REGIONS = ["RUSSIA", "WEST", "MIDEAST", "ASIA", "UKRAINE"]
+BENCH_ENV = {"SUPABASE_URL": "http://127.0.0.1:9", "SUPABASE_KEY": "bench-key"}
+
+
+def make_tables(rows):
+    now = datetime.now(timezone.utc)
+    archive = [{
+        "id": i + 1,
+        "created_at": (now - timedelta(minutes=i)).isoformat(),
+        "source": f"Source {i % 9}", "country": "🌐 XX", "region": REGIONS[i % len(REGIONS)],
+        "title": f"Signal {i}: talks resume amid ceasefire pressure", "url": f"https://example.com/{i}",
+        "description": "Lorem ipsum dolor sit amet, consectetur adipiscing elit. " * 3,
+    } for i in range(rows)]
+    cases = [{"id": 10_000 + i, "created_at": now.isoformat(), "title": f"Operation {i}", "description": "", "status": "Active"} for i in range(5)]
+    return {"news_archive": archive, "investigations": cases, "feed_registry": []}
+
+
+def run_child(root, rows, reruns):
+    sys.path.insert(0, root)
+    sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+    os.chdir(root)
+    from fake_supabase import FakeSupabase, install
+    from streamlit.testing.v1 import AppTest
+
+    fake = install(FakeSupabase(make_tables(rows)))
+    at = AppTest.from_file(os.path.join(root, "pages/1_The_Vault.py"), default_timeout=120)
+    at.run()
+    samples, trips = [], []
+    for _ in range(reruns):
+        before = fake.round_trips
+        started = time.perf_counter()
+        at.run()
+        samples.append((time.perf_counter() - started) * 1000)
+        trips.append(fake.round_trips - before)
+    widgets = len(at.selectbox) + len(at.button) + len(at.radio)
+    return {"rerun_ms": statistics.median(samples), "widgets": widgets, "round_trips": statistics.median(trips),
+            "errors": len(at.exception)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--root", default=REPO_ROOT)
+    parser.add_argument("--rows", type=int, default=500)
+    parser.add_argument("--reruns", type=int, default=10)
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    root = os.path.abspath(args.root)
+
+    if args.child:
+        print(json.dumps(run_child(root, args.rows, args.reruns)))
+        return
+
+    out = subprocess.run([sys.executable, __file__, "--root", root, "--rows", str(args.rows), "--reruns", str(args.reruns), "--child"],
+                         env=dict(os.environ, **BENCH_ENV), capture_output=True, text=True, check=True)
+    result = json.loads(out.stdout.strip().splitlines()[-1])
+    print(f"rows={args.rows}  rerun={result['rerun_ms']:.0f} ms  widgets={result['widgets']}  "
+          f"round_trips/rerun={result['round_trips']:g}  errors={result['errors']}")
+
+
+if __name__ == "__main__":
+    main()
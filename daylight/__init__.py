@@ -0,0 +1 @@
+"""Project Daylight core: shared helpers used by the Streamlit pages."""
@@ -0,0 +1,173 @@
+"""Network analytics over a case graph with sparse matrices.
+
+The case's merged relationships become one SciPy CSR adjacency matrix, weighted
+by edge counts. Degree, PageRank, eigenvector centrality, connected components
+and label-propagation communities are then computed as vectorized sparse
+operations. Results are cached per ledger version, like the graph itself.
+"""
+import streamlit as st
+
+MAX_ANALYTICS = 32
+DAMPING = 0.85
+TOLERANCE = 1e-8
+MAX_ITERATIONS = 100
+MAX_LPA_ROUNDS = 500
+# Community colours for the graph, cycled when there are more communities.
+PALETTE = ["#ff4b4b", "#1f77b4", "#2ca02c", "#ff7f0e", "#9467bd", "#17becf",
+           "#e377c2", "#bcbd22", "#8c564b", "#7f7f7f", "#fdd835", "#00bfa5"]
+
+
+def adjacency(graph):
+    """Returns (names, W) where W[i, j] is the number of i -> j relationships."""
+    import numpy as np
+    from scipy import sparse
+
+    names = list(graph.nodes)
+    position = {name: i for i, name in enumerate(names)}
+    pairs = list(graph.edges.items())
+    rows = np.fromiter((position[s] for (s, _), _ in pairs), dtype=np.int64, count=len(pairs))
+    cols = np.fromiter((position[t] for (_, t), _ in pairs), dtype=np.int64, count=len(pairs))
+    weights = np.fromiter((sum(labels.values()) for _, labels in pairs), dtype=np.float64, count=len(pairs))
+    return names, sparse.csr_matrix((weights, (rows, cols)), shape=(len(names), len(names)))
+
+
+def pagerank(W, damping=DAMPING, tol=TOLERANCE, max_iter=MAX_ITERATIONS):
+    """Weighted PageRank by power iteration; rank from dangling nodes is spread evenly."""
+    import numpy as np
+    from scipy import sparse
+
+    n = W.shape[0]
+    out = np.asarray(W.sum(axis=1)).ravel()
+    dangling = out == 0
+    inv_out = np.divide(1.0, out, out=np.zeros(n), where=~dangling)
+    transition_t = (sparse.diags(inv_out) @ W).T.tocsr()
+    rank = np.full(n, 1.0 / n)
+    for _ in range(max_iter):
+        new = damping * (transition_t @ rank + rank[dangling].sum() / n) + (1 - damping) / n
+        done = np.abs(new - rank).sum() < n * tol
+        rank = new
+        if done:
+            break
+    return rank / rank.sum()
+
+
+def eigenvector_centrality(A, tol=TOLERANCE, max_iter=MAX_ITERATIONS):
+    """Eigenvector centrality of the symmetric matrix A, scaled so the maximum is 1.
+
+    Iterates on A + I, which has the same leading eigenvector but cannot oscillate
+    on bipartite graphs.
+    """
+    import numpy as np
+
+    n = A.shape[0]
+    x = np.full(n, 1.0 / n)
+    for _ in range(max_iter):
+        new = A @ x + x
+        new /= np.linalg.norm(new) or 1.0
+        done = np.abs(new - x).sum() < n * tol
+        x = new
+        if done:
+            break
+    return x / (x.max() or 1.0)
+
+
+def label_propagation(A, max_rounds=MAX_LPA_ROUNDS, seed=0):
+    """Community labels (0 = largest community) by weighted label propagation.
+
+    A node moves to the label with the largest total edge weight among its neighbours,
+    unless its own label is already among the heaviest; the node itself does not vote,
+    or with unit weights it would tie with every neighbour and never move. Each round
+    moves only an independent set of such nodes (those whose random priority beats
+    every moving neighbour's), which behaves like the asynchronous algorithm but runs
+    as whole-array operations. Relabelling the CSR column indices sums weights per
+    label, and `maximum.reduceat` finds each row's best.
+    """
+    import numpy as np
+    from scipy import sparse
+
+    n = A.shape[0]
+    # A + I keeps every row non-empty for reduceat; the diagonal is zeroed in the vote weights.
+    M = (A + sparse.identity(n, format="csr")).tocsr()
+    weights = M.data.copy()
+    weights[M.indices == np.repeat(np.arange(n), np.diff(M.indptr))] -= 1.0
+    rng = np.random.default_rng(seed)
+    labels = np.arange(n)
+    for _ in range(max_rounds):
+        # Copies: sum_duplicates() works in place and must not touch M's arrays.
+        S = sparse.csr_matrix((weights.copy(), labels[M.indices], M.indptr.copy()), shape=(n, n))
+        S.sum_duplicates()
+        rows = np.repeat(np.arange(n), np.diff(S.indptr))
+        best = np.maximum.reduceat(S.data, S.indptr[:-1])
+        current = np.zeros(n)
+        own = S.indices == labels[rows]
+        current[rows[own]] = S.data[own]
+        moving = current < best
+        if not moving.any():
+            break
+        # Independent set: moving nodes whose priority is the highest among moving neighbours.
+        priority = np.where(moving, rng.random(n), -1.0)
+        local_max = np.maximum.reduceat(priority[M.indices], M.indptr[:-1])
+        update = moving & (priority >= local_max)
+        # Each updating node takes one of its heaviest labels, chosen at random.
+        candidates = np.flatnonzero((S.data == best[rows]) & update[rows])
+        picked = candidates[np.lexsort((rng.random(len(candidates)), rows[candidates]))]
+        first = picked[np.r_[True, rows[picked[1:]] != rows[picked[:-1]]]]
+        labels = labels.copy()
+        labels[rows[first]] = S.indices[first]
+    # Renumber so community 0 is the largest.
+    _, inverse, counts = np.unique(labels, return_inverse=True, return_counts=True)
+    order = np.argsort(-counts, kind="stable")
+    return np.argsort(order)[inverse]
+
+
+class CaseAnalytics:
+    """Per-entity scores for one case graph."""
+
+    def __init__(self, graph):
+        import numpy as np
+        from scipy.sparse.csgraph import connected_components
+
+        self.names, W = adjacency(graph)
+        self.types = [graph.nodes[name] for name in self.names]
+        self.position = {name: i for i, name in enumerate(self.names)}
+        if not self.names:
+            self.degree = self.pagerank = self.eigenvector = np.zeros(0)
+            self.component = self.community = np.zeros(0, dtype=int)
+            self.n_components = self.n_communities = 0
+            return
+        A = (W + W.T).tocsr()
+        self.degree = np.diff(A.indptr)  # distinct neighbours
+        self.pagerank = pagerank(W)
+        self.eigenvector = eigenvector_centrality(A)
+        self.n_components, self.component = connected_components(A, directed=False)
+        self.community = label_propagation(A)
+        self.n_communities = int(self.community.max()) + 1
+
+    def scores(self, name):
+        """{"degree", "pagerank", "eigenvector", "component", "community"} for one entity."""
+        i = self.position[name]
+        return {"degree": int(self.degree[i]), "pagerank": float(self.pagerank[i]),
+                "eigenvector": float(self.eigenvector[i]), "component": int(self.component[i]),
+                "community": int(self.community[i])}
+
+    def node_size(self, name, smallest=15, largest=60):
+        """Display size scaled by the square root of PageRank relative to the top entity."""
+        top = self.pagerank.max() if len(self.pagerank) else 0
+        if not top:
+            return smallest
+        return smallest + (largest - smallest) * float((self.pagerank[self.position[name]] / top) ** 0.5)
+
+    def node_color(self, name):
+        return PALETTE[int(self.community[self.position[name]]) % len(PALETTE)]
+
+    def key_players(self, n=10):
+        """The n most central entities by PageRank: [{"name", "type", **scores}]."""
+        import numpy as np
+        top = np.argsort(-self.pagerank, kind="stable")[:n]
+        return [{"name": self.names[i], "type": self.types[i], **self.scores(self.names[i])} for i in top]
+
+
+@st.cache_resource(max_entries=MAX_ANALYTICS, show_spinner=False)
+def case_analytics(case_id, version, _graph):
+    """The case's analytics for one ledger version (shared and read-only, like the graph)."""
+    return CaseAnalytics(_graph)
@@ -0,0 +1,176 @@
+"""Article extraction for source URLs: capped download, boilerplate stripping, metadata.
+
+The response is streamed and cut off at MAX_BYTES, parsed with lxml (libxml2), and
+stripped of scripts, styles, navigation, headers/footers and other chrome before
+the main content block is chosen by paragraph-text density. Only the article text
+plus its title and published date go on to the LLM.
+"""
+import codecs
+import re
+
+from daylight.clients import get_cached_session
+
+MAX_BYTES = 2 * 1024 * 1024
+CHUNK_SIZE = 64 * 1024
+
+# Never content.
+DROP_TAGS = ("script", "style", "noscript", "template", "iframe", "svg", "canvas", "form",
+             "button", "select", "nav", "aside", "footer", "header", "menu", "dialog")
+# class / id fragments that mark page chrome rather than the article.
+BOILERPLATE = re.compile(r"(^|[\s_-])(nav|navbar|menu|breadcrumb|footer|sidebar|widget|comment|share|social|"
+                         r"cookie|consent|banner|advert|ads?|promo|related|recommended|newsletter|subscribe|"
+                         r"popup|modal|masthead|skip)([\s_-]|$)", re.I)
+BLOCK_TAGS = ("p", "h1", "h2", "h3", "h4", "li", "blockquote", "pre", "figcaption")
+PUBLISHED_META = ("article:published_time", "og:published_time", "datepublished", "pubdate", "publishdate",
+                  "publish-date", "date", "dc.date", "dc.date.issued", "sailthru.date", "parsely-pub-date")
+MAX_LINK_DENSITY = 0.5
+
+_CHARSET = re.compile(rb"""<meta[^>]+charset=["']?([\w-]+)""", re.I)
+_JSONLD_DATE = re.compile(r'"datePublished"\s*:\s*"([^"]+)"')
+
+
+def read_capped(response, max_bytes=MAX_BYTES, chunk_size=CHUNK_SIZE):
+    """Reads a streamed response body up to max_bytes. Returns (body, truncated)."""
+    parts, size = [], 0
+    for chunk in response.iter_content(chunk_size):
+        parts.append(chunk)
+        size += len(chunk)
+        if size >= max_bytes:
+            response.close()
+            return b"".join(parts)[:max_bytes], True
+    return b"".join(parts), False
+
+
+def _encoding(content_type, body):
+    """Charset from the Content-Type header, else a <meta charset>, else UTF-8.
+
+    Unknown charset names (a typo or "x-bogus") fall back to UTF-8; callers decode
+    with errors="replace".
+    """
+    match = re.search(r"charset=([\w-]+)", content_type or "", re.I) or _CHARSET.search(body[:4096])
+    charset = match.group(1) if match else "utf-8"
+    charset = charset.decode("ascii", "replace") if isinstance(charset, bytes) else charset
+    try: return codecs.lookup(charset).name
+    except LookupError: return "utf-8"
+
+
+def _meta(doc, names):
+    for el in doc.iter("meta"):
+        key = (el.get("property") or el.get("name") or el.get("itemprop") or "").lower()
+        if key in names and el.get("content"):
+            return el.get("content").strip()
+    return None
+
+
+def _published(doc, html_text):
+    date = _meta(doc, PUBLISHED_META)
+    if date:
+        return date
+    for el in doc.iter("time"):
+        if el.get("datetime"):
+            return el.get("datetime").strip()
+    match = _JSONLD_DATE.search(html_text)
+    return match.group(1) if match else None
+
+
+def _title(doc):
+    title = _meta(doc, ("og:title", "twitter:title"))
+    if not title:
+        el = doc.find(".//title")
+        title = el.text_content().strip() if el is not None else None
+    if not title:
+        el = doc.find(".//h1")
+        title = el.text_content().strip() if el is not None else None
+    return " ".join(title.split()) if title else None
+
+
+def _strip_boilerplate(doc):
+    for el in list(doc.iter(*DROP_TAGS)):
+        if el.getparent() is not None:
+            el.drop_tree()
+    for el in list(doc.iter()):
+        if not isinstance(el.tag, str) or el.tag in ("html", "body", "article", "main"):
+            continue
+        marker = f"{el.get('class', '')} {el.get('id', '')} {el.get('role', '')}"
+        # A content wrapper with an unlucky class name ("story-share-body") keeps its paragraphs.
+        if (marker.strip() and BOILERPLATE.search(marker) and el.getparent() is not None
+                and len(el.findall(".//p")) < 5):
+            el.drop_tree()
+
+
+def _block_text(el):
+    text = " ".join(el.text_content().split())
+    if not text:
+        return ""
+    links = sum(len(a.text_content()) for a in el.iter("a"))
+    return "" if links / len(text) > MAX_LINK_DENSITY else text
+
+
+def _main_content(doc):
+    """The element holding most of the page's paragraph text."""
+    articles = [a for a in doc.iter("article", "main")]
+    if articles:
+        return max(articles, key=lambda a: sum(len(p.text_content()) for p in a.iter("p")))
+    # Each paragraph scores its parent in full and its grandparent by half, so a feed of
+    # small wrapped blocks (<div><p>..</p></div> x N) still wins over any single block.
+    scores = {}
+    for p in doc.iter("p"):
+        size, parent = len(_block_text(p)), p.getparent()
+        for weight in (1, 0.5):
+            if parent is None:
+                break
+            scores[parent] = scores.get(parent, 0) + size * weight
+            parent = parent.getparent()
+    return max(scores, key=scores.get) if scores else doc.find(".//body")
+
+
+def extract_article(body, content_type=None):
+    """Extracts {"title", "published", "text"} from raw HTML bytes.
+
+    `text` holds the main content blocks separated by blank lines, with navigation,
+    scripts and link-heavy lists removed.
+    """
+    import lxml.html
+
+    encoding = _encoding(content_type, body)
+    html_text = body.decode(encoding, errors="replace")
+    parser = lxml.html.HTMLParser(encoding=encoding, remove_comments=True)
+    doc = lxml.html.document_fromstring(body, parser=parser)
+    title, published = _title(doc), _published(doc, html_text)
+
+    _strip_boilerplate(doc)
+    root = _main_content(doc)
+    blocks = []
+    if root is not None:
+        for el in root.iter(*BLOCK_TAGS):
+            # Nested blocks (<li><p>..</p></li>) are emitted once, by the innermost element.
+            if any(child.tag in BLOCK_TAGS for child in el.iterdescendants()):
+                continue
+            text = _block_text(el)
+            if text and (not blocks or blocks[-1] != text):
+                blocks.append(text)
+        if not blocks:
+            blocks = [" ".join(root.text_content().split())]
+    return {"title": title, "published": published, "text": "\n\n".join(b for b in blocks if b)}
+
+
+def fetch_article(url, timeout=10, max_bytes=MAX_BYTES, session=None):
+    """Downloads (at most max_bytes of) a page and extracts its article.
+
+    Returns {"title", "published", "text", "bytes", "truncated"}. Raises on HTTP errors.
+    """
+    session = session or get_cached_session()
+    with session.get(url, timeout=timeout, stream=True) as response:
+        response.raise_for_status()
+        body, truncated = read_capped(response, max_bytes)
+        article = extract_article(body, response.headers.get("Content-Type"))
+    article.update(bytes=len(body), truncated=truncated)
+    return article
+
+
+def article_to_source(article):
+    """Formats an extracted article as the source text handed to the Auto-Analyst."""
+    header = [f"TITLE: {article['title']}"] if article.get("title") else []
+    if article.get("published"):
+        header.append(f"PUBLISHED: {article['published']}")
+    return "\n".join(header) + ("\n\n" if header else "") + article.get("text", "")
@@ -0,0 +1,164 @@
+"""Case files and per-case snapshots (the case row plus its intel ledger).
+
+A snapshot is loaded once and shared by every session in the process. Reruns
+reuse it and re-check the ledger at most every `PROBE_INTERVAL_S` with a one-row
+probe: the row count and the highest id change whenever a row is added or
+deleted. Concurrent loads of the same case are coalesced into one fetch.
+Writes made from this process are applied to the snapshot in place
+(`apply_insert` / `apply_delete`), so a save does not trigger a reload.
+"""
+import threading
+import time
+from concurrent.futures import Future
+
+import streamlit as st
+
+from daylight import vault
+from daylight.dashboard import invalidate_dashboard
+from daylight.ledger import ledger_version
+from daylight.repository import get_repository
+
+CACHE_TTL_S = 60
+PROBE_INTERVAL_S = 15
+LOAD_TIMEOUT_S = 60
+
+
+class CaseSnapshot:
+    """One case at one ledger version. Shared across sessions, so treat it as read-only."""
+
+    def __init__(self, case, items):
+        self.case = case
+        self.items = items            # ledger rows, newest first
+        self.version = ledger_version(items)
+        self.max_id = max((item['id'] for item in items), default=0)
+        self.checked_at = time.monotonic()
+
+    def with_rows(self, added=(), removed=()):
+        """A new snapshot with `added` rows in front and the ids in `removed` dropped."""
+        removed = set(removed)
+        added = sorted(added, key=lambda r: (r.get('created_at') or "", r['id']), reverse=True)
+        known = {item['id'] for item in self.items}
+        fresh = [row for row in added if row['id'] not in known and row['id'] not in removed]
+        return CaseSnapshot(self.case, fresh + [item for item in self.items if item['id'] not in removed])
+
+
+class SnapshotStore:
+    """Process-wide snapshots keyed by case id, with single-flight loading."""
+
+    def __init__(self, probe_interval=PROBE_INTERVAL_S):
+        self.probe_interval = probe_interval
+        self.snapshots = {}
+        self.inflight = {}
+        self.lock = threading.Lock()
+        self.loads = 0
+        self.probes = 0
+
+    def _single_flight(self, key, fn):
+        """Runs fn() once for all callers that ask for `key` while it is running."""
+        with self.lock:
+            flight = self.inflight.get(key)
+            leader = flight is None
+            if leader:
+                flight = self.inflight[key] = Future()
+        if not leader:
+            return flight.result(timeout=LOAD_TIMEOUT_S)
+        try:
+            result = fn()
+            flight.set_result(result)
+            return result
+        except BaseException as e:
+            flight.set_exception(e)
+            raise
+        finally:
+            with self.lock:
+                self.inflight.pop(key, None)
+
+    def _fetch(self, case_id):
+        started = time.monotonic()
+        repository = get_repository()
+        case, items = repository.get_case(case_id), repository.case_ledger(case_id)
+        with self.lock:
+            self.loads += 1
+        snapshot = CaseSnapshot(case, items)
+        snapshot.checked_at = started
+        self._store(case_id, snapshot)
+        return snapshot
+
+    def _probe(self, case_id):
+        """(row count, highest id) of the case's ledger, in one small request."""
+        probe = get_repository().ledger_probe(case_id)
+        with self.lock:
+            self.probes += 1
+        return probe
+
+    def _store(self, case_id, snapshot):
+        with self.lock:
+            current = self.snapshots.get(case_id)
+            # A slower load must not overwrite a snapshot that local writes have moved past.
+            if current is None or current.checked_at <= snapshot.checked_at:
+                self.snapshots[case_id] = snapshot
+
+    def get(self, case_id):
+        """The case's snapshot, re-checked against the ledger if the last check is old."""
+        snapshot = self.snapshots.get(case_id)
+        if snapshot is None:
+            return self._single_flight(("load", case_id), lambda: self._fetch(case_id))
+        if time.monotonic() - snapshot.checked_at < self.probe_interval:
+            return snapshot
+        count, max_id = self._single_flight(("probe", case_id), lambda: self._probe(case_id))
+        if count == len(snapshot.items) and max_id == snapshot.max_id:
+            snapshot.checked_at = time.monotonic()
+            return snapshot
+        return self._single_flight(("load", case_id), lambda: self._fetch(case_id))
+
+    def update(self, case_id, added=(), removed=()):
+        with self.lock:
+            snapshot = self.snapshots.get(case_id)
+            if snapshot is not None:
+                self.snapshots[case_id] = snapshot.with_rows(added, removed)
+
+    def drop(self, case_id):
+        with self.lock:
+            self.snapshots.pop(case_id, None)
+
+
+@st.cache_resource(show_spinner=False)
+def get_snapshot_store():
+    """Returns the process-wide snapshot store."""
+    return SnapshotStore()
+
+
+def load_case_snapshot(case_id):
+    """The case row and its ledger (newest first) as a shared `CaseSnapshot`."""
+    return get_snapshot_store().get(case_id)
+
+
+def apply_insert(case_id, rows):
+    """Adds rows this process just wrote to the ledger to the cached snapshot."""
+    if rows:
+        get_snapshot_store().update(case_id, added=rows)
+
+
+def apply_delete(case_id, row_ids):
+    """Removes ledger rows this process just deleted from the cached snapshot."""
+    get_snapshot_store().update(case_id, removed=row_ids)
+
+
+@st.cache_data(ttl=CACHE_TTL_S, show_spinner=False)
+def _case_files():
+    return get_repository().list_cases()
+
+
+def fetch_case_files():
+    """Returns every investigation, newest first."""
+    try: return _case_files()
+    except Exception: return []
+
+
+def invalidate_cases(case_id=None):
+    """Call after creating or deleting a case; drops its snapshot when `case_id` is given."""
+    _case_files.clear()
+    vault.invalidate_cases()
+    invalidate_dashboard()
+    if case_id is not None:
+        get_snapshot_store().drop(case_id)
@@ -0,0 +1,64 @@
+"""Process-wide pooled clients, created once and shared across reruns and sessions.
+
+Heavy SDKs (supabase, openai) are imported on first use rather than at page load.
+"""
+import requests
+import streamlit as st
+from requests.adapters import HTTPAdapter
+
+from daylight.config import load_config
+from daylight.tracing import instrument_supabase, wrap_adapter
+
+PROJECT_URL = "https://github.com/vitkusr-lang/project-daylight"
+USER_AGENT = "Mozilla/5.0 (compatible; ProjectDaylight/1.0; +{contact})"
+HTTP_POOL_SIZE = 16
+
+
+@st.cache_resource(show_spinner=False)
+def get_supabase():
+    """Returns the shared Supabase client (requests traced per rerun), or None when credentials are missing."""
+    config = load_config()
+    if not (config["SUPABASE_URL"] and config["SUPABASE_KEY"]):
+        return None
+    from supabase import create_client
+    return instrument_supabase(create_client(config["SUPABASE_URL"], config["SUPABASE_KEY"]))
+
+
+@st.cache_resource(show_spinner=False)
+def get_openai():
+    """Returns the shared OpenAI client, or None when the API key is missing."""
+    config = load_config()
+    if not config["OPENAI_API_KEY"]:
+        return None
+    from openai import OpenAI
+    return OpenAI(api_key=config["OPENAI_API_KEY"])
+
+
+def user_agent():
+    """Identifies the app to the sites it fetches (Wikimedia's User-Agent policy asks for
+    contact details); DAYLIGHT_CONTACT adds the operator's email address."""
+    contact = load_config()["DAYLIGHT_CONTACT"]
+    return USER_AGENT.format(contact=f"{PROJECT_URL}; {contact}" if contact else PROJECT_URL)
+
+
+def _session(adapter):
+    adapter = wrap_adapter(adapter)
+    session = requests.Session()
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    session.headers.update({"User-Agent": user_agent()})
+    return session
+
+
+@st.cache_resource(show_spinner=False)
+def get_http_session():
+    """Returns the shared requests session with a connection pool sized for concurrent fetches."""
+    return _session(HTTPAdapter(pool_connections=HTTP_POOL_SIZE, pool_maxsize=HTTP_POOL_SIZE))
+
+
+@st.cache_resource(show_spinner=False)
+def get_cached_session():
+    """Returns the shared session for analyst fetches (source URLs, Wikipedia), backed by
+    the persistent HTTP cache so a page fetched by anyone is reused by everyone."""
+    from daylight.http_cache import CachingAdapter, get_http_cache
+    return _session(CachingAdapter(get_http_cache(), pool_connections=HTTP_POOL_SIZE, pool_maxsize=HTTP_POOL_SIZE))
@@ -0,0 +1,19 @@
+"""Credential loader shared by every page: Streamlit secrets first, environment second."""
+import os
+
+import streamlit as st
+
+CONFIG_KEYS = ("SUPABASE_URL", "SUPABASE_KEY", "OPENAI_API_KEY", "DAYLIGHT_ADMIN_KEY",
+               "DAYLIGHT_BACKEND", "DAYLIGHT_DB_PATH", "DAYLIGHT_CONTACT")
+
+
+@st.cache_resource(show_spinner=False)
+def load_config():
+    """Returns {key: value or None} for every key in CONFIG_KEYS."""
+    config = {}
+    for key in CONFIG_KEYS:
+        try:
+            config[key] = st.secrets[key]
+        except Exception:
+            config[key] = os.environ.get(key)
+    return config
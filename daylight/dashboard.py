@@ -0,0 +1,33 @@
+"""Command Center numbers from a single RPC (sql/008_dashboard_stats.sql).
+
+The counters are maintained by triggers in the database, so the landing page
+costs one round trip however large the archive grows. The result is cached for
+a few seconds in Streamlit's process-wide data cache, shared by every session.
+"""
+import streamlit as st
+
+from daylight.repository import get_repository
+
+STATS_TTL_S = 15
+FLASH_ITEMS = 3
+BOARD_CASES = 24
+EMPTY_STATS = {"active_cases": 0, "signals": 0, "evidence": 0, "flash": [], "cases": []}
+
+
+@st.cache_data(ttl=STATS_TTL_S, show_spinner=False)
+def _stats(recent_limit, case_limit):
+    return get_repository().dashboard_stats(recent_limit, case_limit)
+
+
+def fetch_dashboard_stats(recent_limit=FLASH_ITEMS, case_limit=BOARD_CASES):
+    """Returns {"active_cases", "signals", "evidence", "flash", "cases"}.
+
+    flash: the newest headlines [{source, title, created_at}]; cases: the newest
+    active investigations [{id, title, status}], at most `case_limit`.
+    """
+    try: return {**EMPTY_STATS, **(_stats(recent_limit, case_limit) or {})}
+    except Exception: return dict(EMPTY_STATS)
+
+
+def invalidate_dashboard():
+    _stats.clear()
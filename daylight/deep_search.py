@@ -0,0 +1,62 @@
+"""Wikipedia deep search behind the Investigations "Dig" action.
+
+One MediaWiki API call per entity searches and returns the top pages' intro
+summaries and canonical URLs together (generator=search + extracts + info), in
+place of a search followed by a full page load per result. Several entities are
+looked up in parallel on a bounded pool, at most MAX_DIG_ENTITIES per action, and
+every request goes through the shared HTTP cache with the app's identifying
+User-Agent (clients.user_agent).
+"""
+from concurrent.futures import ThreadPoolExecutor
+
+from daylight.clients import get_cached_session
+from daylight.tracing import propagate
+
+WIKI_API = "https://en.wikipedia.org/w/api.php"
+RESULTS_PER_ENTITY = 3
+SUMMARY_CHARS = 200
+MAX_CONCURRENCY = 8
+MAX_DIG_ENTITIES = 25        # API calls one "Dig all" click may make
+# The API marks responses private (uncacheable) unless a lifetime is requested.
+CACHE_MAXAGE_S = 24 * 3600
+
+
+def wikipedia_leads(query, limit=RESULTS_PER_ENTITY, session=None, timeout=10):
+    """Returns up to `limit` leads [{"title", "href", "body"}] for a query, best match first."""
+    params = {
+        "action": "query", "format": "json", "formatversion": 2,
+        "generator": "search", "gsrsearch": query, "gsrlimit": limit,
+        "prop": "extracts|info", "exintro": 1, "explaintext": 1, "exlimit": limit, "inprop": "url",
+        "maxage": CACHE_MAXAGE_S, "smaxage": CACHE_MAXAGE_S,
+    }
+    session = session or get_cached_session()
+    response = session.get(WIKI_API, params=params, timeout=timeout)
+    response.raise_for_status()
+    pages = sorted(response.json().get("query", {}).get("pages", []), key=lambda p: p.get("index", 0))
+    return [{
+        "title": f"📂 Archive: {page['title']}",
+        "href": page.get("fullurl") or page.get("canonicalurl"),
+        "body": (page.get("extract") or "")[:SUMMARY_CHARS] + "...",
+    } for page in pages if page.get("fullurl") or page.get("canonicalurl")]
+
+
+def dig_entities(names, limit=RESULTS_PER_ENTITY, max_workers=MAX_CONCURRENCY, max_entities=MAX_DIG_ENTITIES):
+    """Looks up the first `max_entities` names in parallel. Returns {name: [leads]}; failed lookups map to []."""
+    names = names[:max_entities]
+    if not names:
+        return {}
+    # Resolve the shared session here so worker threads never touch Streamlit's caches.
+    session = get_cached_session()
+
+    def lookup(name):
+        try: return wikipedia_leads(name, limit, session=session)
+        except Exception: return []
+
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(names))) as pool:
+        return dict(zip(names, pool.map(propagate(lookup), names)))
+
+
+def lead_rows(case_id, leads):
+    """Turns leads into "Lead" ledger rows (Markdown links)."""
+    return [{"investigation_id": case_id, "type": "Lead", "content": f"[{lead['title']}]({lead['href']})"}
+            for lead in leads]
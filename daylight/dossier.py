@@ -0,0 +1,266 @@
+"""PDF mission dossiers, written page by page and cached per ledger version.
+
+The ledger is grouped in one pass. The PDF is written straight to a file with a
+minimal streaming writer: each page's content stream is compressed and flushed
+when the page fills, so only one page is ever held in memory. Finished dossiers
+are kept on disk under (case id, ledger version, case header, date), so an
+unchanged case downloads without being re-rendered and the cover date is always
+today's.
+"""
+import hashlib
+import os
+import time
+import zlib
+
+from daylight.font_metrics import HELVETICA, HELVETICA_BOLD
+
+CACHE_DIR = os.path.join(os.environ.get("DAYLIGHT_CACHE_DIR", ".daylight_cache"), "dossiers")
+MAX_DOSSIERS = 64
+
+MM = 72 / 25.4
+PAGE_W, PAGE_H = 210 * MM, 297 * MM
+MARGIN = 10 * MM
+BOTTOM = PAGE_H - 20 * MM
+FONTS = {"": ("F1", "Helvetica", HELVETICA), "B": ("F2", "Helvetica-Bold", HELVETICA_BOLD),
+         "I": ("F3", "Helvetica-Oblique", HELVETICA)}
+
+
+def sanitize(text):
+    return text.encode('latin-1', 'replace').decode('latin-1')
+
+
+class StreamingPDF:
+    """Write-once PDF with the core Helvetica fonts; pages are flushed as they fill.
+
+    Mirrors the small part of FPDF the dossier uses (cell, multi_cell, line, ln),
+    with sizes in millimetres.
+    """
+
+    def __init__(self, out):
+        self.out = out
+        self.offsets = {}
+        self.kids = []
+        self.next_id = 3 + len(FONTS)   # 1 catalog, 2 page tree, then fonts
+        self.page = None
+        self.y = MARGIN
+        self.style, self.size = "", 10
+        self._write(b"%PDF-1.4\n%\xe2\xe3\xcf\xd3\n")
+        self._object(1, b"<< /Type /Catalog /Pages 2 0 R >>")
+        for i, (_, base, _) in enumerate(FONTS.values()):
+            self._object(3 + i, f"<< /Type /Font /Subtype /Type1 /BaseFont /{base} /Encoding /WinAnsiEncoding >>".encode())
+        self.resources = " ".join(f"/{ref} {3 + i} 0 R" for i, (ref, _, _) in enumerate(FONTS.values()))
+        self.add_page()
+
+    def _write(self, data):
+        self.out.write(data)
+
+    def _object(self, obj_id, body):
+        self.offsets[obj_id] = self.out.tell()
+        self._write(b"%d 0 obj\n" % obj_id + body + b"\nendobj\n")
+
+    def _flush_page(self):
+        if self.page is None:
+            return
+        content = zlib.compress("\n".join(self.page).encode("latin-1"))
+        content_id, page_id = self.next_id, self.next_id + 1
+        self.next_id += 2
+        self._object(content_id, b"<< /Length %d /Filter /FlateDecode >>\nstream\n" % len(content) + content + b"\nendstream")
+        self._object(page_id, (f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 {PAGE_W:.2f} {PAGE_H:.2f}] "
+                               f"/Resources << /Font << {self.resources} >> >> /Contents {content_id} 0 R >>").encode())
+        self.kids.append(page_id)
+        self.page = None
+
+    def add_page(self):
+        self._flush_page()
+        self.page = []
+        self.y = MARGIN
+
+    def set_font(self, style, size):
+        self.style, self.size = style, size
+
+    def width(self, text):
+        widths = FONTS[self.style][2]
+        return sum(widths[ord(ch)] if ord(ch) < 256 else 600 for ch in text) * self.size / 1000
+
+    def _text(self, x, text, h):
+        if self.y + h > BOTTOM:
+            self.add_page()
+        baseline = PAGE_H - (self.y + h / 2 * MM + 0.3 * self.size)
+        escaped = text.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+        self.page.append(f"BT /{FONTS[self.style][0]} {self.size} Tf {x:.2f} {baseline:.2f} Td ({escaped}) Tj ET")
+        self.y += h * MM
+
+    def cell(self, h, text, align="L"):
+        text = sanitize(text)
+        x = MARGIN + 1 * MM
+        if align == "C":
+            x = (PAGE_W - self.width(text)) / 2
+        self._text(x, text, h)
+
+    def _split_word(self, word, limit):
+        """Breaks a word wider than `limit` (a long URL) into pieces that fit."""
+        pieces, piece, piece_width = [], "", 0.0
+        for ch in word:
+            ch_width = self.width(ch)
+            if piece and piece_width + ch_width > limit:
+                pieces.append(piece)
+                piece, piece_width = "", 0.0
+            piece += ch
+            piece_width += ch_width
+        return pieces + [piece]
+
+    def multi_cell(self, h, text):
+        """Word-wrapped text block; words wider than the line are broken between characters."""
+        limit = PAGE_W - 2 * MARGIN - 2 * MM
+        space = self.width(" ")
+        for paragraph in sanitize(text).split("\n"):
+            line, line_width = [], 0.0
+            for word in paragraph.split(" "):
+                word_width = self.width(word)
+                if word_width > limit:
+                    if line:
+                        self._text(MARGIN + 1 * MM, " ".join(line), h)
+                    *full, word = self._split_word(word, limit)
+                    for piece in full:
+                        self._text(MARGIN + 1 * MM, piece, h)
+                    line, line_width = [word], self.width(word)
+                    continue
+                if line and line_width + space + word_width > limit:
+                    self._text(MARGIN + 1 * MM, " ".join(line), h)
+                    line, line_width = [], 0.0
+                line_width += word_width + (space if line else 0)
+                line.append(word)
+            self._text(MARGIN + 1 * MM, " ".join(line), h)
+
+    def line(self, x1, y1, x2, y2):
+        self.page.append(f"{x1 * MM:.2f} {PAGE_H - y1 * MM:.2f} m {x2 * MM:.2f} {PAGE_H - y2 * MM:.2f} l S")
+
+    def ln(self, h):
+        self.y += h * MM
+
+    def close(self):
+        self._flush_page()
+        kids = " ".join(f"{k} 0 R" for k in self.kids)
+        self._object(2, f"<< /Type /Pages /Kids [{kids}] /Count {len(self.kids)} >>".encode())
+        xref = self.out.tell()
+        count = max(self.offsets) + 1
+        self._write(b"xref\n0 %d\n0000000000 65535 f \n" % count)
+        self._write(b"".join(b"%010d 00000 n \n" % self.offsets[i] for i in range(1, count)))
+        self._write(b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (count, xref))
+
+
+def group_ledger(items):
+    """Splits ledger rows into entities, relationships, hypotheses and leads in one pass."""
+    groups = {"entities": [], "relationships": [], "hypotheses": [], "leads": []}
+    for item in items:
+        kind = item['type']
+        if "Entity" in kind: groups["entities"].append(item)
+        elif "Relationship" in kind: groups["relationships"].append(item)
+        elif "Hypothesis" in kind: groups["hypotheses"].append(item)
+        elif "Lead" in kind: groups["leads"].append(item)
+    return groups
+
+
+def write_dossier(out, case_data, intel_data, key_players=None, date=None):
+    """Writes the mission report PDF for a case to the binary file `out`, dated `date` (default today)."""
+    groups = group_ledger(intel_data)
+    pdf = StreamingPDF(out)
+
+    pdf.set_font("B", 20)
+    pdf.cell(10, f"OPERATION: {case_data['title'].upper()}", align="C")
+    pdf.set_font("I", 10)
+    pdf.cell(10, f"Status: {case_data['status']} | Date: {date or time.strftime('%Y-%m-%d')}", align="C")
+    pdf.line(10, 30, 200, 30)
+    pdf.ln(10)
+
+    pdf.set_font("B", 12)
+    pdf.cell(10, "1. MISSION OBJECTIVE")
+    pdf.set_font("", 11)
+    pdf.multi_cell(7, case_data.get('description') or "")
+    pdf.ln(5)
+
+    pdf.set_font("B", 12)
+    pdf.cell(10, "2. VERIFIED ENTITIES")
+    pdf.set_font("", 10)
+    if not groups["entities"]:
+        pdf.cell(7, "No entities confirmed.")
+    for ent in groups["entities"]:
+        pdf.cell(7, f"- {ent['content']} ({ent['type'].replace('Entity: ', '')})")
+    pdf.ln(5)
+
+    pdf.set_font("B", 12)
+    pdf.cell(10, "3. KEY PLAYERS (NETWORK CENTRALITY)")
+    pdf.set_font("", 10)
+    if not key_players:
+        pdf.cell(7, "No connections to rank.")
+    for rank, player in enumerate(key_players or [], 1):
+        pdf.cell(7, f"{rank}. {player['name']} ({player['type']}) - PageRank {player['pagerank']:.3f}, "
+                    f"{player['degree']} direct links, cluster #{player['community'] + 1}")
+    pdf.ln(5)
+
+    pdf.set_font("B", 12)
+    pdf.cell(10, "4. ESTABLISHED CONNECTIONS")
+    pdf.set_font("", 10)
+    if not groups["relationships"]:
+        pdf.cell(7, "No connections mapped.")
+    for link in groups["relationships"]:
+        parts = link['content'].split('|')
+        if len(parts) == 3:
+            pdf.cell(7, f"- {parts[0]} -> {parts[1]} -> {parts[2]}")
+    pdf.ln(5)
+
+    pdf.set_font("B", 12)
+    pdf.cell(10, "5. ANALYST HYPOTHESES")
+    pdf.set_font("", 10)
+    if not groups["hypotheses"]:
+        pdf.cell(7, "No hypotheses generated.")
+    for h in groups["hypotheses"]:
+        pdf.multi_cell(7, f"* {h['content']}")
+    pdf.ln(5)
+
+    pdf.set_font("B", 12)
+    pdf.cell(10, "6. ARCHIVE LEADS")
+    pdf.set_font("", 10)
+    if not groups["leads"]:
+        pdf.cell(7, "No leads found.")
+    for l in groups["leads"]:
+        clean_lead = l['content']
+        if "](" in clean_lead:
+            title, url = clean_lead.split("](", 1)
+            clean_lead = f"{title.replace('[', '')}: {url.replace(')', '')}"
+        pdf.multi_cell(6, f"- {clean_lead.replace('📂', '').replace('📍', '').strip()}")
+
+    pdf.close()
+
+
+def dossier_path(case_data, version, date):
+    """Cache file for a case at one ledger version, rendered on `date`; the header fields are part of the key."""
+    header = f"{case_data['title']}|{case_data['status']}|{case_data.get('description')}"
+    digest = hashlib.sha256(header.encode("utf-8")).hexdigest()[:12]
+    return os.path.join(CACHE_DIR, f"{case_data['id']}-{version.replace(':', '_')}-{date}-{digest}.pdf")
+
+
+def cached_dossier(case_data, version):
+    """Path of a dossier already rendered today for this ledger version, or None."""
+    path = dossier_path(case_data, version, time.strftime('%Y-%m-%d'))
+    return path if os.path.exists(path) else None
+
+
+def build_dossier(case_data, intel_data, version, key_players=None):
+    """Renders today's dossier to the cache (atomically) and returns its path."""
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    date = time.strftime('%Y-%m-%d')   # once, so the file name and the cover agree across midnight
+    path = dossier_path(case_data, version, date)
+    partial = f"{path}.{os.getpid()}.part"
+    with open(partial, "wb") as out:
+        write_dossier(out, case_data, intel_data, key_players, date)
+    os.replace(partial, path)
+    _evict()
+    return path
+
+
+def _evict():
+    entries = sorted((e for e in os.scandir(CACHE_DIR) if e.name.endswith(".pdf")), key=lambda e: e.stat().st_mtime)
+    for entry in entries[:-MAX_DOSSIERS]:
+        try: os.remove(entry.path)
+        except OSError: pass
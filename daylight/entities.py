@@ -0,0 +1,189 @@
+"""Entity resolution for the intelligence ledger.
+
+Names are normalized (accents, case, punctuation, honorifics) and looked up in an
+alias hash index, so "Vladimir Putin", "Putin" and "V. Putin" resolve to one
+canonical entity in O(1). Names not yet known are matched against candidates that
+share a cheap blocking key (a name token, prefix or acronym), then scored: initials /
+surname compatibility, acronyms ("UN" = "United Nations") and a fuzzy ratio for
+spelling variants ("Zelensky" / "Zelenskyy"). A bare surname joins a full name only
+when exactly one person in the case has that surname, and never absorbs full names
+itself: after "Mr. Smith", "John Smith" and "Jane Smith" stay two people.
+
+Aliases are persisted as "Alias" ledger rows with content "alias|canonical".
+`case_entity_index` builds a case's index once per ledger version and shares it,
+like the case graph.
+"""
+import re
+import unicodedata
+from collections import defaultdict
+from difflib import SequenceMatcher
+
+import streamlit as st
+
+ALIAS_TYPE = "Alias"
+FUZZY_THRESHOLD = 0.9
+MAX_INDEXES = 32
+MAX_BLOCK = 64   # a key shared by more entities than this is too common to narrow anything
+HONORIFICS = {"mr", "mrs", "ms", "dr", "sir", "president", "pres", "prime", "minister", "pm", "gen",
+              "general", "col", "sen", "senator", "rep", "gov", "governor", "king", "queen", "prince"}
+STOPWORDS = {"of", "the", "and", "for", "de", "la", "&"}
+
+_PUNCT = re.compile(r"[^\w\s]")
+_NUMBER = re.compile(r"\d+")
+
+
+def normalize(name):
+    """Casefolded, accent- and punctuation-free name with leading honorifics removed."""
+    text = unicodedata.normalize("NFKD", name)
+    text = "".join(ch for ch in text if not unicodedata.combining(ch))
+    tokens = _PUNCT.sub(" ", text.casefold()).split()
+    while len(tokens) > 1 and tokens[0] in HONORIFICS:
+        tokens.pop(0)
+    # Collapse runs of single letters ("U.N." -> "u n" -> "un"), keeping a lone initial.
+    merged, run = [], []
+    for token in tokens + [""]:
+        if len(token) == 1:
+            run.append(token)
+            continue
+        merged.extend(["".join(run)] if len(run) > 1 else run)
+        run = []
+        if token:
+            merged.append(token)
+    return " ".join(merged)
+
+
+def _acronym(tokens):
+    return "".join(t[0] for t in tokens if t not in STOPWORDS)
+
+
+def blocking_keys(norm):
+    """Cheap keys that any plausible alias shares with its canonical name."""
+    tokens = norm.split()
+    keys = {f"t:{t}" for t in tokens if len(t) > 2 and t not in STOPWORDS}
+    # Prefix keys catch transliteration variants ("zelensky" / "zelenskyy").
+    keys |= {f"p:{t[:5]}" for t in tokens if len(t) >= 6}
+    if len(tokens) > 1:
+        keys.add(f"a:{_acronym(tokens)}")
+    elif 2 <= len(norm) <= 6:
+        keys.add(f"a:{norm}")
+    return keys
+
+
+def _tokens_compatible(short, long):
+    """Every token of `short` matches a token of `long` in order, as a word, prefix or initial."""
+    it = iter(long)
+    return all(any(t.startswith(s) for t in it) for s in short)
+
+
+def _fuzzy(a, b):
+    """SequenceMatcher ratio, skipping the full computation when the cheap bounds already fail."""
+    matcher = SequenceMatcher(None, a, b)
+    if matcher.real_quick_ratio() < FUZZY_THRESHOLD or matcher.quick_ratio() < FUZZY_THRESHOLD:
+        return 0.0
+    return matcher.ratio()
+
+
+def _same_word(a, b):
+    return a == b or (min(len(a), len(b)) >= 5 and _fuzzy(a, b) >= FUZZY_THRESHOLD)
+
+
+def similarity(a, b, kind):
+    """Scores how likely two normalized names of the same type are one entity (0..1)."""
+    if a == b:
+        return 1.0
+    if _NUMBER.findall(a) != _NUMBER.findall(b):
+        return 0.0  # "Unit 12" is never "Unit 13"
+    ta, tb = a.split(), b.split()
+    short, long = (ta, tb) if len(ta) <= len(tb) else (tb, ta)
+    if len(short) == 1 and len(long) > 1 and short[0] == _acronym(long) and len(short[0]) > 1:
+        return 0.95
+    # Needs a given name or initial to agree ("V. Putin"); bare surnames are left to match().
+    if kind == "person" and (len(short) > 1 or len(long) == 1) and _same_word(short[-1], long[-1]) \
+            and _tokens_compatible(short[:-1], long[:-1]):
+        return min(0.94, 0.91 + 0.01 * len(short))  # more matched tokens -> more specific
+    return _fuzzy(a, b)
+
+
+class EntityIndex:
+    """Canonical entities plus a hash index from every known alias to its canonical id."""
+
+    def __init__(self):
+        self.entities = {}               # canonical id -> {"name", "type"}
+        self.aliases = {}                # normalized alias -> canonical id
+        self.blocks = defaultdict(set)   # blocking key -> canonical ids
+
+    @classmethod
+    def from_ledger(cls, items):
+        """Builds the index from a case's ledger rows (entities and Alias rows)."""
+        index = cls()
+        entity_rows = [i for i in items if "Entity" in i['type']]
+        # Longest names first, so "Vladimir Putin" becomes canonical rather than "Putin".
+        for row in sorted(entity_rows, key=lambda r: -len(normalize(r['content']))):
+            index.resolve(row['content'], row['type'].replace("Entity: ", ""))
+        for row in items:
+            if row['type'] == ALIAS_TYPE and "|" in row['content']:
+                alias, canonical = row['content'].rsplit("|", 1)
+                cid = index.lookup(canonical)
+                if cid:
+                    index.aliases[normalize(alias)] = cid
+        return index
+
+    def copy(self):
+        """An independent copy to resolve new names into, leaving a shared index untouched."""
+        index = EntityIndex()
+        index.entities = dict(self.entities)
+        index.aliases = dict(self.aliases)
+        index.blocks = defaultdict(set, {key: set(ids) for key, ids in self.blocks.items()})
+        return index
+
+    def lookup(self, name):
+        """O(1): canonical id for a name already seen, or None."""
+        return self.aliases.get(normalize(name))
+
+    def canonical_name(self, name):
+        cid = self.lookup(name)
+        return self.entities[cid]["name"] if cid else name
+
+    def match(self, name, entity_type):
+        """Best existing canonical id for a new name, or None if nothing (or several) fit."""
+        norm = normalize(name)
+        if norm in self.aliases:
+            return self.aliases[norm]
+        kind = entity_type.casefold()
+        blocks = [self.blocks.get(k, ()) for k in blocking_keys(norm)]
+        candidates = {cid for cid in set().union(*(b for b in blocks if len(b) <= MAX_BLOCK))
+                      if self.entities[cid]["type"].casefold() == kind}
+        if kind == "person" and " " not in norm:
+            people = [cid for cid in candidates if " " in cid and _same_word(norm, cid.rsplit(" ", 1)[1])]
+            if people:
+                return people[0] if len(people) == 1 else None  # "Smith" with two Smiths on file
+        scored = sorted(((similarity(norm, cid, kind), cid) for cid in candidates), reverse=True)
+        if not scored or scored[0][0] < FUZZY_THRESHOLD:
+            return None
+        if len(scored) > 1 and scored[1][0] == scored[0][0]:
+            return None  # ambiguous, e.g. "Biden" against two different Bidens
+        return scored[0][1]
+
+    def resolve(self, name, entity_type):
+        """Returns (canonical_id, is_new), registering the name as an alias or new entity."""
+        norm = normalize(name)
+        if not norm:
+            return None, False
+        cid = self.match(name, entity_type)
+        if cid:
+            self.aliases[norm] = cid
+            return cid, False
+        self.entities[norm] = {"name": name.strip(), "type": entity_type}
+        self.aliases[norm] = norm
+        for key in blocking_keys(norm):
+            self.blocks[key].add(norm)
+        return norm, True
+
+
+@st.cache_resource(max_entries=MAX_INDEXES, show_spinner=False)
+def case_entity_index(case_id, version, _items):
+    """The case's entity index for one ledger version; rebuilt only when the ledger changes.
+
+    Shared across sessions: resolve new names into `.copy()`, never into this one.
+    """
+    return EntityIndex.from_ledger(_items)
@@ -0,0 +1,253 @@
+"""Evidence Locker pipeline: content-addressed uploads, background processing, search.
+
+An upload is hashed (SHA-256) in chunks before anything is stored. A file already
+in the locker costs one indexed lookup and no upload; a new one is stored under
+`<hash[:2]>/<hash><ext>` in chunks (resumable, see `Repository.store_evidence_file`)
+and gets a locker row in status 'pending'.
+
+Pending rows are claimed by a background worker, in this process
+(`process_in_background`) or headless (`python -m daylight.evidence_worker`).
+It reads the file once and records its media metadata (image size and EXIF,
+PDF document info), a thumbnail and the extracted text, then marks the row
+'ready' ('failed' with the error otherwise). All of it is searchable through
+`search_locker` (sql/009_evidence_pipeline.sql).
+"""
+import hashlib
+import io
+import logging
+import os
+import re
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+
+import streamlit as st
+
+from daylight.dashboard import invalidate_dashboard
+from daylight.repository import get_repository
+
+log = logging.getLogger("daylight.evidence")
+
+HASH_CHUNK_BYTES = 1024 * 1024
+THUMBNAIL_PX = 320
+MAX_TEXT_CHARS = 200_000
+MAX_PROCESS_BYTES = 100 * 1024 * 1024   # larger files are stored and indexed by name only
+CLAIM_BATCH = 10
+STALE_CLAIM_S = 900
+SEARCH_TTL_S = 30
+EXIF_FIELDS = ("Make", "Model", "Software", "DateTime", "ImageDescription", "Artist", "Copyright")
+PDF_FIELDS = {"title": "/Title", "author": "/Author", "subject": "/Subject", "keywords": "/Keywords",
+              "creator": "/Creator", "producer": "/Producer", "created": "/CreationDate"}
+MARKDOWN_SPECIAL = re.compile(r"([\\`*_{}\[\]()#+\-.!|<>~$:])")
+
+
+def _now():
+    return datetime.now(timezone.utc).isoformat(timespec="milliseconds")
+
+
+# --- UPLOAD ---
+
+def content_hash(stream):
+    """(SHA-256 hex digest, size in bytes) of a seekable stream, read in chunks."""
+    digest, size = hashlib.sha256(), 0
+    stream.seek(0)
+    while chunk := stream.read(HASH_CHUNK_BYTES):
+        digest.update(chunk)
+        size += len(chunk)
+    stream.seek(0)
+    return digest.hexdigest(), size
+
+
+def storage_key(digest, filename):
+    """Where the file with this hash is stored; the extension keeps content types obvious."""
+    ext = os.path.splitext(filename)[1].lower()
+    return f"{digest[:2]}/{digest}{ext}"
+
+
+def ingest_upload(repository, stream, filename, content_type, notes=""):
+    """Adds a file to the locker unless the same bytes are already there.
+
+    Returns (row, is_new). A new row is 'pending' until the worker has processed it.
+    """
+    digest, size = content_hash(stream)
+    existing = repository.find_evidence(digest)
+    if existing:
+        return existing, False
+    key = storage_key(digest, filename)
+    url = repository.store_evidence_file(key, stream, size, content_type)
+    row = repository.add_evidence({
+        "filename": filename, "file_url": url, "media_type": content_type.split('/')[0], "description": notes,
+        "content_hash": digest, "storage_key": key, "size_bytes": size, "mime_type": content_type, "status": "pending",
+    })
+    invalidate_evidence()
+    invalidate_dashboard()
+    return row, True
+
+
+# --- PROCESSING ---
+
+def _gps(gps_ifd):
+    """Decimal (lat, lon) from an EXIF GPS block, or None."""
+    try:
+        def degrees(dms, ref):
+            value = float(dms[0]) + float(dms[1]) / 60 + float(dms[2]) / 3600
+            return -value if ref in ("S", "W") else value
+        return round(degrees(gps_ifd[2], gps_ifd[1]), 6), round(degrees(gps_ifd[4], gps_ifd[3]), 6)
+    except Exception: return None
+
+
+def _thumbnail(image):
+    from PIL import ImageOps
+    image = ImageOps.exif_transpose(image).convert("RGB")
+    image.thumbnail((THUMBNAIL_PX, THUMBNAIL_PX))
+    out = io.BytesIO()
+    image.save(out, "JPEG", quality=80)
+    return out.getvalue()
+
+
+def describe_image(data):
+    """(metadata, text, thumbnail JPEG) for an image: format, size and the useful EXIF fields."""
+    from PIL import ExifTags, Image
+
+    with Image.open(io.BytesIO(data)) as image:
+        metadata = {"format": image.format, "width": image.width, "height": image.height, "mode": image.mode}
+        exif = image.getexif()
+        tags = {ExifTags.TAGS.get(tag, tag): value for tag, value in exif.items()}
+        tags.update({ExifTags.TAGS.get(tag, tag): value for tag, value in exif.get_ifd(ExifTags.IFD.Exif).items()})
+        for field in EXIF_FIELDS + ("DateTimeOriginal",):
+            value = tags.get(field)
+            if isinstance(value, bytes): value = value.decode("utf-8", "replace")
+            if isinstance(value, str) and value.strip("\x00 "):
+                metadata[field[0].lower() + field[1:]] = value.strip("\x00 ")
+        gps = _gps(exif.get_ifd(ExifTags.IFD.GPSInfo))
+        if gps: metadata["gps"] = {"lat": gps[0], "lon": gps[1]}
+        return metadata, "", _thumbnail(image)
+
+
+def describe_pdf(data):
+    """(metadata, text, thumbnail JPEG) for a PDF: document info, page count and the text layer.
+
+    The thumbnail is the first image on the first page, if there is one.
+    """
+    from PIL import Image
+    from pypdf import PdfReader
+
+    reader = PdfReader(io.BytesIO(data))
+    metadata = {"format": "PDF"}
+    if reader.is_encrypted:
+        metadata["encrypted"] = True
+        if not reader.decrypt(""):   # password-protected: the document info is unreadable too
+            return metadata, "", None
+    metadata["pages"] = len(reader.pages)
+    info = reader.metadata or {}
+    for field, key in PDF_FIELDS.items():
+        value = info.get(key)
+        if value: metadata[field] = str(value).strip()
+
+    text, total = [], 0
+    for page in reader.pages:
+        try: chunk = page.extract_text() or ""
+        except Exception: continue
+        text.append(chunk)
+        total += len(chunk)
+        if total >= MAX_TEXT_CHARS: break
+
+    thumbnail = None
+    try:
+        images = reader.pages[0].images if reader.pages else []
+        if images:
+            with Image.open(io.BytesIO(images[0].data)) as image:
+                thumbnail = _thumbnail(image)
+    except Exception: pass
+    return metadata, "\n".join(text)[:MAX_TEXT_CHARS], thumbnail
+
+
+def describe(data, mime_type):
+    """(metadata, extracted text, thumbnail JPEG or None) for a stored file."""
+    mime_type = mime_type or ""
+    if mime_type.startswith("image/"):
+        return describe_image(data)
+    if mime_type == "application/pdf":
+        return describe_pdf(data)
+    if mime_type.startswith("text/"):
+        return {"format": "text"}, data.decode("utf-8", "replace")[:MAX_TEXT_CHARS], None
+    return {}, "", None
+
+
+def process_evidence(repository, row):
+    """Extracts one claimed row's metadata, text and thumbnail and marks it ready (or failed)."""
+    try:
+        if (row.get('size_bytes') or 0) > MAX_PROCESS_BYTES:
+            metadata, text, thumbnail = {"skipped": "too large to process"}, "", None
+        else:
+            metadata, text, thumbnail = describe(repository.read_evidence_file(row['storage_key']), row.get('mime_type'))
+        fields = {"status": "ready", "metadata": metadata, "extracted_text": text or None,
+                  "processed_at": _now(), "processing_error": None}
+        if thumbnail:
+            fields["thumbnail_url"] = repository.store_evidence_file(
+                f"thumbs/{row['content_hash']}.jpg", io.BytesIO(thumbnail), len(thumbnail), "image/jpeg")
+        repository.update_evidence(row['id'], fields)
+        return True
+    except Exception as e:
+        log.warning("processing evidence %s failed: %s", row.get('id'), e)
+        repository.update_evidence(row['id'], {"status": "failed", "processing_error": str(e)[:500], "processed_at": _now()})
+        return False
+
+
+def process_pending(repository, batch_size=CLAIM_BATCH, stale_after_s=STALE_CLAIM_S):
+    """Claims and processes pending rows until none are left. Returns the number processed."""
+    total = 0
+    while True:
+        rows = repository.claim_evidence(batch_size, stale_after_s)
+        for row in rows:
+            process_evidence(repository, row)
+        total += len(rows)
+        if rows:
+            invalidate_evidence()
+        if len(rows) < batch_size:
+            return total
+
+
+@st.cache_resource(show_spinner=False)
+def get_evidence_processor():
+    """One background thread per process, so uploads never wait on processing."""
+    return ThreadPoolExecutor(max_workers=1, thread_name_prefix="daylight-evidence")
+
+
+def process_in_background(repository):
+    """Queues a processing pass; rows another worker has claimed are left to it."""
+    def run():
+        try: process_pending(repository)
+        except Exception as e: log.warning("evidence processing pass failed: %s", e)
+    return get_evidence_processor().submit(run)
+
+
+# --- SEARCH ---
+
+@st.cache_data(ttl=SEARCH_TTL_S, show_spinner=False)
+def _search(query, limit):
+    return get_repository().search_evidence(query, limit)
+
+
+def search_locker(query, limit=20):
+    """Ranked full-text search over the locker: file names, notes, metadata and extracted text.
+
+    Accepts web-search syntax. Rows carry a `rank` and a `snippet` with matches in <b></b>.
+    """
+    query = query.strip()
+    if not query: return []
+    try: return _search(query, limit)
+    except Exception: return []
+
+
+def markdown_text(text):
+    """`text` backslash-escaped so st.markdown / st.caption show it literally."""
+    return MARKDOWN_SPECIAL.sub(r"\\\1", text or "")
+
+
+def snippet_markdown(snippet):
+    """A search snippet as markdown: the text escaped, the <b></b> matches in bold."""
+    return "**".join(markdown_text(part) for part in re.split(r"</?b>", snippet))
+
+
+def invalidate_evidence():
+    _search.clear()
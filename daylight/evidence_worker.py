@@ -0,0 +1,46 @@
+"""Headless worker that processes Evidence Locker uploads.
+
+Claims pending locker rows in batches (sql/009_evidence_pipeline.sql), extracts
+each file's media metadata, text and thumbnail, and marks it ready. Several
+workers can run side by side: a claim skips rows another worker holds, and rows
+whose worker died are handed out again after `--stale-after` seconds.
+
+    python -m daylight.evidence_worker            # poll every --interval seconds
+    python -m daylight.evidence_worker --once     # process everything pending, then exit
+"""
+import argparse
+import logging
+import time
+
+from daylight.evidence import CLAIM_BATCH, STALE_CLAIM_S, process_pending
+from daylight.repository import get_repository
+
+log = logging.getLogger("daylight.evidence")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Daylight evidence processing worker")
+    parser.add_argument("--once", action="store_true", help="process everything pending once, then exit")
+    parser.add_argument("--batch-size", type=int, default=CLAIM_BATCH, help="rows claimed at a time")
+    parser.add_argument("--stale-after", type=float, default=STALE_CLAIM_S, help="seconds before an unfinished claim is retried")
+    parser.add_argument("--interval", type=float, default=10, help="seconds between polls")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
+
+    repository = get_repository()
+    if not repository:
+        raise SystemExit("SUPABASE_URL / SUPABASE_KEY are not configured (or set DAYLIGHT_BACKEND=sqlite).")
+    while True:
+        try:
+            processed = process_pending(repository, args.batch_size, args.stale_after)
+            if processed or args.once:
+                log.info("processed %d evidence files", processed)
+        except Exception as e:
+            log.warning("processing run failed: %s", e)
+        if args.once:
+            return
+        time.sleep(args.interval)
+
+
+if __name__ == "__main__":
+    main()
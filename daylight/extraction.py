@@ -0,0 +1,125 @@
+"""Map-reduce entity/relationship extraction for long source documents.
+
+Long text is split on paragraph and sentence boundaries into chunks under a token
+budget. Chunks are extracted in parallel (capped concurrency), and the per-chunk
+results are merged with duplicates removed, so a full report costs about the
+wall-clock time of one model call instead of being truncated.
+"""
+import json
+import logging
+import re
+from concurrent.futures import ThreadPoolExecutor
+
+from daylight.clients import get_openai
+from daylight.llm import chat, get_response_cache
+from daylight.tracing import propagate
+
+log = logging.getLogger("daylight.extraction")
+
+CHUNK_TOKENS = 4000
+CHARS_PER_TOKEN = 4          # rough English average; avoids a tokenizer dependency
+MAX_CONCURRENCY = 8
+MAX_SOURCE_CHARS = 400_000   # hard ceiling per source (~100k tokens)
+
+EXTRACTION_PROMPT = """
+    You are an Intelligence Analyst. Extract:
+    1. Entities (People, Organizations, Events).
+    2. Relationships (Source -> Label -> Target).
+
+    IMPORTANT: Return ONLY valid raw JSON. Do not use Markdown blocks (```json).
+    Format: {"entities": [{"name": "X", "type": "Person"}], "relationships": [{"source": "X", "target": "Y", "label": "Z"}]}
+    """
+
+_PARAGRAPH_BREAK = re.compile(r"\n\s*\n")
+_SENTENCE_END = re.compile(r"(?<=[.!?])\s+")
+
+
+def estimate_tokens(text):
+    return len(text) // CHARS_PER_TOKEN + 1
+
+
+def _pieces(paragraph, budget):
+    """Yields sentence runs of a paragraph, hard-splitting any sentence longer than budget."""
+    for sentence in _SENTENCE_END.split(paragraph):
+        while len(sentence) > budget:
+            cut = sentence.rfind(" ", 0, budget)
+            cut = cut if cut > budget // 2 else budget
+            yield sentence[:cut]
+            sentence = sentence[cut:].lstrip()
+        if sentence:
+            yield sentence
+
+
+def split_text(text, max_tokens=CHUNK_TOKENS):
+    """Splits text into chunks under max_tokens, breaking on paragraphs, then sentences."""
+    budget = max_tokens * CHARS_PER_TOKEN
+    chunks, current = [], ""
+    for paragraph in _PARAGRAPH_BREAK.split(text):
+        paragraph = paragraph.strip()
+        if not paragraph:
+            continue
+        pieces = [paragraph] if len(paragraph) <= budget else _pieces(paragraph, budget)
+        for piece in pieces:
+            joiner = "\n\n" if piece is paragraph else " "
+            if current and len(current) + len(joiner) + len(piece) > budget:
+                chunks.append(current)
+                current = piece
+            else:
+                current = f"{current}{joiner}{piece}" if current else piece
+    if current:
+        chunks.append(current)
+    return chunks
+
+
+def parse_extraction(content):
+    """Parses the model's JSON, stripping Markdown fences if the model added them."""
+    if "```json" in content:
+        content = content.split("```json")[1].split("```")[0]
+    elif "```" in content:
+        content = content.split("```")[1].split("```")[0]
+    return json.loads(content.strip())
+
+
+def _extract_chunk(chunk, use_cache, cache, client):
+    try:
+        content = chat(EXTRACTION_PROMPT, chunk, response_format={"type": "json_object"},
+                       use_cache=use_cache, cache=cache, client=client)
+        log.debug("model output: %s...", content[:100])
+        return parse_extraction(content)
+    except Exception as e:
+        log.warning("chunk extraction failed: %s", e)
+        return None
+
+
+def merge_extractions(results):
+    """Merges per-chunk extractions; entities and relationships are deduplicated case-insensitively."""
+    entities, relationships = {}, {}
+    for data in results:
+        for ent in data.get('entities', []):
+            name = (ent.get('name') or "").strip()
+            if name and ent.get('type'):
+                entities.setdefault(name.casefold(), {"name": name, "type": ent['type']})
+        for rel in data.get('relationships', []):
+            source, target = (rel.get('source') or "").strip(), (rel.get('target') or "").strip()
+            label = (rel.get('label') or "related to").strip()
+            if source and target:
+                key = (source.casefold(), label.casefold(), target.casefold())
+                relationships.setdefault(key, {"source": source, "label": label, "target": target})
+    return {"entities": list(entities.values()), "relationships": list(relationships.values())}
+
+
+def extract_document(text, use_cache=True, max_tokens=CHUNK_TOKENS, max_workers=MAX_CONCURRENCY):
+    """Extracts entities and relationships from text of any length.
+
+    Returns the merged {"entities": [...], "relationships": [...]}, or None when every
+    chunk failed.
+    """
+    chunks = split_text(text[:MAX_SOURCE_CHARS], max_tokens)
+    if not chunks:
+        return None
+    # Resolve the shared clients here so worker threads never touch Streamlit's caches.
+    cache, client = get_response_cache(), get_openai()
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(chunks))) as pool:
+        results = list(pool.map(propagate(lambda c: _extract_chunk(c, use_cache, cache, client)), chunks))
+    results = [r for r in results if r]
+    return merge_extractions(results) if results else None
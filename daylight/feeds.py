@@ -0,0 +1,168 @@
+"""Feed fetching and streaming RSS/Atom parsing used by the ingestion worker."""
+import time
+import xml.etree.ElementTree as ET
+from html.parser import HTMLParser
+
+from daylight.clients import get_http_session
+
+CHUNK_SIZE = 16 * 1024
+
+# Item elements by local name: RSS 2.0 <item>, RDF/RSS 1.0 <rss:item>, Atom <entry>.
+ITEM_TAGS = {"item", "entry"}
+# Description candidates by local name, most preferred first.
+DESC_TAGS = ("description", "summary", "content", "encoded")
+RDF_ABOUT = "{http://www.w3.org/1999/02/22-rdf-syntax-ns#}about"
+
+# Starter set for an empty feed registry (`python -m daylight.ingest_worker --seed`).
+DEFAULT_FEEDS = [
+    {'region': 'WEST', 'country': '🇺🇸 USA', 'source': 'CNN', 'url': 'http://rss.cnn.com/rss/edition_world.rss'},
+    {'region': 'WEST', 'country': '🇬🇧 UK', 'source': 'BBC', 'url': 'http://feeds.bbci.co.uk/news/world/rss.xml'},
+    {'region': 'WEST', 'country': '🇪🇺 EU', 'source': 'Politico', 'url': 'https://www.politico.eu/feed/'},
+    {'region': 'RUSSIA', 'country': '🔴 STATE', 'source': 'RT', 'url': 'https://www.rt.com/rss/news/'},
+    {'region': 'RUSSIA', 'country': '⚪ EXILE', 'source': 'Meduza', 'url': 'https://meduza.io/rss/en/all'},
+    {'region': 'UKRAINE', 'country': '🇺🇦 UKR', 'source': 'Kyiv Indep.', 'url': 'https://kyivindependent.com/news-archive/rss/'},
+    {'region': 'ASIA', 'country': '🇨🇳 CHN', 'source': 'Global Times', 'url': 'https://www.globaltimes.cn/rss/outbrain.xml'},
+    {'region': 'ASIA', 'country': '🇮🇳 IND', 'source': 'Times of India', 'url': 'https://timesofindia.indiatimes.com/rssfeedstopstories.cms'},
+    {'region': 'MIDEAST', 'country': '🇶🇦 QAT', 'source': 'Al Jazeera', 'url': 'https://www.aljazeera.com/xml/rss/all.xml'},
+]
+
+
+def _conditional_headers(feed_obj):
+    """Builds If-None-Match / If-Modified-Since from the validators stored on the feed."""
+    headers = {}
+    if feed_obj.get("etag"):
+        headers["If-None-Match"] = feed_obj["etag"]
+    if feed_obj.get("last_modified"):
+        headers["If-Modified-Since"] = feed_obj["last_modified"]
+    return headers
+
+
+class _TextExtractor(HTMLParser):
+    """Collects visible text from an HTML fragment, up to a character budget."""
+
+    def __init__(self, budget):
+        super().__init__(convert_charrefs=True)
+        self.budget = budget
+        self.parts = []
+        self.size = 0
+
+    def handle_data(self, data):
+        if self.size < self.budget:
+            self.parts.append(data)
+            self.size += len(data)
+
+
+def html_to_text(fragment, limit=200, chunk=1024):
+    """Strips tags from an HTML fragment, reading only as far as needed for `limit` chars."""
+    extractor = _TextExtractor(limit * 2)
+    for start in range(0, len(fragment), chunk):
+        extractor.feed(fragment[start:start + chunk])
+        if extractor.size >= limit * 2:
+            break
+    extractor.close()
+    return " ".join("".join(extractor.parts).split())[:limit]
+
+
+def _local(tag):
+    return tag.rsplit("}", 1)[-1]
+
+
+def _item_fields(elem):
+    """Reads title/link/description from an RSS 2.0 item, RDF item or Atom entry."""
+    title = link = desc = None
+    desc_rank = len(DESC_TAGS)
+    for child in elem:
+        name = _local(child.tag)
+        if name == "title" and title is None:
+            title = "".join(child.itertext()).strip()
+        elif name == "link":
+            href = child.attrib.get("href")
+            if href is not None:
+                if link is None or child.attrib.get("rel", "alternate") == "alternate":
+                    link = href
+            elif link is None and child.text:
+                link = child.text.strip()
+        elif name in DESC_TAGS and DESC_TAGS.index(name) < desc_rank:
+            desc = "".join(child.itertext())
+            desc_rank = DESC_TAGS.index(name)
+    if link is None:
+        link = elem.attrib.get(RDF_ABOUT)
+    return title, link, desc
+
+
+def parse_feed(feed_obj, chunks, limit=5, stats=None):
+    """Stream-parses an RSS 2.0, RDF or Atom body into vault items.
+
+    `chunks` is any iterable of bytes (e.g. `response.iter_content()`). Reading stops
+    as soon as `limit` items are parsed, and finished items are detached from the tree,
+    so memory stays bounded by the item cap rather than the document size. If `stats`
+    is given it is filled with the bytes consumed and the time spent parsing.
+    """
+    parser = ET.XMLPullParser(events=("start", "end"))
+    stack = []
+    items = []
+    consumed = 0
+    parse_time = 0.0
+
+    def drain():
+        for event, elem in parser.read_events():
+            if event == "start":
+                stack.append(elem)
+                continue
+            stack.pop()
+            if _local(elem.tag) not in ITEM_TAGS:
+                continue
+            title, link, desc = _item_fields(elem)
+            if title:
+                clean_desc = html_to_text(desc) + "..." if desc else "No description."
+                items.append({'source': feed_obj['source'], 'country': feed_obj['country'], 'region': feed_obj['region'], 'title': title, 'description': clean_desc, 'url': link})
+            if stack:
+                stack[-1].remove(elem)
+            elem.clear()
+            if len(items) >= limit:
+                return True
+        return False
+
+    done = False
+    for chunk in chunks:
+        consumed += len(chunk)
+        started = time.perf_counter()
+        parser.feed(chunk)
+        done = drain()
+        parse_time += time.perf_counter() - started
+        if done:
+            break
+    if not done:
+        started = time.perf_counter()
+        parser.close()
+        drain()
+        parse_time += time.perf_counter() - started
+
+    if stats is not None:
+        stats['bytes'] = consumed
+        stats['parse_ms'] = parse_time * 1000
+    return items[:limit]
+
+
+def fetch_feed(feed_obj, timeout=10, limit=5, session=None):
+    """Fetches one feed with a conditional GET, streaming the body into the parser.
+
+    The feed's stored `etag` / `last_modified` are sent as validators. Returns
+    (items, status, stats): status is 🟢 parsed, ⚪ unchanged since the last fetch (304)
+    or 🔴 failed; stats holds bytes read, parse time, the response's new validators
+    and, on failure, the error.
+    """
+    session = session or get_http_session()
+    stats = {'bytes': 0, 'parse_ms': 0.0, 'etag': feed_obj.get('etag'), 'last_modified': feed_obj.get('last_modified')}
+    try:
+        with session.get(feed_obj['url'], headers=_conditional_headers(feed_obj), timeout=timeout, stream=True) as response:
+            if response.status_code == 304:
+                return [], "⚪", stats
+            response.raise_for_status()
+            items = parse_feed(feed_obj, response.iter_content(CHUNK_SIZE), limit=limit, stats=stats)
+            stats['etag'] = response.headers.get("ETag")
+            stats['last_modified'] = response.headers.get("Last-Modified")
+        return items, "🟢", stats
+    except Exception as e:
+        stats['error'] = str(e)[:500]
+        return [], "🔴", stats
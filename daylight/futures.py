@@ -0,0 +1,75 @@
+"""Futures Desk escrow: placing and resolving predictions as single atomic RPCs.
+
+Both operations run as one database transaction (sql/006_futures_escrow.sql, or
+the equivalent in daylight/sqlite_repository.py):
+the wager is debited only if the balance covers it, and a prediction pays out at
+most once, however many tabs act at the same time. Batches of verdicts and the
+expiry of overdue predictions are set-based RPCs too (sql/007), and open
+positions are read in keyset-paginated pages.
+"""
+import streamlit as st
+
+from daylight.repository import get_repository
+
+STARTING_SCORE = 1000
+POSITION_COLUMNS = "id, created_at, user_name, claim, deadline, confidence, wager"
+PAGE_SIZE = 25
+CACHE_TTL_S = 30
+GRACE_DAYS = 7          # days after the deadline before an unjudged prediction expires
+EXPIRY_BATCH = 1000
+
+
+def place_prediction(username, claim, deadline, confidence, wager):
+    """Debits `wager` and records the prediction in one round trip.
+
+    Returns {"ok", "score", "prediction_id"}; ok is False when the balance is too low.
+    """
+    return get_repository().place_prediction(username, claim, deadline, confidence, wager, STARTING_SCORE)
+
+
+def resolve_prediction(prediction_id, won):
+    """Closes an open prediction, paying out twice the wager if it was correct, in one round trip.
+
+    Returns {"ok", "user_name", "payout", "score"}; ok is False if it was already resolved.
+    """
+    return get_repository().resolve_prediction(prediction_id, won)
+
+
+def resolve_predictions(verdicts):
+    """Resolves many predictions in one set-based call; `verdicts` maps id -> won.
+
+    Winners are paid in bulk and already resolved ids are ignored.
+    Returns {"resolved", "won", "paid_out", "analysts_paid"}.
+    """
+    ids = list(verdicts)
+    return get_repository().resolve_predictions(ids, [bool(verdicts[i]) for i in ids])
+
+
+def resolve_expired(grace_days=GRACE_DAYS, limit=EXPIRY_BATCH, as_of=None):
+    """Closes up to `limit` predictions overdue by more than `grace_days` as Expired.
+
+    Returns the number closed; call again until it is below `limit`.
+    """
+    return get_repository().resolve_expired_predictions(grace_days, limit, as_of)
+
+
+@st.cache_data(ttl=CACHE_TTL_S, show_spinner=False)
+def _open_page(cursor, page_size, overdue_before):
+    rows = get_repository().open_predictions(POSITION_COLUMNS, page_size + 1, cursor, overdue_before)
+    key = "deadline" if overdue_before else "created_at"
+    next_cursor = (rows[page_size - 1][key], rows[page_size - 1]['id']) if len(rows) > page_size else None
+    return rows[:page_size], next_cursor
+
+
+def fetch_open_positions(cursor=None, page_size=PAGE_SIZE, overdue_before=None):
+    """Returns (rows, next_cursor) for one page of open predictions, newest first.
+
+    With `overdue_before` (a date) only predictions whose deadline is earlier are
+    returned, oldest deadline first. Pass the returned cursor to get the next page.
+    """
+    try: return _open_page(cursor, page_size, str(overdue_before) if overdue_before else None)
+    except Exception: return [], None
+
+
+def invalidate_positions():
+    _open_page.clear()
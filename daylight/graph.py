@@ -0,0 +1,95 @@
+"""Per-case entity graph with bounded, server-side views for the Network Graph tab.
+
+The adjacency model is built once per ledger version (see `ledger.ledger_version`)
+and shared across reruns and sessions. Parallel relationships between the same
+pair are merged into one edge with a count. The page only ever draws a view: the
+k-hop neighbourhood of one entity, or the top-N entities by degree, capped at
+`max_nodes`.
+"""
+from collections import Counter, defaultdict, deque
+
+import streamlit as st
+
+MAX_NODES = 150
+MAX_GRAPHS = 32
+
+
+class CaseGraph:
+    """Canonical entities, merged directed edges and an undirected adjacency index."""
+
+    def __init__(self):
+        self.nodes = {}                        # name -> type
+        self.edges = defaultdict(Counter)      # (source, target) -> Counter(label)
+        self.adjacency = defaultdict(set)      # name -> neighbour names (either direction)
+
+    @classmethod
+    def from_ledger(cls, items, index):
+        """Builds the graph from ledger rows, attaching relationships to canonical entities."""
+        graph = cls()
+        for entity in index.entities.values():
+            graph.nodes[entity['name']] = entity['type']
+        for item in items:
+            if "Relationship" not in item['type']:
+                continue
+            parts = item['content'].split('|')
+            if len(parts) != 3:
+                continue
+            source, target = index.canonical_name(parts[0]), index.canonical_name(parts[2])
+            if source in graph.nodes and target in graph.nodes and source != target:
+                graph.edges[(source, target)][parts[1]] += 1
+                graph.adjacency[source].add(target)
+                graph.adjacency[target].add(source)
+        return graph
+
+    def degree(self, name):
+        return len(self.adjacency.get(name, ()))
+
+    def top_by_degree(self, n=MAX_NODES):
+        """The n best-connected entities (ties broken by name, so views are stable)."""
+        return sorted(self.nodes, key=lambda name: (-self.degree(name), name))[:n]
+
+    def k_hop(self, center, k=1, max_nodes=MAX_NODES):
+        """Entities within k hops of `center`, nearest first, capped at max_nodes."""
+        if center not in self.nodes:
+            return []
+        seen, order, queue = {center}, [center], deque([(center, 0)])
+        while queue and len(order) < max_nodes:
+            name, depth = queue.popleft()
+            if depth == k:
+                continue
+            # Expand well-connected neighbours first, so the cap keeps the hubs.
+            for neighbour in sorted(self.adjacency.get(name, set()) - seen, key=lambda n: (-self.degree(n), n)):
+                seen.add(neighbour)
+                order.append(neighbour)
+                queue.append((neighbour, depth + 1))
+                if len(order) >= max_nodes:
+                    break
+        return order
+
+    def subgraph(self, names):
+        """Returns (nodes, edges) induced by `names`.
+
+        nodes: [{"id", "type", "degree"}]; edges: [{"source", "target", "label", "count"}]
+        with parallel relationships merged.
+        """
+        keep = set(names)
+        nodes = [{"id": name, "type": self.nodes[name], "degree": self.degree(name)} for name in names]
+        edges = []
+        for name in names:
+            for neighbour in self.adjacency.get(name, ()):
+                if neighbour not in keep:
+                    continue
+                labels = self.edges.get((name, neighbour))
+                if labels:
+                    edges.append({"source": name, "target": neighbour, "count": sum(labels.values()),
+                                  "label": ", ".join(label for label, _ in labels.most_common(3))})
+        return nodes, edges
+
+
+@st.cache_resource(max_entries=MAX_GRAPHS, show_spinner=False)
+def case_graph(case_id, version, _items, _index):
+    """The case's graph for one ledger version; rebuilt only when the ledger changes.
+
+    Shared across sessions, so callers must treat it as read-only.
+    """
+    return CaseGraph.from_ledger(_items, _index)
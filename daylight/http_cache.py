@@ -0,0 +1,279 @@
+"""Shared, persistent HTTP cache for page fetches and Wikipedia lookups.
+
+`CachingAdapter` plugs into a requests session and stores GET responses in SQLite.
+It follows the standard caching rules for a shared cache: s-maxage / max-age /
+Expires set freshness, and no-store, private and Vary: * are never stored. An
+entry keeps the request headers its Vary names and only answers requests that
+send the same values. Stale entries with an ETag or Last-Modified are revalidated
+with a conditional request, and a 304 serves the stored body. The store is capped
+in bytes and evicts least recently used entries. Set DAYLIGHT_CACHE_DIR to move it.
+
+Bodies are stored as the caller reads them, and only once the whole body has
+been read: a caller that stops early (articles.read_capped) downloads no more
+than it asked for, and nothing is stored.
+
+Clients opt in through `clients.get_cached_session()`: article fetches and the
+MediaWiki API calls in daylight/deep_search.py. The API marks its responses
+private (never stored) unless a request asks for maxage / smaxage, so those
+calls do.
+"""
+import email.utils
+import io
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+
+import streamlit as st
+from requests.adapters import HTTPAdapter
+from requests.models import Response
+from requests.structures import CaseInsensitiveDict
+
+CACHE_DIR = os.environ.get("DAYLIGHT_CACHE_DIR", ".daylight_cache")
+MAX_BYTES = 256 * 1024 * 1024
+MAX_ENTRY_BYTES = 4 * 1024 * 1024
+HEURISTIC_TTL_S = 300        # freshness for responses with no explicit lifetime
+CACHEABLE_STATUS = {200, 203, 300, 301, 308, 404, 410}
+
+_DIRECTIVE = re.compile(r"([\w-]+)\s*(?:=\s*\"?([^\",]*)\"?)?")
+
+
+def cache_directives(value):
+    """Parses a Cache-Control header into {directive: value or True}."""
+    return {m.group(1).lower(): (m.group(2) if m.group(2) is not None else True)
+            for m in _DIRECTIVE.finditer(value or "")}
+
+
+def _http_date(value):
+    try: return email.utils.parsedate_to_datetime(value).timestamp()
+    except Exception: return None
+
+
+def freshness_lifetime(headers, now):
+    """Seconds a response stays fresh in a shared cache, or None if it must not be stored."""
+    cc = cache_directives(headers.get("Cache-Control"))
+    if "no-store" in cc or "private" in cc or headers.get("Vary", "").strip() == "*":
+        return None
+    if "no-cache" in cc:
+        return 0
+    for directive in ("s-maxage", "max-age"):
+        try: return max(0, int(cc[directive]) - int(headers.get("Age", 0)))
+        except (KeyError, ValueError): continue
+    expires = _http_date(headers.get("Expires", ""))
+    if headers.get("Expires") is not None:
+        date = _http_date(headers.get("Date", "")) or now
+        return max(0, int((expires or 0) - date))
+    return HEURISTIC_TTL_S
+
+
+def vary_values(headers, request_headers):
+    """The request headers a response varies on, as {name: value or None}.
+
+    Accept-Encoding is left out: bodies are stored decoded, so every encoding
+    yields the same entry.
+    """
+    names = {name.strip().lower() for name in (headers.get("Vary") or "").split(",")}
+    return {name: request_headers.get(name) for name in sorted(names - {"", "accept-encoding"})}
+
+
+class _Replay:
+    """File-like raw body over stored bytes."""
+
+    def __init__(self, body):
+        self.body = io.BytesIO(body)
+
+    def read(self, amt=None, decode_content=True):
+        return self.body.read(amt) if amt else self.body.read()
+
+    def close(self):
+        pass
+
+    def release_conn(self):
+        pass
+
+
+class _Tee:
+    """File-like raw body that copies what the caller reads from the live stream.
+
+    `on_complete(body)` runs once the stream is exhausted, unless the body grew past
+    `max_bytes` or the caller closed the response before the end.
+    """
+
+    def __init__(self, raw, max_bytes, on_complete):
+        self.raw = raw
+        self.max_bytes = max_bytes
+        self.on_complete = on_complete
+        self.parts, self.size = [], 0
+
+    def read(self, amt=None, decode_content=True):
+        data = self.raw.read(amt, decode_content=True) or b""
+        if self.parts is not None:
+            self.size += len(data)
+            self.parts.append(data)
+            if self.size > self.max_bytes:
+                self.parts = None
+            elif amt is None or not data:
+                body, self.parts = b"".join(self.parts), None
+                self.on_complete(body)
+        return data
+
+    def close(self):
+        self.parts = None
+        self.raw.close()
+
+    def release_conn(self):
+        if hasattr(self.raw, "release_conn"):
+            self.raw.release_conn()
+
+
+class HttpCache:
+    """SQLite-backed, size-capped LRU store of HTTP responses, safe to share across threads."""
+
+    def __init__(self, path, max_bytes=MAX_BYTES, max_entry_bytes=MAX_ENTRY_BYTES):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self.max_bytes = max_bytes
+        self.max_entry_bytes = max_entry_bytes
+        self.hits = 0
+        self.revalidated = 0
+        self.misses = 0
+        self.lock = threading.Lock()
+        self.db = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.execute("""CREATE TABLE IF NOT EXISTS responses (
+            url TEXT PRIMARY KEY, status INTEGER, headers TEXT, body BLOB, size INTEGER,
+            expires_at REAL, last_used REAL, vary TEXT)""")
+        if "vary" not in {row[1] for row in self.db.execute("PRAGMA table_info(responses)")}:
+            self.db.execute("ALTER TABLE responses ADD COLUMN vary TEXT")   # caches created before Vary was kept
+        self.db.execute("CREATE INDEX IF NOT EXISTS responses_last_used ON responses (last_used)")
+
+    def get(self, url):
+        """Returns (status, headers, body, expires_at, vary) or None."""
+        with self.lock:
+            row = self.db.execute("SELECT status, headers, body, expires_at, vary FROM responses WHERE url = ?", (url,)).fetchone()
+            if row is None:
+                return None
+            self.db.execute("UPDATE responses SET last_used = ? WHERE url = ?", (time.time(), url))
+        return row[0], json.loads(row[1]), row[2], row[3], json.loads(row[4] or "{}")
+
+    def put(self, url, status, headers, body, expires_at, vary=None):
+        if len(body) > self.max_entry_bytes:
+            return
+        with self.lock:
+            self.db.execute("INSERT OR REPLACE INTO responses (url, status, headers, body, size, expires_at, last_used, vary) "
+                            "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                            (url, status, json.dumps(dict(headers)), body, len(body), expires_at, time.time(),
+                             json.dumps(vary or {})))
+            self._evict()
+
+    def touch(self, url, headers, expires_at):
+        """Refreshes a stored entry after a 304, merging the updated headers."""
+        with self.lock:
+            row = self.db.execute("SELECT headers FROM responses WHERE url = ?", (url,)).fetchone()
+            if row:
+                merged = {**json.loads(row[0]), **dict(headers)}
+                self.db.execute("UPDATE responses SET headers = ?, expires_at = ?, last_used = ? WHERE url = ?",
+                                (json.dumps(merged), expires_at, time.time(), url))
+
+    def record(self, outcome):
+        """Counts a lookup as a "hits", "revalidated" or "misses"."""
+        with self.lock:
+            setattr(self, outcome, getattr(self, outcome) + 1)
+
+    def delete(self, url):
+        with self.lock:
+            self.db.execute("DELETE FROM responses WHERE url = ?", (url,))
+
+    def _evict(self):
+        total = self.db.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+        while total > self.max_bytes:
+            rows = self.db.execute("SELECT url, size FROM responses ORDER BY last_used LIMIT 64").fetchall()
+            if not rows:
+                break
+            for url, size in rows:
+                if total <= self.max_bytes:
+                    break
+                self.db.execute("DELETE FROM responses WHERE url = ?", (url,))
+                total -= size
+
+    def stats(self):
+        with self.lock:
+            entries, size = self.db.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM responses").fetchone()
+        lookups = self.hits + self.revalidated + self.misses
+        hit_rate = (self.hits + self.revalidated) / lookups if lookups else 0.0
+        return {"hits": self.hits, "revalidated": self.revalidated, "misses": self.misses,
+                "hit_rate": hit_rate, "entries": entries, "bytes": size}
+
+
+class CachingAdapter(HTTPAdapter):
+    """Transport adapter that answers GETs from an HttpCache when the rules allow."""
+
+    def __init__(self, cache, **kwargs):
+        super().__init__(**kwargs)
+        self.cache = cache
+
+    @staticmethod
+    def _bypass(request):
+        headers = request.headers
+        return (request.method != "GET" or "Range" in headers or "If-None-Match" in headers
+                or "If-Modified-Since" in headers or "no-store" in cache_directives(headers.get("Cache-Control")))
+
+    def _build(self, request, status, headers, body):
+        response = Response()
+        response.status_code = status
+        response.headers = CaseInsensitiveDict(headers)
+        response.raw = _Replay(body)
+        response.url = request.url
+        response.request = request
+        response.reason = "OK" if status == 200 else ""
+        response.encoding = None
+        response.from_cache = True
+        return response
+
+    def send(self, request, **kwargs):
+        if self._bypass(request):
+            return super().send(request, **kwargs)
+        url, now = request.url, time.time()
+        entry = self.cache.get(url)
+        if entry is not None and entry[4] != vary_values(entry[1], request.headers):
+            entry = None   # stored for other request headers; this response replaces it
+        if entry is not None:
+            status, headers, body, expires_at, _ = entry
+            if now < expires_at:
+                self.cache.record("hits")
+                return self._build(request, status, headers, body)
+            if "ETag" in headers:
+                request.headers["If-None-Match"] = headers["ETag"]
+            if "Last-Modified" in headers:
+                request.headers["If-Modified-Since"] = headers["Last-Modified"]
+
+        response = super().send(request, **kwargs)
+        if entry is not None and response.status_code == 304:
+            lifetime = freshness_lifetime({**entry[1], **response.headers}, now) or 0
+            self.cache.touch(url, response.headers, now + lifetime)
+            self.cache.record("revalidated")
+            response.close()
+            return self._build(request, entry[0], {**entry[1], **response.headers}, entry[2])
+
+        self.cache.record("misses")
+        lifetime = freshness_lifetime(response.headers, now)
+        validators = "ETag" in response.headers or "Last-Modified" in response.headers
+        if response.status_code not in CACHEABLE_STATUS or lifetime is None or (lifetime == 0 and not validators):
+            if entry is not None:
+                self.cache.delete(url)
+            return response
+        # Stored only if the caller reads the whole body, and it fits the entry cap. The
+        # body is read decoded, so Content-Encoding no longer applies.
+        response.headers.pop("Content-Encoding", None)
+        status, headers, vary = response.status_code, dict(response.headers), vary_values(response.headers, request.headers)
+        response.raw = _Tee(response.raw, self.cache.max_entry_bytes,
+                            lambda body: self.cache.put(url, status, headers, body, now + lifetime, vary))
+        response.from_cache = False
+        return response
+
+
+@st.cache_resource(show_spinner=False)
+def get_http_cache():
+    """Returns the process-wide HTTP cache."""
+    return HttpCache(os.path.join(CACHE_DIR, "http.sqlite3"))
@@ -0,0 +1,255 @@
+"""Headless ingestion worker: polls every registered feed on its own adaptive schedule.
+
+Feeds come from the `feed_registry` table (see sql/001_feed_registry.sql). Each feed
+is polled on an interval derived from how often it actually publishes, failing feeds
+back off exponentially, and new items are written to `news_archive` in bulk batches.
+The Streamlit pages only read the archive.
+
+    python -m daylight.ingest_worker            # run forever
+    python -m daylight.ingest_worker --once     # poll every due feed once, then exit
+    python -m daylight.ingest_worker --seed     # register DEFAULT_FEEDS, then exit
+"""
+import argparse
+import heapq
+import logging
+import random
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from datetime import datetime, timezone
+
+from daylight.clients import get_http_session
+from daylight.feeds import DEFAULT_FEEDS, fetch_feed
+from daylight.repository import get_repository
+
+log = logging.getLogger("daylight.ingest")
+
+MIN_INTERVAL_S = 120
+MAX_INTERVAL_S = 6 * 3600
+MAX_BACKOFF_S = 24 * 3600
+RATE_SMOOTHING = 0.3      # weight of the latest observation in the publish-rate EWMA
+JITTER = 0.1              # +/- fraction applied to every interval so polls spread out
+REGISTRY_PAGE = 1000
+
+REGISTRY_COLUMNS = ("id", "source", "country", "region", "url", "item_limit", "poll_interval_s",
+                    "next_poll_at", "last_polled_at", "publish_rate", "failure_count",
+                    "last_error", "etag", "last_modified")
+ARCHIVE_COLUMNS = ("source", "country", "region", "title", "url", "description")
+
+
+def _to_epoch(stamp):
+    if not stamp:
+        return time.time()
+    return datetime.fromisoformat(stamp).timestamp()
+
+
+def _to_iso(epoch):
+    return datetime.fromtimestamp(epoch, timezone.utc).isoformat()
+
+
+def _jitter(seconds):
+    return seconds * random.uniform(1 - JITTER, 1 + JITTER)
+
+
+def adapt_interval(feed, new_items, elapsed_s):
+    """Returns (interval_s, publish_rate) after a successful poll.
+
+    The publish rate (items/hour) is an EWMA of what each poll observed. The next
+    interval aims to catch about half of the feed's item window per poll, so busy feeds
+    are polled often and quiet ones drift towards MAX_INTERVAL_S.
+    """
+    observed = new_items * 3600 / max(elapsed_s, 1)
+    rate = RATE_SMOOTHING * observed + (1 - RATE_SMOOTHING) * (feed['publish_rate'] or 0)
+    if new_items >= feed['item_limit']:
+        # The window overflowed, so items were probably missed: tighten hard.
+        interval = feed['poll_interval_s'] / 2
+    elif rate > 0:
+        interval = (feed['item_limit'] / 2) / rate * 3600
+    else:
+        interval = feed['poll_interval_s'] * 1.5
+    return int(min(max(interval, MIN_INTERVAL_S), MAX_INTERVAL_S)), rate
+
+
+def backoff_delay(feed):
+    """Exponential backoff on consecutive failures, capped at MAX_BACKOFF_S."""
+    return min(feed['poll_interval_s'] * 2 ** feed['failure_count'], MAX_BACKOFF_S)
+
+
+class IngestWorker:
+    """Schedules feed polls on a min-heap of due times and batches all writes."""
+
+    def __init__(self, repository, workers=32, batch_size=500, flush_every_s=10, refresh_every_s=300, timeout=10):
+        self.repository = repository
+        self.workers = workers
+        self.batch_size = batch_size
+        self.flush_every_s = flush_every_s
+        self.refresh_every_s = refresh_every_s
+        self.timeout = timeout
+        self.session = get_http_session()
+        self.feeds = {}          # id -> registry row (epoch timestamps in memory)
+        self.seen = {}           # id -> URLs from the previous poll, to count new items
+        self.queue = []          # heap of (due_epoch, id)
+        self.pending_items = {}  # url -> archive row
+        self.dirty = {}          # id -> registry row awaiting write-back
+        self.last_flush = time.time()
+        self.last_refresh = 0.0
+
+    # --- registry ---
+
+    def load_registry(self):
+        """(Re)reads active feeds; feeds already known keep their in-memory schedule."""
+        rows, start = [], 0
+        while True:
+            page = self.repository.active_feeds(", ".join(REGISTRY_COLUMNS), start, REGISTRY_PAGE)
+            rows.extend(page)
+            if len(page) < REGISTRY_PAGE:
+                break
+            start += REGISTRY_PAGE
+
+        active_ids = set()
+        for row in rows:
+            active_ids.add(row['id'])
+            if row['id'] in self.feeds:
+                continue
+            row['next_poll_at'] = _to_epoch(row['next_poll_at'])
+            row['last_polled_at'] = _to_epoch(row['last_polled_at']) if row['last_polled_at'] else None
+            self.feeds[row['id']] = row
+            heapq.heappush(self.queue, (row['next_poll_at'], row['id']))
+        for feed_id in set(self.feeds) - active_ids:
+            del self.feeds[feed_id]
+            self.seen.pop(feed_id, None)
+        self.last_refresh = time.time()
+        log.info("registry: %d active feeds", len(self.feeds))
+
+    def _schedule(self, feed, delay_s):
+        feed['next_poll_at'] = time.time() + _jitter(delay_s)
+        heapq.heappush(self.queue, (feed['next_poll_at'], feed['id']))
+        self.dirty[feed['id']] = feed
+
+    # --- polling ---
+
+    def _record(self, feed, items, status, stats):
+        now = time.time()
+        elapsed = now - (feed['last_polled_at'] or now - feed['poll_interval_s'])
+        feed['last_polled_at'] = now
+        feed['etag'], feed['last_modified'] = stats['etag'], stats['last_modified']
+        log.debug("%s %s: %d items, %d KB read, %.0f ms parse", status, feed['source'], len(items), stats['bytes'] // 1024, stats['parse_ms'])
+
+        if status == "🔴":
+            feed['failure_count'] += 1
+            feed['last_error'] = stats.get('error')
+            self._schedule(feed, backoff_delay(feed))
+            log.warning("%s failed (%d in a row): %s", feed['source'], feed['failure_count'], feed['last_error'])
+            return
+
+        urls = {i['url'] for i in items if i['url']}
+        previous = self.seen.get(feed['id'])
+        # `seen` is in memory only: after a restart the first full (200) window looks new
+        # (the archive skips the items it has), so that poll seeds `seen` and is not taken
+        # as a publish rate. A 304 carries no items and means nothing new either way.
+        first_window = status == "🟢" and previous is None
+        if status == "🟢":
+            self.seen[feed['id']] = urls
+        new_urls = urls - (previous or set())
+        for item in items:
+            if item['url'] in new_urls:
+                self.pending_items[item['url']] = {k: item[k] for k in ARCHIVE_COLUMNS}
+
+        feed['failure_count'] = 0
+        feed['last_error'] = None
+        if not first_window:
+            feed['poll_interval_s'], feed['publish_rate'] = adapt_interval(feed, len(new_urls), elapsed)
+        self._schedule(feed, feed['poll_interval_s'])
+
+    # --- writes ---
+
+    def flush(self):
+        """Writes buffered archive items and registry state in bulk batches."""
+        self.last_flush = time.time()
+        items = list(self.pending_items.values())
+        for start in range(0, len(items), self.batch_size):
+            batch = items[start:start + self.batch_size]
+            try:
+                self.repository.add_archive_items(batch)
+            except Exception as e:
+                log.error("archive write failed, keeping %d items for retry: %s", len(items) - start, e)
+                return
+            for row in batch:
+                self.pending_items.pop(row['url'], None)
+        if items:
+            log.info("archived %d items", len(items))
+
+        rows = [{**{k: feed[k] for k in REGISTRY_COLUMNS},
+                 'next_poll_at': _to_iso(feed['next_poll_at']),
+                 'last_polled_at': _to_iso(feed['last_polled_at']) if feed['last_polled_at'] else None}
+                for feed in self.dirty.values()]
+        for start in range(0, len(rows), self.batch_size):
+            try:
+                self.repository.update_feeds(rows[start:start + self.batch_size])
+            except Exception as e:
+                log.error("registry write failed: %s", e)
+                return
+        self.dirty.clear()
+
+    # --- main loop ---
+
+    def run(self, once=False):
+        self.load_registry()
+        cutoff = time.time()
+        in_flight = {}
+        with ThreadPoolExecutor(max_workers=self.workers) as pool:
+            while True:
+                now = time.time()
+                if not once and now - self.last_refresh > self.refresh_every_s:
+                    self.load_registry()
+
+                while self.queue and self.queue[0][0] <= now and len(in_flight) < self.workers * 2:
+                    due, feed_id = heapq.heappop(self.queue)
+                    feed = self.feeds.get(feed_id)
+                    if feed is None or due != feed['next_poll_at'] or (once and due > cutoff):
+                        continue  # removed, rescheduled since, or not part of this pass
+                    future = pool.submit(fetch_feed, dict(feed), self.timeout, feed['item_limit'], self.session)
+                    in_flight[future] = feed
+
+                if in_flight:
+                    next_due = self.queue[0][0] - now if self.queue else 1.0
+                    done, _ = wait(in_flight, timeout=min(max(next_due, 0.05), 1.0), return_when=FIRST_COMPLETED)
+                    for future in done:
+                        self._record(in_flight.pop(future), *future.result())
+                elif once and not any(due <= cutoff for due, _ in self.queue):
+                    break
+                else:
+                    time.sleep(min(max(self.queue[0][0] - now, 0.05), 1.0) if self.queue else 1.0)
+
+                if len(self.pending_items) >= self.batch_size or time.time() - self.last_flush >= self.flush_every_s:
+                    self.flush()
+        self.flush()
+
+
+def seed_registry(repository, feeds=DEFAULT_FEEDS):
+    """Registers feeds by URL, leaving existing registrations untouched."""
+    repository.register_feeds(list(feeds))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Daylight feed ingestion worker")
+    parser.add_argument("--once", action="store_true", help="poll every due feed once, then exit")
+    parser.add_argument("--seed", action="store_true", help="register DEFAULT_FEEDS, then exit")
+    parser.add_argument("--workers", type=int, default=32, help="concurrent fetches")
+    parser.add_argument("--batch-size", type=int, default=500, help="rows per bulk write")
+    parser.add_argument("--flush-every", type=float, default=10, help="seconds between bulk writes")
+    parser.add_argument("--refresh-every", type=float, default=300, help="seconds between registry reloads")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
+
+    repository = get_repository()
+    if not repository:
+        raise SystemExit("SUPABASE_URL / SUPABASE_KEY are not configured (or set DAYLIGHT_BACKEND=sqlite).")
+    if args.seed:
+        seed_registry(repository)
+        return
+    IngestWorker(repository, workers=args.workers, batch_size=args.batch_size,
+                 flush_every_s=args.flush_every, refresh_every_s=args.refresh_every).run(once=args.once)
+
+
+if __name__ == "__main__":
+    main()
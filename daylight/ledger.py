@@ -0,0 +1,81 @@
+"""Batched, idempotent writes to `intel_ledger`.
+
+Rows are unique on (investigation_id, type, content) (sql/004_ledger_unique.sql),
+so a whole batch goes out as one upsert that skips rows already on file. Running
+the same extraction twice inserts nothing the second time.
+
+With an `EntityIndex` (daylight/entities.py), names that resolve to a known entity
+are stored as Alias rows instead of new entities, and relationships are attached
+to canonical names.
+"""
+import hashlib
+
+from daylight.entities import ALIAS_TYPE
+from daylight.repository import get_repository
+
+
+def extraction_rows(case_id, data, index=None):
+    """Turns an extraction ({"entities": [...], "relationships": [...]}) into ledger rows.
+
+    When `index` is given it is updated in place: longer names are resolved first so
+    they become canonical, and each alias of a known entity yields one Alias row.
+    """
+    rows = []
+    entities = [e for e in data.get('entities', []) if e.get('name') and e.get('type')]
+    if index is not None:
+        entities.sort(key=lambda e: -len(e['name']))
+    for ent in entities:
+        if index is None:
+            rows.append({"investigation_id": case_id, "type": f"Entity: {ent['type']}", "content": ent['name']})
+            continue
+        cid, is_new = index.resolve(ent['name'], ent['type'])
+        canonical = index.entities[cid]["name"] if cid else None
+        if is_new:
+            rows.append({"investigation_id": case_id, "type": f"Entity: {ent['type']}", "content": canonical})
+        elif canonical and ent['name'].strip() != canonical:
+            rows.append({"investigation_id": case_id, "type": ALIAS_TYPE, "content": f"{ent['name'].strip()}|{canonical}"})
+    name = index.canonical_name if index is not None else (lambda n: n)
+    for rel in data.get('relationships', []):
+        if rel.get('source') and rel.get('target'):
+            content = f"{name(rel['source'])}|{rel.get('label', 'related to')}|{name(rel['target'])}"
+            rows.append({"investigation_id": case_id, "type": "Relationship", "content": content})
+    return rows
+
+
+def write_rows(rows):
+    """Writes ledger rows in one bulk upsert; duplicates (in the batch or on file) are skipped.
+
+    Returns (inserted_rows, skipped_count).
+    """
+    unique = list({(r['investigation_id'], r['type'], r['content']): r for r in rows}.values())
+    if not unique:
+        return [], len(rows)
+    inserted = get_repository().add_ledger_rows(unique)
+    return inserted, len(rows) - len(inserted)
+
+
+def write_extraction(case_id, data, index=None):
+    """Stores one extraction for a case in a single round trip.
+
+    Pass the case's `EntityIndex` to merge aliases into existing entities.
+    Returns {"entities": n, "aliases": n, "relationships": n, "skipped": n, "rows": [...]},
+    counting newly inserted rows per kind and rows skipped as already on file; "rows"
+    are the inserted rows as stored.
+    """
+    inserted, skipped = write_rows(extraction_rows(case_id, data, index))
+    entities = sum(1 for r in inserted if r['type'].startswith("Entity"))
+    aliases = sum(1 for r in inserted if r['type'] == ALIAS_TYPE)
+    return {"entities": entities, "aliases": aliases, "relationships": len(inserted) - entities - aliases, "skipped": skipped,
+            "rows": inserted}
+
+
+def ledger_version(items):
+    """Cheap fingerprint of a case's ledger rows; changes whenever a row is added or deleted.
+
+    Used as the cache key for everything derived from the ledger (graph, analytics).
+    Works for any id type (bigint, uuid, text) and is stable across processes, since
+    the dossier cache stores it in file names.
+    """
+    ids = sorted(str(item['id']) for item in items)
+    digest = hashlib.sha256("\n".join(ids).encode("utf-8")).hexdigest()[:16]
+    return f"{len(ids)}:{digest}"
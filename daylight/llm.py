@@ -0,0 +1,129 @@
+"""LLM calls with a content-addressed response cache.
+
+Responses are stored in SQLite under a SHA-256 of (model, system prompt, input,
+response format), so a repeated analysis of the same text returns instantly and
+costs nothing. Entries expire after a TTL and the least recently used ones are
+evicted past a size cap. Replies that are empty, or that ask for JSON and do not
+parse, are never stored, so a retry calls the model again. Set DAYLIGHT_CACHE_DIR
+to move the store.
+"""
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+
+import streamlit as st
+
+from daylight.clients import get_openai
+from daylight.tracing import start_span
+
+DEFAULT_MODEL = "gpt-4o-mini"
+CACHE_DIR = os.environ.get("DAYLIGHT_CACHE_DIR", ".daylight_cache")
+MAX_ENTRIES = 5000
+TTL_S = 7 * 24 * 3600
+
+
+class ResponseCache:
+    """SQLite-backed LRU/TTL store for model responses, safe to share across threads."""
+
+    def __init__(self, path, max_entries=MAX_ENTRIES, ttl_s=TTL_S):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self.max_entries = max_entries
+        self.ttl_s = ttl_s
+        self.hits = 0
+        self.misses = 0
+        self.lock = threading.Lock()
+        self.db = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.execute("""CREATE TABLE IF NOT EXISTS responses (
+            key TEXT PRIMARY KEY, model TEXT, response TEXT,
+            created_at REAL, last_used REAL, hit_count INTEGER DEFAULT 0)""")
+        self.db.execute("CREATE INDEX IF NOT EXISTS responses_last_used ON responses (last_used)")
+
+    @staticmethod
+    def make_key(model, system_prompt, user_content, response_format=None):
+        payload = json.dumps([model, system_prompt, user_content, response_format], sort_keys=True)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def get(self, key):
+        now = time.time()
+        with self.lock:
+            row = self.db.execute("SELECT response, created_at FROM responses WHERE key = ?", (key,)).fetchone()
+            if row is None or now - row[1] > self.ttl_s:
+                if row is not None:
+                    self.db.execute("DELETE FROM responses WHERE key = ?", (key,))
+                self.misses += 1
+                return None
+            self.db.execute("UPDATE responses SET last_used = ?, hit_count = hit_count + 1 WHERE key = ?", (now, key))
+            self.hits += 1
+            return row[0]
+
+    def put(self, key, model, response):
+        now = time.time()
+        with self.lock:
+            self.db.execute("INSERT OR REPLACE INTO responses (key, model, response, created_at, last_used) VALUES (?, ?, ?, ?, ?)",
+                            (key, model, response, now, now))
+            excess = self.db.execute("SELECT COUNT(*) FROM responses").fetchone()[0] - self.max_entries
+            if excess > 0:
+                self.db.execute("DELETE FROM responses WHERE key IN (SELECT key FROM responses ORDER BY last_used LIMIT ?)", (excess,))
+
+    def stats(self):
+        with self.lock:
+            entries = self.db.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+        return {"hits": self.hits, "misses": self.misses, "entries": entries}
+
+
+@st.cache_resource(show_spinner=False)
+def get_response_cache():
+    """Returns the process-wide response cache."""
+    return ResponseCache(os.path.join(CACHE_DIR, "llm.sqlite3"))
+
+
+def _cacheable(content, response_format):
+    """False for replies a retry should not get back: empty, or broken JSON in JSON mode."""
+    if not content:
+        return False
+    if (response_format or {}).get("type") == "json_object":
+        try: json.loads(content)
+        except ValueError: return False
+    return True
+
+
+def chat(system_prompt, user_content, model=DEFAULT_MODEL, response_format=None, use_cache=True, cache=None, client=None):
+    """Runs one system+user chat completion and returns the message content.
+
+    With use_cache=False the model is always called, and the fresh answer replaces
+    the cached one. Pass `cache` / `client` when calling from worker threads.
+    Raises if the OpenAI client is not configured or the call fails.
+    """
+    cache = cache or get_response_cache()
+    key = cache.make_key(model, system_prompt, user_content, response_format)
+    with start_span("llm", f"chat {model}", **{"gen_ai.system": "openai", "gen_ai.operation.name": "chat",
+                                               "gen_ai.request.model": model,
+                                               "daylight.request_bytes": len(system_prompt) + len(user_content)}) as span:
+        if use_cache:
+            cached = cache.get(key)
+            if cached is not None:
+                span.set(**{"daylight.cache_hit": True, "daylight.response_bytes": len(cached)})
+                return cached
+
+        client = client or get_openai()
+        if client is None:
+            raise RuntimeError("OpenAI Key Missing.")
+        kwargs = {"response_format": response_format} if response_format else {}
+        response = client.chat.completions.create(
+            model=model,
+            messages=[{"role": "system", "content": system_prompt}, {"role": "user", "content": user_content}],
+            **kwargs
+        )
+        content = response.choices[0].message.content
+        usage = getattr(response, "usage", None)
+        span.set(**{"daylight.cache_hit": False, "daylight.response_bytes": len(content or ""),
+                    "gen_ai.response.model": getattr(response, "model", None),
+                    "gen_ai.usage.input_tokens": getattr(usage, "prompt_tokens", 0) or 0,
+                    "gen_ai.usage.output_tokens": getattr(usage, "completion_tokens", 0) or 0})
+    if _cacheable(content, response_format):
+        cache.put(key, model, content)
+    return content
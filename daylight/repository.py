@@ -0,0 +1,461 @@
+"""Storage behind one interface: every Daylight table and RPC as a plain method.
+
+`get_repository()` returns the process-wide backend named by DAYLIGHT_BACKEND:
+
+- "supabase" (default): Postgres through PostgREST, with the functions in sql/;
+- "sqlite": one local file (DAYLIGHT_DB_PATH, default .daylight_cache/daylight.sqlite3)
+  with the same indexes and the RPCs run in-process (daylight/sqlite_repository.py),
+  for single-node and air-gapped deployments.
+
+Pages and daylight modules go through the repository instead of building query
+chains on a client. Rows are plain dicts; timestamps are ISO 8601 strings and
+dates "YYYY-MM-DD". Keyset cursors are (sort value, id) pairs taken from the last
+row of the previous page. `python bench/repository_conformance.py` runs the same
+checks against every backend.
+"""
+import base64
+import os
+import threading
+import time
+from abc import ABC, abstractmethod
+from urllib.parse import urljoin
+
+import requests
+import streamlit as st
+
+from daylight.clients import get_http_session, get_supabase
+from daylight.config import load_config
+
+BACKENDS = ("supabase", "sqlite")
+CACHE_DIR = os.environ.get("DAYLIGHT_CACHE_DIR", ".daylight_cache")
+LEDGER_CONFLICT = "investigation_id,type,content"
+EVIDENCE_BUCKET = "evidence"
+UPLOAD_CHUNK_BYTES = 6 * 1024 * 1024   # Supabase's resumable (TUS) endpoint takes 6 MB chunks
+UPLOAD_RETRIES = 5
+
+
+class Repository(ABC):
+    """The storage interface. Backends implement every method; one that misses any cannot be instantiated."""
+
+    # --- investigations ---
+
+    @abstractmethod
+    def list_cases(self):
+        """Every investigation, newest first."""
+        raise NotImplementedError
+
+    @abstractmethod
+    def list_active_cases(self):
+        """[{id, title}] for active investigations, newest first."""
+        raise NotImplementedError
+
+    @abstractmethod
+    def get_case(self, case_id):
+        """The investigation row, or None."""
+        raise NotImplementedError
+
+    @abstractmethod
+    def create_case(self, title, description, status="Active"):
+        """Inserts an investigation and returns the stored row."""
+        raise NotImplementedError
+
+    @abstractmethod
+    def delete_case(self, case_id):
+        raise NotImplementedError
+
+    # --- intel ledger ---
+
+    @abstractmethod
+    def case_ledger(self, case_id):
+        """The case's ledger rows, newest first (created_at desc, id desc)."""
+        raise NotImplementedError
+
+    @abstractmethod
+    def ledger_probe(self, case_id):
+        """(row count, highest id) of the case's ledger, from the index alone."""
+        raise NotImplementedError
+
+    @abstractmethod
+    def add_ledger_rows(self, rows):
+        """Inserts rows, skipping any already on file (unique on investigation_id, type, content).
+
+        Returns the rows actually inserted, as stored.
+        """
+        raise NotImplementedError
+
+    @abstractmethod
+    def delete_ledger_rows(self, row_ids):
+        raise NotImplementedError
+
+    # --- news archive ---
+
+    @abstractmethod
+    def archive_page(self, columns, limit, region=None, cursor=None):
+        """Up to `limit` archive rows newest first, after the (created_at, id) `cursor`."""
+        raise NotImplementedError
+
+    @abstractmethod
+    def search_archive(self, query, limit=25, region=None):
+        """Ranked full-text search (websearch syntax); rows carry a `rank`, best first."""
+        raise NotImplementedError
+
+    @abstractmethod
+    def add_archive_items(self, rows):
+        """Inserts archive items, skipping URLs already archived."""
+        raise NotImplementedError
+
+    # --- feed registry ---
+
+    @abstractmethod
+    def active_feeds(self, columns, offset, limit):
+        """One page of active registry rows, ordered by id."""
+        raise NotImplementedError
+
+    @abstractmethod
+    def update_feeds(self, rows):
+        """Writes back registry rows by id (scheduling state after a poll)."""
+        raise NotImplementedError
+
+    @abstractmethod
+    def register_feeds(self, rows):
+        """Registers feeds by URL, leaving existing registrations untouched."""
+        raise NotImplementedError
+
+    @abstractmethod
+    def feed_health(self):
+        """(active feeds, active feeds currently failing)."""
+        raise NotImplementedError
+
+    # --- evidence ---
+
+    @abstractmethod
+    def store_evidence_file(self, key, stream, size, content_type):
+        """Stores `size` bytes from the file-like `stream` under `key`, one chunk at a time.
+
+        A retry after an interrupted upload continues from the last stored chunk.
+        Returns the URL (or local path) the file can be read from.
+        """
+        raise NotImplementedError
+
+    @abstractmethod
+    def read_evidence_file(self, key):
+        """The stored file's bytes."""
+        raise NotImplementedError
+
+    @abstractmethod
+    def find_evidence(self, content_hash):
+        """The evidence_locker row holding the file with this SHA-256, or None."""
+        raise NotImplementedError
+
+    @abstractmethod
+    def add_evidence(self, row):
+        """Inserts an evidence_locker row and returns it as stored.
+
+        If a row with the same content_hash is already on file, nothing is inserted
+        and that row is returned.
+        """
+        raise NotImplementedError
+
+    @abstractmethod
+    def claim_evidence(self, limit, stale_after_s):
+        """Marks up to `limit` rows awaiting processing as 'processing' and returns them.
+
+        Rows left 'processing' for more than `stale_after_s` (a worker died) are
+        handed out again; rows claimed by a concurrent worker are skipped (sql/009).
+        """
+        raise NotImplementedError
+
+    @abstractmethod
+    def update_evidence(self, evidence_id, fields):
+        raise NotImplementedError
+
+    @abstractmethod
+    def search_evidence(self, query, limit=20):
+        """Ranked full-text search over names, notes, metadata and extracted text.
+
+        Websearch syntax; rows carry a `rank` and a `snippet` of the text with
+        matches wrapped in <b></b>.
+        """
+        raise NotImplementedError
+
+    # --- futures desk ---
+
+    @abstractmethod
+    def analyst_score(self, user_name):
+        """The analyst's score, or None if they have no account yet."""
+        raise NotImplementedError
+
+    @abstractmethod
+    def open_account(self, user_name, score):
+        """Creates the analyst's score row unless one exists."""
+        raise NotImplementedError
+
+    @abstractmethod
+    def place_prediction(self, user_name, claim, deadline, confidence, wager, starting_score):
+        """Atomic escrow (sql/006). Returns {"ok", "score", "prediction_id"}."""
+        raise NotImplementedError
+
+    @abstractmethod
+    def resolve_prediction(self, prediction_id, won):
+        """Atomic single resolution (sql/006). Returns {"ok", "user_name", "payout", "score"}."""
+        raise NotImplementedError
+
+    @abstractmethod
+    def resolve_predictions(self, ids, won):
+        """Set-based resolution (sql/007). Returns {"resolved", "won", "paid_out", "analysts_paid"}."""
+        raise NotImplementedError
+
+    @abstractmethod
+    def resolve_expired_predictions(self, grace_days, limit, as_of=None):
+        """Closes overdue predictions as Expired (sql/007). Returns the number closed."""
+        raise NotImplementedError
+
+    @abstractmethod
+    def open_predictions(self, columns, limit, cursor=None, overdue_before=None):
+        """Open predictions newest first, after the (created_at, id) `cursor`.
+
+        With `overdue_before` only deadlines before that date, oldest deadline first,
+        after the (deadline, id) `cursor`.
+        """
+        raise NotImplementedError
+
+    @abstractmethod
+    def resolved_predictions(self, limit):
+        """[{id, user_name, claim, outcome}] for the latest resolved predictions."""
+        raise NotImplementedError
+
+    # --- command center ---
+
+    @abstractmethod
+    def dashboard_stats(self, recent_limit, case_limit):
+        """{"active_cases", "signals", "evidence", "flash", "cases"} (sql/008)."""
+        raise NotImplementedError
+
+
+def _after(cursor, key, desc=True):
+    """PostgREST `or` filter for rows after a (value, id) keyset cursor."""
+    value, row_id = cursor
+    op = "lt" if desc else "gt"
+    return f'{key}.{op}."{value}",and({key}.eq."{value}",id.{op}.{row_id})'
+
+
+class SupabaseRepository(Repository):
+    """Postgres through the Supabase client; RPCs are the functions in sql/."""
+
+    def __init__(self, client):
+        self.client = client
+        self.uploads = {}   # storage key -> TUS upload URL, so a retried upload resumes
+        self.lock = threading.Lock()
+
+    def _table(self, name):
+        return self.client.table(name)
+
+    def _rpc(self, name, params):
+        return self.client.rpc(name, params).execute().data
+
+    def list_cases(self):
+        return self._table("investigations").select("*").order("created_at", desc=True).execute().data
+
+    def list_active_cases(self):
+        return (self._table("investigations").select("id, title").eq("status", "Active")
+                .order("created_at", desc=True).execute().data)
+
+    def get_case(self, case_id):
+        rows = self._table("investigations").select("*").eq("id", case_id).execute().data
+        return rows[0] if rows else None
+
+    def create_case(self, title, description, status="Active"):
+        rows = self._table("investigations").insert({"title": title, "description": description, "status": status}).execute().data
+        return rows[0] if rows else None
+
+    def delete_case(self, case_id):
+        self._table("investigations").delete().eq("id", case_id).execute()
+
+    def case_ledger(self, case_id):
+        return (self._table("intel_ledger").select("*").eq("investigation_id", case_id)
+                .order("created_at", desc=True).order("id", desc=True).execute().data)
+
+    def ledger_probe(self, case_id):
+        res = (self._table("intel_ledger").select("id", count="exact").eq("investigation_id", case_id)
+               .order("id", desc=True).limit(1).execute())
+        return res.count or 0, (res.data[0]['id'] if res.data else 0)
+
+    def add_ledger_rows(self, rows):
+        if not rows:
+            return []
+        return self._table("intel_ledger").upsert(list(rows), on_conflict=LEDGER_CONFLICT, ignore_duplicates=True).execute().data
+
+    def delete_ledger_rows(self, row_ids):
+        if row_ids:
+            self._table("intel_ledger").delete().in_("id", list(row_ids)).execute()
+
+    def archive_page(self, columns, limit, region=None, cursor=None):
+        query = self._table("news_archive").select(columns)
+        if region:
+            query = query.eq("region", region)
+        if cursor:
+            query = query.or_(_after(cursor, "created_at"))
+        return query.order("created_at", desc=True).order("id", desc=True).limit(limit).execute().data
+
+    def search_archive(self, query, limit=25, region=None):
+        return self._rpc("search_archive", {"query": query, "max_results": limit, "region_filter": region})
+
+    def add_archive_items(self, rows):
+        if rows:
+            self._table("news_archive").upsert(list(rows), on_conflict="url", ignore_duplicates=True).execute()
+
+    def active_feeds(self, columns, offset, limit):
+        return (self._table("feed_registry").select(columns).eq("active", True)
+                .order("id").range(offset, offset + limit - 1).execute().data)
+
+    def update_feeds(self, rows):
+        if rows:
+            self._table("feed_registry").upsert(list(rows), on_conflict="id").execute()
+
+    def register_feeds(self, rows):
+        if rows:
+            self._table("feed_registry").upsert(list(rows), on_conflict="url", ignore_duplicates=True).execute()
+
+    def feed_health(self):
+        active = self._table("feed_registry").select("id", count="exact").eq("active", True).limit(1).execute().count
+        failing = (self._table("feed_registry").select("id", count="exact").eq("active", True)
+                   .gt("failure_count", 0).limit(1).execute().count)
+        return active or 0, failing or 0
+
+    def store_evidence_file(self, key, stream, size, content_type):
+        bucket = self.client.storage.from_(EVIDENCE_BUCKET)
+        if size <= UPLOAD_CHUNK_BYTES:
+            stream.seek(0)
+            bucket.upload(path=key, file=stream.read(), file_options={"content-type": content_type, "upsert": "true"})
+        else:
+            self._resumable_upload(key, stream, size, content_type)
+        return bucket.get_public_url(key)
+
+    def _resumable_upload(self, key, stream, size, content_type):
+        """TUS upload in UPLOAD_CHUNK_BYTES chunks. After a failure the upload URL is kept,
+        and the next attempt asks the server how much it has and continues from there."""
+        session = get_http_session()
+        endpoint = f"{self.client.supabase_url.rstrip('/')}/storage/v1/upload/resumable"
+        headers = {"authorization": f"Bearer {self.client.supabase_key}", "apikey": self.client.supabase_key,
+                   "tus-resumable": "1.0.0", "x-upsert": "true"}
+        metadata = {"bucketName": EVIDENCE_BUCKET, "objectName": key, "contentType": content_type, "cacheControl": "3600"}
+        for attempt in range(UPLOAD_RETRIES):
+            try:
+                with self.lock:
+                    location = self.uploads.get(key)
+                if location is None:
+                    encoded = ",".join(f"{k} {base64.b64encode(v.encode()).decode()}" for k, v in metadata.items())
+                    res = session.post(endpoint, headers={**headers, "upload-length": str(size), "upload-metadata": encoded}, timeout=30)
+                    res.raise_for_status()
+                    location = urljoin(endpoint, res.headers["location"])
+                    with self.lock:
+                        self.uploads[key] = location
+                    offset = 0
+                else:
+                    res = session.head(location, headers=headers, timeout=30)
+                    if res.status_code in (404, 410):   # expired upload: start over
+                        with self.lock:
+                            self.uploads.pop(key, None)
+                        continue
+                    res.raise_for_status()
+                    offset = int(res.headers["upload-offset"])
+                while offset < size:
+                    stream.seek(offset)
+                    res = session.patch(location, data=stream.read(UPLOAD_CHUNK_BYTES), timeout=120,
+                                        headers={**headers, "upload-offset": str(offset),
+                                                 "content-type": "application/offset+octet-stream"})
+                    res.raise_for_status()
+                    offset = int(res.headers["upload-offset"])
+                with self.lock:
+                    self.uploads.pop(key, None)
+                return
+            except requests.RequestException:
+                if attempt == UPLOAD_RETRIES - 1:
+                    raise
+                time.sleep(2 ** attempt)
+        raise RuntimeError(f"upload of {key} kept expiring")
+
+    def read_evidence_file(self, key):
+        return self.client.storage.from_(EVIDENCE_BUCKET).download(key)
+
+    def find_evidence(self, content_hash):
+        rows = self._table("evidence_locker").select("*").eq("content_hash", content_hash).limit(1).execute().data
+        return rows[0] if rows else None
+
+    def add_evidence(self, row):
+        rows = self._table("evidence_locker").upsert(row, on_conflict="content_hash", ignore_duplicates=True).execute().data
+        return rows[0] if rows else self.find_evidence(row.get('content_hash'))
+
+    def claim_evidence(self, limit, stale_after_s):
+        return self._rpc("claim_evidence", {"p_limit": limit, "p_stale_after": f"{int(stale_after_s)} seconds"})
+
+    def update_evidence(self, evidence_id, fields):
+        self._table("evidence_locker").update(fields).eq("id", evidence_id).execute()
+
+    def search_evidence(self, query, limit=20):
+        return self._rpc("search_evidence", {"query": query, "max_results": limit})
+
+    def analyst_score(self, user_name):
+        rows = self._table("analyst_scores").select("score").eq("user_name", user_name).execute().data
+        return rows[0]['score'] if rows else None
+
+    def open_account(self, user_name, score):
+        self._table("analyst_scores").upsert({"user_name": user_name, "score": score},
+                                            on_conflict="user_name", ignore_duplicates=True).execute()
+
+    def place_prediction(self, user_name, claim, deadline, confidence, wager, starting_score):
+        return self._rpc("place_prediction", {"p_user": user_name, "p_claim": claim, "p_deadline": str(deadline),
+                                              "p_confidence": confidence, "p_wager": wager,
+                                              "p_starting_score": starting_score})
+
+    def resolve_prediction(self, prediction_id, won):
+        return self._rpc("resolve_prediction", {"p_id": prediction_id, "p_won": won})
+
+    def resolve_predictions(self, ids, won):
+        return self._rpc("resolve_predictions", {"p_ids": list(ids), "p_won": [bool(w) for w in won]})
+
+    def resolve_expired_predictions(self, grace_days, limit, as_of=None):
+        params = {"p_grace_days": grace_days, "p_limit": limit}
+        if as_of is not None:
+            params["p_as_of"] = str(as_of)
+        return self._rpc("resolve_expired_predictions", params)['expired']
+
+    def open_predictions(self, columns, limit, cursor=None, overdue_before=None):
+        query = self._table("predictions").select(columns).eq("status", "Open")
+        if overdue_before:
+            # Overdue queue: oldest deadline first, served by the (deadline, id) index.
+            query = query.lt("deadline", str(overdue_before))
+            if cursor:
+                query = query.or_(_after(cursor, "deadline", desc=False))
+            query = query.order("deadline").order("id")
+        else:
+            if cursor:
+                query = query.or_(_after(cursor, "created_at"))
+            query = query.order("created_at", desc=True).order("id", desc=True)
+        return query.limit(limit).execute().data
+
+    def resolved_predictions(self, limit):
+        return (self._table("predictions").select("id, user_name, claim, outcome").eq("status", "Resolved")
+                .order("created_at", desc=True).limit(limit).execute().data)
+
+    def dashboard_stats(self, recent_limit, case_limit):
+        return self._rpc("dashboard_stats", {"recent_limit": recent_limit, "case_limit": case_limit})
+
+
+def open_repository(backend, supabase=None, path=None):
+    """Builds a backend by name: "supabase" wraps `supabase` (a client), "sqlite" opens `path`."""
+    if backend == "supabase":
+        return SupabaseRepository(supabase) if supabase is not None else None
+    if backend == "sqlite":
+        from daylight.sqlite_repository import SQLiteRepository
+        return SQLiteRepository(path or os.path.join(CACHE_DIR, "daylight.sqlite3"))
+    raise ValueError(f"unknown DAYLIGHT_BACKEND {backend!r}; expected one of {', '.join(BACKENDS)}")
+
+
+@st.cache_resource(show_spinner=False)
+def get_repository():
+    """Returns the shared repository, or None when the configured backend is unavailable."""
+    config = load_config()
+    backend = (config.get("DAYLIGHT_BACKEND") or "supabase").lower()
+    return open_repository(backend, supabase=get_supabase() if backend == "supabase" else None,
+                           path=config.get("DAYLIGHT_DB_PATH"))
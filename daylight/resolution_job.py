@@ -0,0 +1,52 @@
+"""Headless job that expires overdue Futures Desk predictions in bulk.
+
+Predictions still Open more than `--grace-days` after their deadline are closed
+as Expired in batches of set-based updates (sql/007_prediction_resolution.sql),
+found through the partial (deadline, id) index on open predictions.
+
+    python -m daylight.resolution_job            # run every --interval seconds
+    python -m daylight.resolution_job --once     # expire everything due, then exit
+"""
+import argparse
+import logging
+import time
+
+from daylight.futures import EXPIRY_BATCH, GRACE_DAYS, resolve_expired
+from daylight.repository import get_repository
+
+log = logging.getLogger("daylight.resolution")
+
+
+def expire_all(grace_days=GRACE_DAYS, batch_size=EXPIRY_BATCH):
+    """Runs expiry batches until none is full. Returns the number of predictions closed."""
+    total = 0
+    while True:
+        closed = resolve_expired(grace_days, batch_size)
+        total += closed
+        if closed < batch_size:
+            return total
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Daylight prediction expiry job")
+    parser.add_argument("--once", action="store_true", help="expire everything due once, then exit")
+    parser.add_argument("--grace-days", type=int, default=GRACE_DAYS, help="days after the deadline to wait for a verdict")
+    parser.add_argument("--batch-size", type=int, default=EXPIRY_BATCH, help="predictions closed per statement")
+    parser.add_argument("--interval", type=float, default=3600, help="seconds between runs")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
+
+    if not get_repository():
+        raise SystemExit("SUPABASE_URL / SUPABASE_KEY are not configured (or set DAYLIGHT_BACKEND=sqlite).")
+    while True:
+        try:
+            log.info("expired %d overdue predictions", expire_all(args.grace_days, args.batch_size))
+        except Exception as e:
+            log.warning("expiry run failed: %s", e)
+        if args.once:
+            return
+        time.sleep(args.interval)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,593 @@
+"""Embedded SQLite backend for the repository (DAYLIGHT_BACKEND=sqlite).
+
+Everything lives in one database file next to the local caches, so a single-node
+or air-gapped deployment needs no network and reads are index lookups in the
+same process. The schema mirrors the Postgres tables and the indexes added in
+sql/002-008:
+
+- keyset pages (archive, ledger, open positions) read (created_at desc, id desc)
+  or (deadline, id) indexes with row-value comparisons;
+- full-text search is an FTS5 index over title and description (porter stemming,
+  bm25 ranking with the title weighted double), kept current by triggers;
+- the Command Center counters are maintained by triggers, as in sql/008;
+- evidence files are stored under `evidence/` next to the database, one per
+  content hash, and their names, notes, metadata values and extracted text are
+  in a second FTS5 index (sql/009);
+- the escrow RPCs (sql/006, 007) run as BEGIN IMMEDIATE transactions, so
+  concurrent bets and resolutions are serialized like the row locks in Postgres.
+
+Each thread gets its own connection (WAL journal: readers never block the writer).
+The path must be a file; `:memory:` would give every thread a separate database.
+"""
+import json
+import os
+import re
+import sqlite3
+import threading
+from contextlib import contextmanager
+from datetime import date, datetime, timedelta, timezone
+from pathlib import Path
+
+from daylight.repository import Repository
+
+BUSY_TIMEOUT_MS = 5000
+MAX_VARIABLES = 500       # ids per IN (...) list
+COPY_CHUNK_BYTES = 1024 * 1024
+NOW = "(strftime('%Y-%m-%dT%H:%M:%f+00:00', 'now'))"
+
+SCHEMA = f"""
+CREATE TABLE IF NOT EXISTS investigations (
+    id          INTEGER PRIMARY KEY AUTOINCREMENT,
+    created_at  TEXT NOT NULL DEFAULT {NOW},
+    title       TEXT NOT NULL,
+    description TEXT,
+    status      TEXT NOT NULL DEFAULT 'Active'
+);
+CREATE INDEX IF NOT EXISTS investigations_created_idx ON investigations (created_at DESC, id DESC);
+CREATE INDEX IF NOT EXISTS investigations_status_idx ON investigations (status, created_at DESC, id DESC);
+
+CREATE TABLE IF NOT EXISTS intel_ledger (
+    id               INTEGER PRIMARY KEY AUTOINCREMENT,
+    created_at       TEXT NOT NULL DEFAULT {NOW},
+    investigation_id INTEGER NOT NULL REFERENCES investigations (id) ON DELETE CASCADE,
+    type             TEXT NOT NULL,
+    content          TEXT NOT NULL,
+    UNIQUE (investigation_id, type, content)
+);
+CREATE INDEX IF NOT EXISTS intel_ledger_case_created_idx ON intel_ledger (investigation_id, created_at DESC, id DESC);
+
+CREATE TABLE IF NOT EXISTS news_archive (
+    id          INTEGER PRIMARY KEY AUTOINCREMENT,
+    created_at  TEXT NOT NULL DEFAULT {NOW},
+    source      TEXT,
+    country     TEXT,
+    region      TEXT,
+    title       TEXT,
+    url         TEXT UNIQUE,
+    description TEXT
+);
+CREATE INDEX IF NOT EXISTS news_archive_created_idx ON news_archive (created_at DESC, id DESC);
+CREATE INDEX IF NOT EXISTS news_archive_region_created_idx ON news_archive (region, created_at DESC, id DESC);
+CREATE VIRTUAL TABLE IF NOT EXISTS news_archive_fts USING fts5 (
+    title, description, content='news_archive', content_rowid='id', tokenize='porter unicode61'
+);
+CREATE TRIGGER IF NOT EXISTS news_archive_fts_ins AFTER INSERT ON news_archive BEGIN
+    INSERT INTO news_archive_fts (rowid, title, description) VALUES (new.id, new.title, new.description);
+END;
+CREATE TRIGGER IF NOT EXISTS news_archive_fts_del AFTER DELETE ON news_archive BEGIN
+    INSERT INTO news_archive_fts (news_archive_fts, rowid, title, description) VALUES ('delete', old.id, old.title, old.description);
+END;
+CREATE TRIGGER IF NOT EXISTS news_archive_fts_upd AFTER UPDATE OF title, description ON news_archive BEGIN
+    INSERT INTO news_archive_fts (news_archive_fts, rowid, title, description) VALUES ('delete', old.id, old.title, old.description);
+    INSERT INTO news_archive_fts (rowid, title, description) VALUES (new.id, new.title, new.description);
+END;
+
+CREATE TABLE IF NOT EXISTS evidence_locker (
+    id          INTEGER PRIMARY KEY AUTOINCREMENT,
+    created_at  TEXT NOT NULL DEFAULT {NOW},
+    filename    TEXT,
+    file_url    TEXT,
+    media_type  TEXT,
+    description TEXT
+);
+
+CREATE TABLE IF NOT EXISTS feed_registry (
+    id              INTEGER PRIMARY KEY AUTOINCREMENT,
+    source          TEXT NOT NULL,
+    country         TEXT NOT NULL,
+    region          TEXT NOT NULL,
+    url             TEXT NOT NULL UNIQUE,
+    active          INTEGER NOT NULL DEFAULT 1,
+    item_limit      INTEGER NOT NULL DEFAULT 20,
+    poll_interval_s INTEGER NOT NULL DEFAULT 900,
+    next_poll_at    TEXT NOT NULL DEFAULT {NOW},
+    last_polled_at  TEXT,
+    publish_rate    REAL NOT NULL DEFAULT 0,
+    failure_count   INTEGER NOT NULL DEFAULT 0,
+    last_error      TEXT,
+    etag            TEXT,
+    last_modified   TEXT,
+    created_at      TEXT NOT NULL DEFAULT {NOW}
+);
+CREATE INDEX IF NOT EXISTS feed_registry_due_idx ON feed_registry (next_poll_at) WHERE active;
+
+CREATE TABLE IF NOT EXISTS analyst_scores (
+    id         INTEGER PRIMARY KEY AUTOINCREMENT,
+    created_at TEXT NOT NULL DEFAULT {NOW},
+    user_name  TEXT NOT NULL UNIQUE,
+    score      INTEGER NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS predictions (
+    id         INTEGER PRIMARY KEY AUTOINCREMENT,
+    created_at TEXT NOT NULL DEFAULT {NOW},
+    user_name  TEXT NOT NULL,
+    claim      TEXT,
+    deadline   TEXT,
+    confidence INTEGER,
+    wager      INTEGER NOT NULL,
+    status     TEXT NOT NULL DEFAULT 'Open',
+    outcome    TEXT
+);
+CREATE INDEX IF NOT EXISTS predictions_open_deadline_idx ON predictions (deadline, id) WHERE status = 'Open';
+CREATE INDEX IF NOT EXISTS predictions_open_created_idx ON predictions (created_at DESC, id DESC) WHERE status = 'Open';
+CREATE INDEX IF NOT EXISTS predictions_resolved_created_idx ON predictions (created_at DESC) WHERE status = 'Resolved';
+
+CREATE TABLE IF NOT EXISTS dashboard_counters (
+    name  TEXT PRIMARY KEY,
+    value INTEGER NOT NULL DEFAULT 0
+);
+INSERT OR IGNORE INTO dashboard_counters (name, value) VALUES
+    ('active_cases', (SELECT count(*) FROM investigations WHERE status = 'Active')),
+    ('signals',      (SELECT count(*) FROM news_archive)),
+    ('evidence',     (SELECT count(*) FROM evidence_locker));
+CREATE TRIGGER IF NOT EXISTS news_archive_count_ins AFTER INSERT ON news_archive BEGIN
+    UPDATE dashboard_counters SET value = value + 1 WHERE name = 'signals';
+END;
+CREATE TRIGGER IF NOT EXISTS news_archive_count_del AFTER DELETE ON news_archive BEGIN
+    UPDATE dashboard_counters SET value = value - 1 WHERE name = 'signals';
+END;
+CREATE TRIGGER IF NOT EXISTS evidence_locker_count_ins AFTER INSERT ON evidence_locker BEGIN
+    UPDATE dashboard_counters SET value = value + 1 WHERE name = 'evidence';
+END;
+CREATE TRIGGER IF NOT EXISTS evidence_locker_count_del AFTER DELETE ON evidence_locker BEGIN
+    UPDATE dashboard_counters SET value = value - 1 WHERE name = 'evidence';
+END;
+CREATE TRIGGER IF NOT EXISTS investigations_count_ins AFTER INSERT ON investigations WHEN new.status = 'Active' BEGIN
+    UPDATE dashboard_counters SET value = value + 1 WHERE name = 'active_cases';
+END;
+CREATE TRIGGER IF NOT EXISTS investigations_count_upd AFTER UPDATE OF status ON investigations BEGIN
+    UPDATE dashboard_counters SET value = value + (new.status = 'Active') - (old.status = 'Active') WHERE name = 'active_cases';
+END;
+CREATE TRIGGER IF NOT EXISTS investigations_count_del AFTER DELETE ON investigations WHEN old.status = 'Active' BEGIN
+    UPDATE dashboard_counters SET value = value - 1 WHERE name = 'active_cases';
+END;
+"""
+
+_TERM = re.compile(r'(-?)"([^"]*)"|(\S+)')
+
+
+# sql/009, added to existing database files on open.
+EVIDENCE_COLUMNS = {
+    "content_hash": "TEXT",
+    "storage_key": "TEXT",
+    "size_bytes": "INTEGER",
+    "mime_type": "TEXT",
+    "status": "TEXT NOT NULL DEFAULT 'ready'",
+    "thumbnail_url": "TEXT",
+    "metadata": "TEXT NOT NULL DEFAULT '{}'",    # JSON
+    "extracted_text": "TEXT",
+    "claimed_at": "TEXT",
+    "processed_at": "TEXT",
+    "processing_error": "TEXT",
+}
+
+# The metadata column of the index holds the JSON's string values, not the JSON.
+_METADATA_TEXT = "(SELECT group_concat(value, ' ') FROM json_tree({}.metadata) WHERE type = 'text')"
+
+EVIDENCE_SCHEMA = f"""
+CREATE UNIQUE INDEX IF NOT EXISTS evidence_locker_content_hash_key ON evidence_locker (content_hash);
+CREATE INDEX IF NOT EXISTS evidence_locker_queue_idx ON evidence_locker (created_at, id)
+    WHERE status IN ('pending', 'processing');
+
+CREATE VIRTUAL TABLE IF NOT EXISTS evidence_fts USING fts5(
+    filename, description, metadata, extracted_text,
+    content='evidence_locker', content_rowid='id', tokenize='porter unicode61'
+);
+
+CREATE TRIGGER IF NOT EXISTS evidence_fts_ins AFTER INSERT ON evidence_locker BEGIN
+    INSERT INTO evidence_fts (rowid, filename, description, metadata, extracted_text)
+    VALUES (new.id, new.filename, new.description, {_METADATA_TEXT.format('new')}, new.extracted_text);
+END;
+CREATE TRIGGER IF NOT EXISTS evidence_fts_del AFTER DELETE ON evidence_locker BEGIN
+    INSERT INTO evidence_fts (evidence_fts, rowid, filename, description, metadata, extracted_text)
+    VALUES ('delete', old.id, old.filename, old.description, {_METADATA_TEXT.format('old')}, old.extracted_text);
+END;
+CREATE TRIGGER IF NOT EXISTS evidence_fts_upd AFTER UPDATE OF filename, description, metadata, extracted_text ON evidence_locker BEGIN
+    INSERT INTO evidence_fts (evidence_fts, rowid, filename, description, metadata, extracted_text)
+    VALUES ('delete', old.id, old.filename, old.description, {_METADATA_TEXT.format('old')}, old.extracted_text);
+    INSERT INTO evidence_fts (rowid, filename, description, metadata, extracted_text)
+    VALUES (new.id, new.filename, new.description, {_METADATA_TEXT.format('new')}, new.extracted_text);
+END;
+"""
+
+
+def fts_query(query):
+    """Translates websearch syntax (terms, "phrases", OR, -exclusions) into an FTS5 query.
+
+    Returns None when nothing is left to match.
+    """
+    groups, excluded, pending_or = [], [], False
+    for negate, phrase, word in _TERM.findall(query):
+        if word and word.upper() == "OR":
+            pending_or = bool(groups)
+            continue
+        if word.startswith("-") and len(word) > 1:
+            negate, word = "-", word[1:]
+        text = " ".join(re.findall(r"\w+", phrase if phrase else word))
+        if not text:
+            continue
+        term = '"' + text.replace('"', '""') + '"'
+        if negate:
+            excluded.append(term)
+        elif pending_or:
+            groups[-1].append(term)
+        else:
+            groups.append([term])
+        pending_or = False
+    if not groups:
+        return None
+    match = " AND ".join("(" + " OR ".join(group) + ")" for group in groups)
+    return match + "".join(f" NOT {term}" for term in excluded)
+
+
+def _dict_row(cursor, row):
+    return {column[0]: value for column, value in zip(cursor.description, row)}
+
+
+class SQLiteRepository(Repository):
+    """The repository in one SQLite file."""
+
+    def __init__(self, path):
+        self.path = os.path.abspath(path)
+        self.files_dir = os.path.join(os.path.dirname(self.path), "evidence")
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        self.local = threading.local()
+        self._db().executescript(SCHEMA)
+        self._migrate_evidence()
+        self.columns = {table: {row['name'] for row in self._db().execute(f"PRAGMA table_info({table})")}
+                        for table in ("investigations", "intel_ledger", "news_archive", "evidence_locker",
+                                      "feed_registry", "analyst_scores", "predictions")}
+
+    def _migrate_evidence(self):
+        db = self._db()
+        existing = {row['name'] for row in db.execute("PRAGMA table_info(evidence_locker)")}
+        indexed = db.execute("SELECT 1 FROM sqlite_master WHERE name = 'evidence_fts'").fetchone()
+        for column, definition in EVIDENCE_COLUMNS.items():
+            if column not in existing:
+                db.execute(f"ALTER TABLE evidence_locker ADD COLUMN {column} {definition}")
+        db.executescript(EVIDENCE_SCHEMA)
+        if not indexed:   # rows stored before the index existed
+            db.execute("INSERT INTO evidence_fts (rowid, filename, description, metadata, extracted_text) "
+                       f"SELECT id, filename, description, {_METADATA_TEXT.format('evidence_locker')}, extracted_text "
+                       "FROM evidence_locker")
+
+    def _db(self):
+        db = getattr(self.local, "db", None)
+        if db is None:
+            db = sqlite3.connect(self.path, isolation_level=None, check_same_thread=False, timeout=BUSY_TIMEOUT_MS / 1000)
+            db.row_factory = _dict_row
+            db.execute("PRAGMA journal_mode=WAL")
+            db.execute("PRAGMA synchronous=NORMAL")
+            db.execute("PRAGMA foreign_keys=ON")
+            self.local.db = db
+        return db
+
+    @contextmanager
+    def _write(self):
+        """One write transaction; the database lock is taken up front, as a row lock would be."""
+        db = self._db()
+        db.execute("BEGIN IMMEDIATE")
+        try:
+            yield db
+        except BaseException:
+            db.execute("ROLLBACK")
+            raise
+        db.execute("COMMIT")
+
+    def _select(self, table, columns):
+        """Validated column list for a "a, b" / "*" projection string."""
+        if columns.strip() == "*":
+            return "*"
+        names = [c.strip() for c in columns.split(",") if c.strip()]
+        unknown = [n for n in names if n not in self.columns[table]]
+        if unknown:
+            raise ValueError(f"unknown {table} columns: {', '.join(unknown)}")
+        return ", ".join(names)
+
+    def _insert(self, db, table, row, conflict="", returning=True):
+        columns = [c for c in row if c in self.columns[table]]
+        sql = (f"INSERT INTO {table} ({', '.join(columns)}) VALUES ({', '.join('?' * len(columns))}) {conflict}"
+               + (" RETURNING *" if returning else ""))
+        cursor = db.execute(sql, [row[c] for c in columns])
+        return cursor.fetchone() if returning else None
+
+    # --- investigations ---
+
+    def list_cases(self):
+        return self._db().execute("SELECT * FROM investigations ORDER BY created_at DESC, id DESC").fetchall()
+
+    def list_active_cases(self):
+        return self._db().execute("SELECT id, title FROM investigations WHERE status = 'Active' "
+                                  "ORDER BY created_at DESC, id DESC").fetchall()
+
+    def get_case(self, case_id):
+        return self._db().execute("SELECT * FROM investigations WHERE id = ?", (case_id,)).fetchone()
+
+    def create_case(self, title, description, status="Active"):
+        with self._write() as db:
+            return self._insert(db, "investigations", {"title": title, "description": description, "status": status})
+
+    def delete_case(self, case_id):
+        with self._write() as db:
+            db.execute("DELETE FROM investigations WHERE id = ?", (case_id,))
+
+    # --- intel ledger ---
+
+    def case_ledger(self, case_id):
+        return self._db().execute("SELECT * FROM intel_ledger WHERE investigation_id = ? "
+                                  "ORDER BY created_at DESC, id DESC", (case_id,)).fetchall()
+
+    def ledger_probe(self, case_id):
+        row = self._db().execute("SELECT count(*) AS n, coalesce(max(id), 0) AS max_id FROM intel_ledger "
+                                 "WHERE investigation_id = ?", (case_id,)).fetchone()
+        return row['n'], row['max_id']
+
+    def add_ledger_rows(self, rows):
+        inserted = []
+        with self._write() as db:
+            for row in rows:
+                stored = self._insert(db, "intel_ledger", row, "ON CONFLICT (investigation_id, type, content) DO NOTHING")
+                if stored:
+                    inserted.append(stored)
+        return inserted
+
+    def delete_ledger_rows(self, row_ids):
+        row_ids = list(row_ids)
+        with self._write() as db:
+            for start in range(0, len(row_ids), MAX_VARIABLES):
+                chunk = row_ids[start:start + MAX_VARIABLES]
+                db.execute(f"DELETE FROM intel_ledger WHERE id IN ({', '.join('?' * len(chunk))})", chunk)
+
+    # --- news archive ---
+
+    def archive_page(self, columns, limit, region=None, cursor=None):
+        where, params = [], []
+        if region:
+            where.append("region = ?")
+            params.append(region)
+        if cursor:
+            where.append("(created_at, id) < (?, ?)")
+            params.extend(cursor)
+        sql = (f"SELECT {self._select('news_archive', columns)} FROM news_archive"
+               + (" WHERE " + " AND ".join(where) if where else "")
+               + " ORDER BY created_at DESC, id DESC LIMIT ?")
+        return self._db().execute(sql, params + [limit]).fetchall()
+
+    def search_archive(self, query, limit=25, region=None):
+        match = fts_query(query)
+        if match is None:
+            return []
+        sql = ("SELECT a.id, a.created_at, a.source, a.country, a.region, a.title, a.url, a.description, "
+               "-bm25(news_archive_fts, 2.0, 1.0) AS rank "
+               "FROM news_archive_fts JOIN news_archive a ON a.id = news_archive_fts.rowid "
+               "WHERE news_archive_fts MATCH ?" + (" AND a.region = ?" if region else "")
+               + " ORDER BY rank DESC, a.created_at DESC LIMIT ?")
+        return self._db().execute(sql, [match] + ([region] if region else []) + [limit]).fetchall()
+
+    def add_archive_items(self, rows):
+        with self._write() as db:
+            for row in rows:
+                self._insert(db, "news_archive", row, "ON CONFLICT (url) DO NOTHING", returning=False)
+
+    # --- feed registry ---
+
+    def active_feeds(self, columns, offset, limit):
+        return self._db().execute(f"SELECT {self._select('feed_registry', columns)} FROM feed_registry WHERE active "
+                                  "ORDER BY id LIMIT ? OFFSET ?", (limit, offset)).fetchall()
+
+    def update_feeds(self, rows):
+        with self._write() as db:
+            for row in rows:
+                columns = [c for c in row if c in self.columns["feed_registry"] and c != "id"]
+                self._insert(db, "feed_registry", row,
+                             "ON CONFLICT (id) DO UPDATE SET " + ", ".join(f"{c} = excluded.{c}" for c in columns),
+                             returning=False)
+
+    def register_feeds(self, rows):
+        with self._write() as db:
+            for row in rows:
+                self._insert(db, "feed_registry", row, "ON CONFLICT (url) DO NOTHING", returning=False)
+
+    def feed_health(self):
+        row = self._db().execute("SELECT count(*) AS active, coalesce(sum(failure_count > 0), 0) AS failing "
+                                 "FROM feed_registry WHERE active").fetchone()
+        return row['active'], row['failing']
+
+    # --- evidence ---
+
+    def _evidence_path(self, key):
+        path = Path(self.files_dir, key).resolve()
+        if not path.is_relative_to(Path(self.files_dir).resolve()):
+            raise ValueError(f"evidence key outside the store: {key}")
+        return path
+
+    def store_evidence_file(self, key, stream, size, content_type):
+        path = self._evidence_path(key)
+        if path.exists() and path.stat().st_size == size:
+            return str(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        partial = path.with_name(path.name + ".part")
+        offset = partial.stat().st_size if partial.exists() else 0
+        if offset > size:
+            offset = 0
+        stream.seek(offset)
+        with open(partial, "r+b" if offset else "wb") as out:
+            out.seek(offset)
+            out.truncate()
+            while chunk := stream.read(COPY_CHUNK_BYTES):
+                out.write(chunk)
+        if partial.stat().st_size != size:
+            partial.unlink()
+            raise OSError(f"stored {key} has the wrong size; upload it again")
+        os.replace(partial, path)
+        return str(path)
+
+    def read_evidence_file(self, key):
+        return self._evidence_path(key).read_bytes()
+
+    @staticmethod
+    def _evidence_row(row):
+        if row and isinstance(row.get('metadata'), str):
+            row['metadata'] = json.loads(row['metadata'] or "{}")
+        return row
+
+    def find_evidence(self, content_hash):
+        return self._evidence_row(self._db().execute("SELECT * FROM evidence_locker WHERE content_hash = ?",
+                                                     (content_hash,)).fetchone())
+
+    def add_evidence(self, row):
+        if isinstance(row.get('metadata'), dict):
+            row = {**row, "metadata": json.dumps(row['metadata'])}
+        with self._write() as db:
+            stored = self._insert(db, "evidence_locker", row, "ON CONFLICT (content_hash) DO NOTHING")
+        return self._evidence_row(stored) or self.find_evidence(row.get('content_hash'))
+
+    def claim_evidence(self, limit, stale_after_s):
+        stale = (datetime.now(timezone.utc) - timedelta(seconds=stale_after_s)).isoformat(timespec="milliseconds")
+        with self._write() as db:
+            rows = db.execute(f"UPDATE evidence_locker SET status = 'processing', claimed_at = {NOW} WHERE id IN ("
+                              "SELECT id FROM evidence_locker WHERE status = 'pending' "
+                              "OR (status = 'processing' AND claimed_at < ?) ORDER BY created_at, id LIMIT ?) "
+                              "RETURNING *", (stale, limit)).fetchall()
+        return sorted((self._evidence_row(row) for row in rows), key=lambda r: (r['created_at'], r['id']))
+
+    def update_evidence(self, evidence_id, fields):
+        unknown = [c for c in fields if c not in self.columns["evidence_locker"] or c == "id"]
+        if unknown:
+            raise ValueError(f"unknown evidence_locker columns: {', '.join(unknown)}")
+        if isinstance(fields.get('metadata'), dict):
+            fields = {**fields, "metadata": json.dumps(fields['metadata'])}
+        with self._write() as db:
+            db.execute(f"UPDATE evidence_locker SET {', '.join(f'{c} = ?' for c in fields)} WHERE id = ?",
+                       [*fields.values(), evidence_id])
+
+    def search_evidence(self, query, limit=20):
+        match = fts_query(query)
+        if match is None:
+            return []
+        sql = ("SELECT e.id, e.created_at, e.filename, e.file_url, e.storage_key, e.media_type, e.description, e.mime_type, "
+               "e.size_bytes, e.status, e.thumbnail_url, e.metadata, -bm25(evidence_fts, 4.0, 4.0, 2.0, 1.0) AS rank, "
+               "snippet(evidence_fts, 3, '<b>', '</b>', '…', 30) AS snippet "
+               "FROM evidence_fts JOIN evidence_locker e ON e.id = evidence_fts.rowid "
+               "WHERE evidence_fts MATCH ? ORDER BY rank DESC, e.created_at DESC LIMIT ?")
+        return [self._evidence_row(row) for row in self._db().execute(sql, (match, limit)).fetchall()]
+
+    # --- futures desk ---
+
+    def analyst_score(self, user_name):
+        row = self._db().execute("SELECT score FROM analyst_scores WHERE user_name = ?", (user_name,)).fetchone()
+        return row['score'] if row else None
+
+    def open_account(self, user_name, score):
+        with self._write() as db:
+            db.execute("INSERT INTO analyst_scores (user_name, score) VALUES (?, ?) ON CONFLICT (user_name) DO NOTHING",
+                       (user_name, score))
+
+    def place_prediction(self, user_name, claim, deadline, confidence, wager, starting_score):
+        if wager is None or wager <= 0:
+            raise ValueError("wager must be positive")
+        with self._write() as db:
+            db.execute("INSERT INTO analyst_scores (user_name, score) VALUES (?, ?) ON CONFLICT (user_name) DO NOTHING",
+                       (user_name, starting_score))
+            debited = db.execute("UPDATE analyst_scores SET score = score - ? WHERE user_name = ? AND score >= ? "
+                                 "RETURNING score", (wager, user_name, wager)).fetchone()
+            if debited is None:
+                score = db.execute("SELECT score FROM analyst_scores WHERE user_name = ?", (user_name,)).fetchone()['score']
+                return {"ok": False, "score": score, "prediction_id": None}
+            prediction = self._insert(db, "predictions", {"user_name": user_name, "claim": claim, "deadline": str(deadline),
+                                                          "confidence": confidence, "wager": wager, "status": "Open"})
+        return {"ok": True, "score": debited['score'], "prediction_id": prediction['id']}
+
+    def resolve_prediction(self, prediction_id, won):
+        with self._write() as db:
+            closed = db.execute("UPDATE predictions SET status = 'Resolved', outcome = ? WHERE id = ? AND status = 'Open' "
+                                "RETURNING user_name, wager", ("Correct" if won else "Incorrect", prediction_id)).fetchone()
+            if closed is None:
+                return {"ok": False, "user_name": None, "payout": 0, "score": None}
+            payout = closed['wager'] * 2 if won else 0
+            row = db.execute("UPDATE analyst_scores SET score = score + ? WHERE user_name = ? RETURNING score",
+                             (payout, closed['user_name'])).fetchone()
+        return {"ok": True, "user_name": closed['user_name'], "payout": payout, "score": row['score'] if row else None}
+
+    def resolve_predictions(self, ids, won):
+        verdicts = dict(zip(ids, won))
+        resolved = wins = 0
+        payouts = {}
+        with self._write() as db:
+            for prediction_id, verdict in verdicts.items():
+                closed = db.execute("UPDATE predictions SET status = 'Resolved', outcome = ? WHERE id = ? AND status = 'Open' "
+                                    "RETURNING user_name, wager", ("Correct" if verdict else "Incorrect", prediction_id)).fetchone()
+                if closed is None:
+                    continue
+                resolved += 1
+                if verdict:
+                    wins += 1
+                    payouts[closed['user_name']] = payouts.get(closed['user_name'], 0) + closed['wager'] * 2
+            paid = sum(db.execute("UPDATE analyst_scores SET score = score + ? WHERE user_name = ?", (amount, user)).rowcount
+                       for user, amount in payouts.items())
+        return {"resolved": resolved, "won": wins, "paid_out": sum(payouts.values()), "analysts_paid": paid}
+
+    def resolve_expired_predictions(self, grace_days, limit, as_of=None):
+        as_of = date.fromisoformat(str(as_of)) if as_of is not None else datetime.now(timezone.utc).date()
+        with self._write() as db:
+            return db.execute("UPDATE predictions SET status = 'Resolved', outcome = 'Expired' WHERE id IN ("
+                              "SELECT id FROM predictions WHERE status = 'Open' AND deadline < ? ORDER BY deadline, id LIMIT ?)",
+                              (str(as_of - timedelta(days=grace_days)), limit)).rowcount
+
+    def open_predictions(self, columns, limit, cursor=None, overdue_before=None):
+        where, params = ["status = 'Open'"], []
+        if overdue_before:
+            where.append("deadline < ?")
+            params.append(str(overdue_before))
+            if cursor:
+                where.append("(deadline, id) > (?, ?)")
+                params.extend(cursor)
+            order = "deadline, id"
+        else:
+            if cursor:
+                where.append("(created_at, id) < (?, ?)")
+                params.extend(cursor)
+            order = "created_at DESC, id DESC"
+        sql = (f"SELECT {self._select('predictions', columns)} FROM predictions WHERE {' AND '.join(where)} "
+               f"ORDER BY {order} LIMIT ?")
+        return self._db().execute(sql, params + [limit]).fetchall()
+
+    def resolved_predictions(self, limit):
+        return self._db().execute("SELECT id, user_name, claim, outcome FROM predictions WHERE status = 'Resolved' "
+                                  "ORDER BY created_at DESC LIMIT ?", (limit,)).fetchall()
+
+    # --- command center ---
+
+    def dashboard_stats(self, recent_limit, case_limit):
+        db = self._db()
+        counters = {row['name']: row['value'] for row in db.execute("SELECT name, value FROM dashboard_counters")}
+        return {
+            "active_cases": counters.get("active_cases", 0),
+            "signals": counters.get("signals", 0),
+            "evidence": counters.get("evidence", 0),
+            "flash": db.execute("SELECT source, title, created_at FROM news_archive "
+                                "ORDER BY created_at DESC, id DESC LIMIT ?", (recent_limit,)).fetchall(),
+            "cases": db.execute("SELECT id, title, status FROM investigations WHERE status = 'Active' "
+                                "ORDER BY created_at DESC, id DESC LIMIT ?", (case_limit,)).fetchall(),
+        }
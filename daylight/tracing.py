@@ -0,0 +1,344 @@
+"""Per-rerun tracing of database, LLM and HTTP calls.
+
+Each page opens a trace with `begin_rerun(page)` and closes it with
+`trace_panel()`. In between, every Supabase request (PostgREST over httpx),
+every model call (`llm.chat`) and every request made through the shared
+`requests` sessions is recorded as a span with its duration, payload sizes,
+token usage and error, including calls made from worker threads started with
+`propagate()`. Finished traces are appended to a local file as OTLP/JSON
+(one ExportTraceServiceRequest per line), which OpenTelemetry tooling can
+import. Admins (`?admin=<DAYLIGHT_ADMIN_KEY>`) see a latency breakdown in the
+sidebar. Set DAYLIGHT_TRACING=0 to turn it all off.
+"""
+import contextvars
+import json
+import os
+import threading
+import time
+from urllib.parse import unquote, urlsplit
+
+import streamlit as st
+
+from daylight.config import load_config
+
+ENABLED = os.environ.get("DAYLIGHT_TRACING", "1") != "0"
+CACHE_DIR = os.environ.get("DAYLIGHT_CACHE_DIR", ".daylight_cache")
+TRACE_FILE = os.environ.get("DAYLIGHT_TRACE_FILE") or os.path.join(CACHE_DIR, "traces.otlp.jsonl")
+MAX_TRACE_FILE_BYTES = 50 * 1024 * 1024   # rotated to <file>.1 past this size
+SERVICE_NAME = "daylight"
+PANEL_SPANS = 25
+KINDS = ("db", "llm", "http")
+# OTLP span kinds: 1 internal (the rerun), 3 client (outbound calls).
+OTLP_KIND = {"rerun": 1, "db": 3, "llm": 3, "http": 3}
+
+_current = contextvars.ContextVar("daylight_trace", default=None)
+_export_lock = threading.Lock()
+
+
+class Span:
+    """One timed operation; attributes follow the OpenTelemetry semantic conventions."""
+
+    __slots__ = ("trace", "kind", "name", "span_id", "start_ns", "end_ns", "attributes", "error")
+
+    def __init__(self, trace, kind, name, attributes):
+        self.trace = trace
+        self.kind = kind
+        self.name = name
+        self.span_id = os.urandom(8).hex()
+        self.start_ns = time.time_ns()
+        self.end_ns = None
+        self.attributes = dict(attributes)
+        self.error = None
+
+    def set(self, **attributes):
+        self.attributes.update(attributes)
+
+    def fail(self, error):
+        self.error = f"{type(error).__name__}: {error}"[:500]
+
+    def finish(self):
+        if self.end_ns is None:
+            self.end_ns = time.time_ns()
+            if self.trace is not None:
+                self.trace.add(self)
+
+    @property
+    def duration_ms(self):
+        return ((self.end_ns or time.time_ns()) - self.start_ns) / 1e6
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc is not None:
+            self.fail(exc)
+        self.finish()
+        return False
+
+
+class Trace:
+    """The spans of one script run of one session."""
+
+    def __init__(self, page):
+        self.page = page
+        self.trace_id = os.urandom(16).hex()
+        self.root = Span(None, "rerun", f"rerun {page}", {"daylight.page": page})
+        self.spans = []
+        self.lock = threading.Lock()
+        self.finished = False
+
+    def add(self, span):
+        with self.lock:
+            self.spans.append(span)
+
+    def finish(self):
+        """Closes the trace and exports it; later calls do nothing."""
+        with self.lock:
+            if self.finished:
+                return
+            self.finished = True
+        self.root.finish()
+        export(self)
+
+    def summary(self):
+        """{"wall_ms", "other_ms", kind: {"count", "ms", "busy_ms", "bytes", "tokens", "errors"}}.
+
+        ms adds span durations; busy_ms is wall time with at least one call of that
+        kind running (parallel calls overlap). other_ms is the rest of the rerun:
+        Python work and widget rendering.
+        """
+        with self.lock:
+            spans = list(self.spans)
+        wall = self.root.duration_ms
+        result = {"wall_ms": wall}
+        for kind in KINDS:
+            mine = [s for s in spans if s.kind == kind]
+            result[kind] = {
+                "count": len(mine), "ms": sum(s.duration_ms for s in mine), "busy_ms": _busy_ms(mine),
+                "bytes": sum(s.attributes.get("daylight.request_bytes", 0) + s.attributes.get("daylight.response_bytes", 0) for s in mine),
+                "tokens": sum(s.attributes.get("gen_ai.usage.input_tokens", 0) + s.attributes.get("gen_ai.usage.output_tokens", 0) for s in mine),
+                "errors": sum(1 for s in mine if s.error),
+            }
+        result["other_ms"] = max(0.0, wall - _busy_ms(spans))
+        return result
+
+
+def _busy_ms(spans):
+    """Length of the union of the spans' time intervals, in ms."""
+    total, end = 0, None
+    for start, stop in sorted((s.start_ns, s.end_ns or time.time_ns()) for s in spans):
+        if end is None or start > end:
+            total += stop - start
+            end = stop
+        elif stop > end:
+            total += stop - end
+            end = stop
+    return total / 1e6
+
+
+def start_span(kind, name, **attributes):
+    """Starts a span in the current rerun's trace; call `.finish()` (or use `with`)."""
+    return Span(_current.get(), kind, name, attributes)
+
+
+def propagate(fn):
+    """Wraps fn so calls from worker threads are recorded in the caller's trace."""
+    trace = _current.get()
+
+    def run(*args, **kwargs):
+        token = _current.set(trace)
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            _current.reset(token)
+    return run
+
+
+def begin_rerun(page):
+    """Opens this rerun's trace. A previous rerun cut short by st.rerun/st.stop is exported first."""
+    if not ENABLED:
+        return None
+    previous = st.session_state.get("_daylight_trace")
+    if previous is not None:
+        previous.finish()
+    trace = Trace(page)
+    st.session_state["_daylight_trace"] = trace
+    _current.set(trace)
+    return trace
+
+
+# --- export ---
+
+def _otlp_value(value):
+    if isinstance(value, bool):
+        return {"boolValue": value}
+    if isinstance(value, int):
+        return {"intValue": str(value)}
+    if isinstance(value, float):
+        return {"doubleValue": value}
+    return {"stringValue": str(value)}
+
+
+def _otlp_span(trace, span, parent_id=None):
+    otlp = {
+        "traceId": trace.trace_id, "spanId": span.span_id, "name": span.name, "kind": OTLP_KIND[span.kind],
+        "startTimeUnixNano": str(span.start_ns), "endTimeUnixNano": str(span.end_ns or time.time_ns()),
+        "attributes": [{"key": k, "value": _otlp_value(v)} for k, v in span.attributes.items() if v is not None],
+        "status": {"code": 2, "message": span.error} if span.error else {"code": 1},
+    }
+    if parent_id:
+        otlp["parentSpanId"] = parent_id
+    return otlp
+
+
+def to_otlp(trace):
+    """The trace as an OTLP/JSON ExportTraceServiceRequest."""
+    with trace.lock:
+        spans = list(trace.spans)
+    return {"resourceSpans": [{
+        "resource": {"attributes": [{"key": "service.name", "value": {"stringValue": SERVICE_NAME}}]},
+        "scopeSpans": [{
+            "scope": {"name": "daylight.tracing"},
+            "spans": [_otlp_span(trace, trace.root)] + [_otlp_span(trace, s, trace.root.span_id) for s in spans],
+        }],
+    }]}
+
+
+def export(trace, path=None):
+    """Appends the trace to the trace file (one JSON document per line)."""
+    path = path or TRACE_FILE
+    line = json.dumps(to_otlp(trace), separators=(",", ":")) + "\n"
+    try:
+        with _export_lock:
+            os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+            if os.path.exists(path) and os.path.getsize(path) > MAX_TRACE_FILE_BYTES:
+                os.replace(path, f"{path}.1")
+            with open(path, "a", encoding="utf-8") as f:
+                f.write(line)
+    except OSError:
+        pass
+
+
+# --- instrumented clients ---
+
+_DB_OPERATIONS = {"GET": "select", "HEAD": "count", "POST": "insert", "PATCH": "update", "DELETE": "delete"}
+
+
+class TracingTransport:
+    """httpx transport wrapper recording PostgREST requests as "db" spans.
+
+    The body is read inside the span, so the duration includes the download.
+    """
+
+    def __init__(self, inner):
+        self.inner = inner
+
+    def handle_request(self, request):
+        path = unquote(urlsplit(str(request.url)).path)
+        target = path.split("/rest/v1/", 1)[-1].strip("/")
+        operation = _DB_OPERATIONS.get(request.method, request.method.lower())
+        if target.startswith("rpc/"):
+            operation, target = "rpc", target[4:]
+        elif request.method == "POST" and "resolution=" in request.headers.get("Prefer", ""):
+            operation = "upsert"
+        try: request_bytes = len(request.content)
+        except Exception: request_bytes = 0
+        span = start_span("db", f"{operation} {target}", **{
+            "db.system": "postgresql", "db.operation.name": operation, "db.collection.name": target,
+            "http.request.method": request.method, "server.address": request.url.host,
+            "daylight.request_bytes": request_bytes})
+        with span:
+            response = self.inner.handle_request(request)
+            response.read()
+            span.set(**{"http.response.status_code": response.status_code, "daylight.response_bytes": len(response.content)})
+            if response.status_code >= 400:
+                span.error = f"HTTP {response.status_code}: {response.text[:300]}"
+        return response
+
+    def close(self):
+        self.inner.close()
+
+    def __enter__(self):
+        self.inner.__enter__()
+        return self
+
+    def __exit__(self, *args):
+        self.inner.__exit__(*args)
+
+
+def instrument_supabase(client):
+    """Routes the Supabase client's PostgREST requests through TracingTransport."""
+    if not ENABLED:
+        return client
+    try:
+        session = client.postgrest.session
+        if not isinstance(session._transport, TracingTransport):
+            session._transport = TracingTransport(session._transport)
+    except Exception:
+        pass
+    return client
+
+
+def wrap_adapter(adapter):
+    """Makes a requests transport adapter record each request as an "http" span.
+
+    The span ends when the response headers arrive (bodies are often streamed).
+    """
+    if not ENABLED:
+        return adapter
+    send = adapter.send
+
+    def traced_send(request, **kwargs):
+        url = urlsplit(request.url)
+        body = request.body or b""
+        with start_span("http", f"{request.method} {url.hostname}", **{
+                "http.request.method": request.method, "url.full": request.url, "server.address": url.hostname,
+                "daylight.request_bytes": len(body)}) as span:
+            response = send(request, **kwargs)
+            span.set(**{"http.response.status_code": response.status_code,
+                        "daylight.response_bytes": int(response.headers.get("Content-Length") or 0),
+                        "daylight.from_cache": getattr(response, "from_cache", False)})
+            if response.status_code >= 400:
+                span.error = f"HTTP {response.status_code}"
+            return response
+    adapter.send = traced_send
+    return adapter
+
+
+# --- admin panel ---
+
+def is_admin():
+    """True once the session has opened any page with ?admin=<DAYLIGHT_ADMIN_KEY>."""
+    key = load_config().get("DAYLIGHT_ADMIN_KEY")
+    if key and st.query_params.get("admin") == key:
+        st.session_state["_daylight_admin"] = True
+    return bool(key) and st.session_state.get("_daylight_admin", False)
+
+
+def trace_panel():
+    """Closes this rerun's trace and, for admins, shows its latency breakdown in the sidebar."""
+    trace = st.session_state.get("_daylight_trace")
+    if trace is None:
+        return
+    trace.finish()
+    if not is_admin():
+        return
+    summary = trace.summary()
+    with st.sidebar.expander(f"⏱️ Rerun latency: {summary['wall_ms']:.0f} ms", expanded=False):
+        cols = st.columns(4)
+        for col, (label, kind) in zip(cols, [("🗄️ DB", "db"), ("🧠 LLM", "llm"), ("🌐 HTTP", "http")]):
+            stats = summary[kind]
+            col.metric(label, f"{stats['busy_ms']:.0f} ms", f"{stats['count']} calls", delta_color="off")
+        cols[3].metric("🎨 Other", f"{summary['other_ms']:.0f} ms", "Python + widgets", delta_color="off")
+        st.caption(f"{summary['db']['bytes'] / 1e3:.0f} KB from the database · "
+                   f"{summary['llm']['tokens']} tokens · "
+                   f"{sum(summary[k]['errors'] for k in KINDS)} errors · trace {trace.trace_id[:8]}")
+        with trace.lock:
+            slowest = sorted(trace.spans, key=lambda s: -s.duration_ms)[:PANEL_SPANS]
+        if slowest:
+            st.dataframe([{"call": s.name, "kind": s.kind, "ms": round(s.duration_ms, 1),
+                           "start ms": round((s.start_ns - trace.root.start_ns) / 1e6, 1),
+                           "bytes": s.attributes.get("daylight.response_bytes", 0),
+                           "tokens": s.attributes.get("gen_ai.usage.input_tokens", 0) + s.attributes.get("gen_ai.usage.output_tokens", 0),
+                           "error": s.error or ""} for s in slowest],
+                         hide_index=True, width="stretch")
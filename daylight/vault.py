@@ -0,0 +1,67 @@
+"""Vault query layer: projected, keyset-paginated and full-text reads of `news_archive`.
+
+Results are cached with a TTL in Streamlit's process-wide data cache, so every
+session shares them. Writers call `invalidate_vault()` / `invalidate_cases()`.
+"""
+import streamlit as st
+
+from daylight.repository import get_repository
+
+FEED_COLUMNS = "id, created_at, source, country, region, title, url, description"
+PAGE_SIZE = 50
+CACHE_TTL_S = 60
+
+
+@st.cache_data(ttl=CACHE_TTL_S, show_spinner=False)
+def _vault_page(region, cursor, page_size, columns):
+    rows = get_repository().archive_page(columns, page_size + 1, None if region == "ALL" else region, cursor)
+    next_cursor = (rows[page_size - 1]['created_at'], rows[page_size - 1]['id']) if len(rows) > page_size else None
+    return rows[:page_size], next_cursor
+
+
+def fetch_vault_page(region="ALL", cursor=None, page_size=PAGE_SIZE, columns=FEED_COLUMNS):
+    """Returns (rows, next_cursor) for one page of the archive, newest first.
+
+    `cursor` is the (created_at, id) pair returned with the previous page, or None for
+    the first page; next_cursor is None on the last page. `columns` must include
+    `id` and `created_at`.
+    """
+    try: return _vault_page(region, cursor, page_size, columns)
+    except Exception: return [], None
+
+
+@st.cache_data(ttl=CACHE_TTL_S, show_spinner=False)
+def _search(query, limit, region):
+    return get_repository().search_archive(query, limit, None if region == "ALL" else region)
+
+
+def search_vault(query, limit=25, region="ALL"):
+    """Ranked full-text search over the whole archive (title weighted above description).
+
+    Accepts web-search syntax: several terms, "quoted phrases", OR and -exclusions.
+    Returns up to `limit` rows, most relevant first, each with a `rank` score.
+    """
+    query = query.strip()
+    if not query: return []
+    try: return _search(query, limit, region)
+    except Exception: return []
+
+
+@st.cache_data(ttl=CACHE_TTL_S, show_spinner=False)
+def _active_cases():
+    return get_repository().list_active_cases()
+
+
+def fetch_active_cases():
+    """Returns [{id, title}] for every active investigation."""
+    try: return _active_cases()
+    except Exception: return []
+
+
+def invalidate_vault():
+    _vault_page.clear()
+    _search.clear()
+
+
+def invalidate_cases():
+    _active_cases.clear()
@@ -1,7 +1,8 @@
 import streamlit as st
-from supabase import create_client, Client
-import os
 import time
+from daylight.dashboard import fetch_dashboard_stats
+from daylight.repository import get_repository
+from daylight.tracing import begin_rerun, trace_panel
 
 # --- PAGE CONFIG ---
 st.set_page_config(
@@ -10,48 +11,15 @@ st.set_page_config(
     layout="wide",
     initial_sidebar_state="expanded"
 )
+begin_rerun("home")
 
 # --- SETUP CREDENTIALS ---
-try:
-    supabase_url = st.secrets["SUPABASE_URL"]
-    supabase_key = st.secrets["SUPABASE_KEY"]
-except:
-    supabase_url = os.environ.get("SUPABASE_URL")
-    supabase_key = os.environ.get("SUPABASE_KEY")
-
-if not supabase_url:
+repository = get_repository()
+
+if not repository:
     st.error("🚨 System Offline: Database Credentials Missing.")
     st.stop()
 
-supabase: Client = create_client(supabase_url, supabase_key)
-
-# --- HELPER: FETCH STATS ---
-def get_system_status():
-    """Fetches live counts from the database."""
-    try:
-        cases = supabase.table("investigations").select("id, title, status", count="exact").eq("status", "Active").execute()
-        case_count = len(cases.data)
-        active_list = cases.data
-
-        # Safe Count (Fallback to 0 if table empty)
-        try: vault_count = supabase.table("news_archive").select("id", count="exact").limit(1).execute().count
-        except: vault_count = 0
-
-        try: ev_count = supabase.table("evidence_locker").select("id", count="exact").limit(1).execute().count
-        except: ev_count = 0
-
-        return case_count, vault_count, ev_count, active_list
-    except:
-        return 0, 0, 0, []
-
-def get_flash_traffic():
-    """Gets the 3 most recent headlines."""
-    try:
-        response = supabase.table("news_archive").select("source, title, created_at").order("created_at", desc=True).limit(3).execute()
-        return response.data
-    except:
-        return []
-
 # --- MAIN UI ---
 
 # HEADER
@@ -59,8 +27,9 @@ st.title("🦅 PROJECT DAYLIGHT")
 st.caption(f"Open Source Intelligence (OSINT) Console | Public Beta | {time.strftime('%Y-%m-%d')}")
 st.divider()
 
-# 1. METRICS ROW
-case_num, vault_num, ev_num, active_cases = get_system_status()
+# 1. METRICS ROW (ONE CACHED RPC FOR THE WHOLE PAGE)
+stats = fetch_dashboard_stats()
+case_num, vault_num, ev_num, active_cases = stats['active_cases'], stats['signals'], stats['evidence'], stats['cases']
 
 c1, c2, c3, c4 = st.columns(4)
 with c1:
@@ -74,13 +43,13 @@ with c4:
 
 # 2. FLASH TRAFFIC (LATEST INTEL)
 st.subheader("⚡ Global Flash Traffic")
-recent_news = get_flash_traffic()
+recent_news = stats['flash']
 
 if recent_news:
     for news in recent_news:
         st.info(f"**{news['source']}**: {news['title']}")
 else:
-    st.caption("No recent signals. Go to 'The Vault' to ingest live feeds.")
+    st.caption("No recent signals. The ingestion worker has not archived any feeds yet.")
 
 # 3. ACTIVE OPERATIONS BOARD
 st.divider()
@@ -97,6 +66,8 @@ else:
                 st.markdown(f"### 📁 {case['title']}")
                 st.caption(f"Status: {case['status']}")
                 st.markdown("**Mission:** Extract entities and map connections.")
+    if case_num > len(active_cases):
+        st.caption(f"+{case_num - len(active_cases)} more active operations in 'Investigations'.")
 
 # 4. ANALYST FIELD GUIDE (ONBOARDING)
 st.markdown("---")
@@ -106,7 +77,7 @@ with st.expander("📖 **READ ME: Analyst Field Guide (How to use this tool)**",
 
     **STEP 1: SCAN THE WORLD 👁️**
     * Go to **'The Vault'** (Sidebar).
-    * Click **'Ingest Global Feeds'** to pull live news from US, Russia, China, & Middle East.
+    * Live news from the US, Russia, China, & Middle East streams in automatically.
     * Find a story you want to track and select **'✨ CREATE NEW CASE'** or assign it to an existing one.
 
     **STEP 2: INVESTIGATE 🕵️**
@@ -117,4 +88,7 @@ with st.expander("📖 **READ ME: Analyst Field Guide (How to use this tool)**",
 
     **STEP 3: REPORT 🖨️**
     * Click **'Export Dossier'** to generate a classified PDF report of your findings.
-    """)
\ No newline at end of file
+    """)
+
+# --- TRACE ---
+trace_panel()
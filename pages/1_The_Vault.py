@@ -1,112 +1,64 @@
 import streamlit as st
-import xml.etree.ElementTree as ET
-import requests
 import time
-from io import BytesIO
-from openai import OpenAI
-import os
-import re
-from supabase import create_client, Client
+from functools import partial
+from daylight.cases import invalidate_cases
+from daylight.clients import get_openai
+from daylight.evidence import ingest_upload, markdown_text, process_in_background, search_locker, snippet_markdown
+from daylight.ledger import write_rows
+from daylight.llm import chat
+from daylight.repository import get_repository
+from daylight.tracing import begin_rerun, trace_panel
+from daylight.vault import fetch_active_cases, fetch_vault_page, search_vault
 
 # --- PAGE SETUP ---
 st.set_page_config(page_title="Daylight: The Vault", layout="wide", page_icon="👁️")
+begin_rerun("vault")
 st.title("👁️ DAYLIGHT: THE VAULT")
 st.caption("Global Intelligence Grid (v2.9) | Visual Status Log Restored")
 
 # --- CONFIGURATION ---
-try:
-    openai_api_key = st.secrets["OPENAI_API_KEY"]
-    supabase_url = st.secrets["SUPABASE_URL"]
-    supabase_key = st.secrets["SUPABASE_KEY"]
-except:
-    openai_api_key = os.environ.get("OPENAI_API_KEY")
-    supabase_url = os.environ.get("SUPABASE_URL")
-    supabase_key = os.environ.get("SUPABASE_KEY")
-
-if supabase_url and supabase_key:
-    supabase: Client = create_client(supabase_url, supabase_key)
-else:
+repository = get_repository()
+
+if not repository:
     st.error("🚨 Database Connection Failed.")
     st.stop()
 
-# --- DATA SOURCES ---
-FEED_DB = [
-    {'region': 'WEST', 'country': '🇺🇸 USA', 'source': 'CNN', 'url': 'http://rss.cnn.com/rss/edition_world.rss'},
-    {'region': 'WEST', 'country': '🇬🇧 UK', 'source': 'BBC', 'url': 'http://feeds.bbci.co.uk/news/world/rss.xml'},
-    {'region': 'WEST', 'country': '🇪🇺 EU', 'source': 'Politico', 'url': 'https://www.politico.eu/feed/'},
-    {'region': 'RUSSIA', 'country': '🔴 STATE', 'source': 'RT', 'url': 'https://www.rt.com/rss/news/'},
-    {'region': 'RUSSIA', 'country': '⚪ EXILE', 'source': 'Meduza', 'url': 'https://meduza.io/rss/en/all'},
-    {'region': 'UKRAINE', 'country': '🇺🇦 UKR', 'source': 'Kyiv Indep.', 'url': 'https://kyivindependent.com/news-archive/rss/'},
-    {'region': 'ASIA', 'country': '🇨🇳 CHN', 'source': 'Global Times', 'url': 'https://www.globaltimes.cn/rss/outbrain.xml'},
-    {'region': 'ASIA', 'country': '🇮🇳 IND', 'source': 'Times of India', 'url': 'https://timesofindia.indiatimes.com/rssfeedstopstories.cms'},
-    {'region': 'MIDEAST', 'country': '🇶🇦 QAT', 'source': 'Al Jazeera', 'url': 'https://www.aljazeera.com/xml/rss/all.xml'},
-]
-
 # --- HELPER FUNCTIONS ---
 
 def create_new_case(title, description):
     try:
-        data = {"title": title[:100], "description": f"Auto-generated from Vault:\n{description}", "status": "Active"}
-        response = supabase.table("investigations").insert(data).execute()
-        return response.data[0]['id'] if response.data else None
+        case = repository.create_case(title[:100], f"Auto-generated from Vault:\n{description}")
+        invalidate_cases()
+        return case['id'] if case else None
     except: return None
 
 def save_lead_to_case(case_id, title, url):
     try:
         content = f"[{title}]({url})"
-        supabase.table("intel_ledger").insert({"investigation_id": case_id, "type": "Lead", "content": content}).execute()
+        write_rows([{"investigation_id": case_id, "type": "Lead", "content": content}])  # re-promoting is a no-op
         return True
     except: return False
 
-def parse_rss(feed_obj):
+@st.cache_data(ttl=60, show_spinner=False)
+def get_feed_network_status():
+    """Registry health for the sidebar; ingestion itself runs in the headless worker."""
     try:
-        headers = {'User-Agent': 'Mozilla/5.0'}
-        response = requests.get(feed_obj['url'], headers=headers, timeout=10)
-        root = ET.fromstring(response.content)
-        items = []
-        is_atom = 'feed' in root.tag.lower()
-        iter_items = root.findall('{http://www.w3.org/2005/Atom}entry') if is_atom else root.findall('.//item')
-        for item in iter_items[:5]: 
-            if is_atom:
-                title = item.findtext('{http://www.w3.org/2005/Atom}title')
-                link = item.find('{http://www.w3.org/2005/Atom}link').attrib.get('href')
-                desc = item.findtext('{http://www.w3.org/2005/Atom}summary')
-            else:
-                title = item.findtext('title')
-                link = item.findtext('link')
-                desc = item.findtext('description')
-            clean_desc = re.sub('<[^<]+?>', '', str(desc))[:200] + "..." if desc else "No description."
-            if title:
-                items.append({'source': feed_obj['source'], 'country': feed_obj['country'], 'region': feed_obj['region'], 'title': title, 'description': clean_desc, 'url': link})
-        return items, "🟢"
-    except: return [], "🔴"
-
-def save_to_vault(items):
-    data = [{"source": i['source'], "country": i['country'], "region": i['region'], "title": i['title'], "url": i['url'], "description": i['description']} for i in items]
-    try: supabase.table("news_archive").upsert(data, on_conflict="url", ignore_duplicates=True).execute()
-    except: pass
-
-def fetch_from_vault():
-    try: return supabase.table("news_archive").select("*").order("created_at", desc=True).limit(500).execute().data
-    except: return []
+        return repository.feed_health()
+    except: return 0, 0
 
 def upload_evidence(file_obj, notes):
+    """Hashes and stores the upload in chunks; identical files are kept once. Returns (ok, row or error, is_new)."""
     try:
-        file_name = f"{int(time.time())}_{file_obj.name}"
-        file_bytes = file_obj.getvalue()
-        supabase.storage.from_("evidence").upload(path=file_name, file=file_bytes, file_options={"content-type": file_obj.type})
-        public_url = supabase.storage.from_("evidence").get_public_url(file_name)
-        data = {"filename": file_name, "file_url": public_url, "media_type": file_obj.type.split('/')[0], "description": notes}
-        supabase.table("evidence_locker").insert(data).execute()
-        return True, public_url
-    except Exception as e: return False, str(e)
-
-def analyze_narrative_clash(topic, articles):
-    if not openai_api_key: return "⚠️ OpenAI Key Missing."
-    client = OpenAI(api_key=openai_api_key)
+        row, is_new = ingest_upload(repository, file_obj, file_obj.name, file_obj.type or "application/octet-stream", notes)
+        if is_new: process_in_background(repository)
+        return True, row, is_new
+    except Exception as e: return False, str(e), False
+
+def analyze_narrative_clash(topic, articles, use_cache=True):
+    if not get_openai(): return "⚠️ OpenAI Key Missing."
     context = ""
     for a in articles[:25]:
-        context += f"SOURCE: {a.get('source')} | TITLE: {a.get('title')} | URL: {a.get('url')}\n"
+        context += f"SOURCE: {a.get('source')} | TITLE: {a.get('title')} | SUMMARY: {a.get('description')} | URL: {a.get('url')}\n"
 
     system_prompt = f"""
     You are a Senior Intelligence Analyst. Topic: "{topic}"
@@ -114,12 +66,7 @@ def analyze_narrative_clash(topic, articles):
     STRUCTURE: 1. CORE CONFLICT. 2. REGIONAL SPLIT. 3. MISSING CONTEXT. 4. VERDICT.
     CITATION RULE (STRICT): You MUST hyperlink sources. Example: "According to [CNN](http://cnn.com/story)..."
     """
-    try:
-        response = client.chat.completions.create(
-            model="gpt-4o-mini",
-            messages=[{"role": "system", "content": system_prompt}, {"role": "user", "content": f"DATA:\n{context}"}]
-        )
-        return response.choices[0].message.content
+    try: return chat(system_prompt, f"DATA:\n{context}", use_cache=use_cache)
     except Exception as e: return f"Analysis Failed: {e}"
 
 # --- MAIN UI ---
@@ -127,90 +74,98 @@ def analyze_narrative_clash(topic, articles):
 # 1. SIDEBAR
 st.sidebar.header("🎛️ Mission Control")
 
-# --- THE RESTORED INGESTION BUTTON ---
-if st.sidebar.button("🔄 Ingest Global Feeds"):
-    st.toast("Contacting Satellites...")
-    all_items = []
-    progress = st.sidebar.progress(0)
-
-    # VISUAL STATUS LOG
-    status_box = st.sidebar.empty()
-    with status_box.container():
-        st.caption("📡 Connection Status:")
-        for i, feed in enumerate(FEED_DB):
-            items, status = parse_rss(feed)
-            all_items.extend(items)
-
-            # Print Red/Green status
-            if "🔴" in status:
-                st.error(f"{status} {feed['source']}")
-            else:
-                st.write(f"{status} **{feed['source']}**")
-
-            progress.progress((i+1)/len(FEED_DB))
-            time.sleep(0.1) # Tiny pause so user can see the list building
-
-    save_to_vault(all_items)
-    st.sidebar.success(f"Ingested {len(all_items)} signals.")
-    time.sleep(2) # Give time to read logs
-    st.rerun()
+# --- FEED NETWORK (fed by `python -m daylight.ingest_worker`) ---
+feed_count, failing_count = get_feed_network_status()
+st.sidebar.caption("📡 Feed Network:")
+st.sidebar.write(f"🟢 **{feed_count - failing_count}** feeds live" + (f" · 🔴 {failing_count} backing off" if failing_count else ""))
 
 st.sidebar.divider()
 st.sidebar.subheader("📂 Evidence Locker")
-uploaded_file = st.sidebar.file_uploader("Upload Intel", type=['png', 'jpg', 'pdf'])
+uploaded_file = st.sidebar.file_uploader("Upload Intel", type=['png', 'jpg', 'jpeg', 'pdf', 'txt'])
 evidence_note = st.sidebar.text_input("Context Note")
 if uploaded_file and st.sidebar.button("💾 Secure Upload"):
-    success, res = upload_evidence(uploaded_file, evidence_note)
-    if success: st.sidebar.success("File Secured.")
-    else: st.sidebar.error(f"Error: {res}")
+    success, res, is_new = upload_evidence(uploaded_file, evidence_note)
+    if not success: st.sidebar.error(f"Error: {res}")
+    elif is_new: st.sidebar.success("File Secured. Extracting metadata in the background.")
+    else: st.sidebar.info(f"Already in the locker as **{res['filename']}**.")
+
+# --- LOCKER SEARCH (names, notes, EXIF / PDF metadata and extracted text) ---
+locker_query = st.sidebar.text_input("🔎 Search Locker", placeholder='e.g. "signed contract" -draft')
+locker_hits = search_locker(locker_query)
+for ev in locker_hits:
+    with st.sidebar.container(border=True):
+        status = "" if ev['status'] == "ready" else f" · ⏳ {ev['status']}"
+        if ev.get('storage_key'):   # file_url is a server path on the SQLite backend; the bytes are read on click
+            st.download_button(f"📄 {markdown_text(ev['filename'])}{status}", partial(repository.read_evidence_file, ev['storage_key']),
+                               file_name=ev['filename'], mime=ev.get('mime_type'), key=f"locker_{ev['id']}", on_click="ignore")
+        else: st.markdown(f"[{markdown_text(ev['filename'])}]({ev['file_url']}){status}")
+        if ev.get('thumbnail_url'): st.image(ev['thumbnail_url'], width=120)
+        if ev.get('snippet'): st.caption(snippet_markdown(ev['snippet']))
+        elif ev.get('description'): st.caption(markdown_text(ev['description']))
+if locker_query.strip() and not locker_hits: st.sidebar.caption("No matching evidence.")
 
 # 2. MAIN FEED
-vault_data = fetch_from_vault()
-try:
-    active_cases = supabase.table("investigations").select("id, title").eq("status", "Active").execute().data
-    case_options = {"✨ CREATE NEW CASE FROM THIS": "NEW_CASE_TRIGGER"}
-    for c in active_cases: case_options[c['title']] = c['id']
-except: case_options = {"✨ CREATE NEW CASE FROM THIS": "NEW_CASE_TRIGGER"}
-
-tabs = st.tabs(["ALL", "RUSSIA", "WEST", "MIDEAST", "ASIA"])
-
-def render_feed(region_filter, tab):
-    with tab:
-        items = [x for x in vault_data if region_filter == "ALL" or x['region'] == region_filter]
-        if not items:
-            st.info("No data. Click 'Ingest' in sidebar.")
-            return
-
-        for i, item in enumerate(items):
+case_options = {"✨ CREATE NEW CASE FROM THIS": "NEW_CASE_TRIGGER"}
+for c in fetch_active_cases(): case_options[c['title']] = c['id']
+
+# Only the selected region is rendered; switching regions reruns with that page alone.
+region = st.radio("Region", ["ALL", "RUSSIA", "WEST", "MIDEAST", "ASIA"], horizontal=True, key="vault_region", label_visibility="collapsed")
+
+def promote_panel(items, page_key):
+    """One shared Promote form for the visible page (no widgets per row, no rerun per pick)."""
+    by_id = {i['id']: i for i in items}
+    with st.container(border=True):
+        st.markdown("**🚀 Promote Signal**")
+        with st.form(f"promote_{page_key}", border=False):
+            item_id = st.selectbox("Signal:", list(by_id), format_func=lambda i: by_id[i]['title'][:90])
+            target_case_name = st.selectbox("Assign Case:", list(case_options.keys()))
+            promoted = st.form_submit_button("🚀 Promote")
+        if promoted and item_id in by_id:
+            item = by_id[item_id]
+            selected_id = case_options[target_case_name]
+            if selected_id == "NEW_CASE_TRIGGER":
+                with st.spinner("Initializing..."):
+                    new_id = create_new_case(item['title'], item['description'])
+                    if new_id:
+                        save_lead_to_case(new_id, item['title'], item['url'])
+                        st.success("Case Opened!")
+                        time.sleep(1)
+                    else: st.error("Failed.")
+            else:
+                if save_lead_to_case(selected_id, item['title'], item['url']):
+                    st.toast("Sent!")
+                else: st.error("Failed.")
+
+def render_feed(region_filter):
+    # Cursor stack per region: the last entry is the page being shown.
+    cursors = st.session_state.setdefault(f"vault_cursors_{region_filter}", [None])
+    items, next_cursor = fetch_vault_page(region_filter, cursors[-1])
+    if not items:
+        st.info("No data yet. The ingestion worker fills the Vault as feeds publish.")
+        return
+
+    c1, c2 = st.columns([3, 1])
+    with c2:
+        promote_panel(items, f"{region_filter}_{len(cursors)}")
+    with c1:
+        for item in items:
             with st.container(border=True):
-                c1, c2 = st.columns([4, 1])
-                with c1:
-                    st.markdown(f"**{item['country']} | {item['source']}**")
-                    st.markdown(f"[{item['title']}]({item['url']})")
-                    st.caption(item['description'])
-                with c2:
-                    unique_id = f"{region_filter}_{i}_{item['url']}"
-                    target_case_name = st.selectbox("Assign Case:", list(case_options.keys()), key=f"sel_{unique_id}", label_visibility="collapsed")
-                    if st.button("🚀 Promote", key=f"btn_{unique_id}"):
-                        selected_id = case_options[target_case_name]
-                        if selected_id == "NEW_CASE_TRIGGER":
-                            with st.spinner("Initializing..."):
-                                new_id = create_new_case(item['title'], item['description'])
-                                if new_id:
-                                    save_lead_to_case(new_id, item['title'], item['url'])
-                                    st.success("Case Opened!")
-                                    time.sleep(1)
-                                else: st.error("Failed.")
-                        else:
-                            if save_lead_to_case(selected_id, item['title'], item['url']):
-                                st.toast("Sent!")
-                            else: st.error("Failed.")
-
-render_feed("ALL", tabs[0])
-render_feed("RUSSIA", tabs[1])
-render_feed("WEST", tabs[2])
-render_feed("MIDEAST", tabs[3])
-render_feed("ASIA", tabs[4])
+                st.markdown(f"**{item['country']} | {item['source']}**  \n[{item['title']}]({item['url']})")
+                st.caption(item['description'])
+
+        p1, p2, p3 = st.columns([1, 2, 1])
+        with p1:
+            if len(cursors) > 1 and st.button("◀ Newer", key=f"newer_{region_filter}"):
+                cursors.pop()
+                st.rerun()
+        with p2:
+            st.caption(f"Page {len(cursors)}")
+        with p3:
+            if next_cursor and st.button("Older ▶", key=f"older_{region_filter}"):
+                cursors.append(next_cursor)
+                st.rerun()
+
+render_feed(region)
 
 # 3. NARRATIVE PRISM
 st.divider()
@@ -221,16 +176,17 @@ if 'report_content' not in st.session_state:
 if 'report_topic' not in st.session_state:
     st.session_state.report_topic = ""
 
-topic = st.text_input("Analyze Topic (e.g. 'Ukraine', 'Election')", placeholder="Enter keyword...")
+topic = st.text_input("Analyze Topic (e.g. 'Ukraine', '\"peace talks\" -Gaza')", placeholder="Enter keywords or a \"quoted phrase\"...")
+fresh_report = st.checkbox("🔁 Fresh analysis (skip cached report)", key="prism_fresh")
 
 if st.button("⚡ Generate Intelligence Report"):
     if not topic:
         st.warning("Enter a topic.")
     else:
-        relevant = [d for d in vault_data if topic.lower() in d['title'].lower()]
+        relevant = search_vault(topic, limit=25)
         if relevant:
             with st.spinner("Analyzing Global Narratives..."):
-                report = analyze_narrative_clash(topic, relevant)
+                report = analyze_narrative_clash(topic, relevant, use_cache=not fresh_report)
                 st.session_state.report_content = report
                 st.session_state.report_topic = topic
         else:
@@ -253,3 +209,6 @@ if st.session_state.report_content:
     </body></html>
     """
     st.download_button("📤 Share / Download Briefing (HTML)", data=html_string, file_name=f"Brief_{st.session_state.report_topic}.html", mime="text/html")
+
+# --- TRACE ---
+trace_panel()
@@ -1,123 +1,38 @@
 import streamlit as st
-import os
 import time
 import json
-import requests
-import sys
-from supabase import create_client, Client
-from openai import OpenAI
-from bs4 import BeautifulSoup
-from fpdf import FPDF
-from streamlit_agraph import agraph, Node, Edge, Config
-import wikipedia
+from daylight.analytics import case_analytics
+from daylight.articles import article_to_source, fetch_article
+from daylight.cases import apply_delete, apply_insert, fetch_case_files, invalidate_cases, load_case_snapshot
+from daylight.deep_search import MAX_DIG_ENTITIES, dig_entities, lead_rows, wikipedia_leads
+from daylight.dossier import build_dossier, cached_dossier
+from daylight.entities import ALIAS_TYPE, case_entity_index
+from daylight.extraction import MAX_SOURCE_CHARS, extract_document
+from daylight.graph import MAX_NODES, case_graph
+from daylight.http_cache import get_http_cache
+from daylight.ledger import write_extraction, write_rows
+from daylight.llm import chat, get_response_cache
+from daylight.repository import get_repository
+from daylight.tracing import begin_rerun, trace_panel
 
 st.set_page_config(page_title="Daylight: Investigations", page_icon="🕵️", layout="wide")
+begin_rerun("investigations")
 
 # --- 1. SETUP & CREDENTIALS ---
-try:
-    supabase_url = st.secrets["SUPABASE_URL"]
-    supabase_key = st.secrets["SUPABASE_KEY"]
-    openai_api_key = st.secrets["OPENAI_API_KEY"]
-except:
-    supabase_url = os.environ.get("SUPABASE_URL")
-    supabase_key = os.environ.get("SUPABASE_KEY")
-    openai_api_key = os.environ.get("OPENAI_API_KEY")
-
-supabase: Client = create_client(supabase_url, supabase_key)
-client = OpenAI(api_key=openai_api_key)
+repository = get_repository()
 
-# --- 2. HELPER FUNCTIONS ---
+if not repository:
+    st.error("🚨 System Offline: Database Credentials Missing.")
+    st.stop()
 
-def create_case_dossier(case_data, intel_data):
-    """Generates a PDF Mission Report."""
-    pdf = FPDF()
-    pdf.add_page()
-
-    def sanitize(text):
-        return text.encode('latin-1', 'replace').decode('latin-1')
-
-    pdf.set_font("Arial", "B", 20)
-    pdf.cell(0, 10, sanitize(f"OPERATION: {case_data['title'].upper()}"), ln=True, align="C")
-    pdf.set_font("Arial", "I", 10)
-    pdf.cell(0, 10, sanitize(f"Status: {case_data['status']} | Date: {time.strftime('%Y-%m-%d')}"), ln=True, align="C")
-    pdf.line(10, 30, 200, 30)
-    pdf.ln(10)
-
-    pdf.set_font("Arial", "B", 12)
-    pdf.cell(0, 10, "1. MISSION OBJECTIVE", ln=True)
-    pdf.set_font("Arial", "", 11)
-    pdf.multi_cell(0, 7, sanitize(case_data['description']))
-    pdf.ln(5)
-
-    pdf.set_font("Arial", "B", 12)
-    pdf.cell(0, 10, "2. VERIFIED ENTITIES", ln=True)
-    pdf.set_font("Arial", "", 10)
-    entities = [i for i in intel_data if "Entity" in i['type']]
-    if not entities:
-        pdf.cell(0, 7, "No entities confirmed.", ln=True)
-    else:
-        for ent in entities:
-            clean_type = ent['type'].replace("Entity: ", "")
-            pdf.cell(0, 7, sanitize(f"- {ent['content']} ({clean_type})"), ln=True)
-    pdf.ln(5)
-
-    pdf.set_font("Arial", "B", 12)
-    pdf.cell(0, 10, "3. ESTABLISHED CONNECTIONS", ln=True)
-    links = [i for i in intel_data if "Relationship" in i['type']]
-    if not links:
-        pdf.cell(0, 7, "No connections mapped.", ln=True)
-    else:
-        for link in links:
-            parts = link['content'].split('|')
-            if len(parts) == 3:
-                pdf.cell(0, 7, sanitize(f"- {parts[0]} -> {parts[1]} -> {parts[2]}"), ln=True)
-    pdf.ln(5)
-
-    pdf.set_font("Arial", "B", 12)
-    pdf.cell(0, 10, "4. ANALYST HYPOTHESES", ln=True)
-    hyps = [i for i in intel_data if "Hypothesis" in i['type']]
-    if not hyps:
-        pdf.cell(0, 7, "No hypotheses generated.", ln=True)
-    else:
-        for h in hyps:
-            pdf.multi_cell(0, 7, sanitize(f"* {h['content']}"))
-    pdf.ln(5)
-
-    pdf.set_font("Arial", "B", 12)
-    pdf.cell(0, 10, "5. ARCHIVE LEADS", ln=True)
-    leads = [i for i in intel_data if "Lead" in i['type']]
-    if not leads:
-        pdf.cell(0, 7, "No leads found.", ln=True)
-    else:
-        for l in leads:
-            clean_lead = l['content']
-            if "](" in clean_lead:
-                parts = clean_lead.split("](")
-                title = parts[0].replace("[", "")
-                url = parts[1].replace(")", "")
-                clean_lead = f"{title}: {url}"
-            clean_lead = clean_lead.replace("📂", "").replace("📍", "")
-            pdf.multi_cell(0, 6, sanitize(f"- {clean_lead}"))
-
-    return pdf.output(dest="S").encode("latin-1")
+# --- 2. HELPER FUNCTIONS ---
 
 def perform_deep_search(query_entity, query_context):
-    results = []
+    """Top Wikipedia pages (summary + URL) for an entity, in one cached API call."""
     try:
-        search_results = wikipedia.search(query_entity, results=3)
-        for title in search_results:
-            try:
-                page = wikipedia.page(title, auto_suggest=False)
-                results.append({
-                    "title": f"📂 Archive: {page.title}",
-                    "href": page.url,
-                    "body": page.summary[:200] + "..." 
-                })
-            except:
-                continue
+        return wikipedia_leads(query_entity)
     except:
         return []
-    return results
 
 def fetch_content_from_url(url):
     """Safe Fetcher: Handles Websites. Manual Text for YouTube."""
@@ -129,57 +44,25 @@ def fetch_content_from_url(url):
     # 2. WEBSITE LOGIC
     else:
         try:
-            headers = {'User-Agent': 'Mozilla/5.0'}
-            response = requests.get(url, headers=headers, timeout=10)
-            soup = BeautifulSoup(response.content, 'html.parser')
-            text = soup.get_text(separator=' ')
-            return text[:15000] 
+            # Capped download; main article text + title/date only (no nav, scripts, footers)
+            article = fetch_article(url, timeout=10)
+            return article_to_source(article)[:MAX_SOURCE_CHARS]
         except Exception as e:
             return f"Error scraping website: {str(e)}"
 
-def extract_intel_from_text(text):
-    """Robust Extraction with Markdown Cleaning"""
-    system_prompt = """
-    You are an Intelligence Analyst. Extract:
-    1. Entities (People, Organizations, Events).
-    2. Relationships (Source -> Label -> Target).
+def extract_intel_from_text(text, use_cache=True):
+    """Chunked, parallel extraction over the full text; results merged and de-duplicated."""
+    return extract_document(text, use_cache=use_cache)
 
-    IMPORTANT: Return ONLY valid raw JSON. Do not use Markdown blocks (```json).
-    Format: {"entities": [{"name": "X", "type": "Person"}], "relationships": [{"source": "X", "target": "Y", "label": "Z"}]}
-    """
-    try:
-        response = client.chat.completions.create(
-            model="gpt-4o-mini",
-            messages=[{"role": "system", "content": system_prompt}, {"role": "user", "content": text}],
-            response_format={"type": "json_object"}
-        )
-        content = response.choices[0].message.content
-
-        # --- FIX: Strip Markdown if AI adds it ---
-        if "```json" in content:
-            content = content.split("```json")[1].split("```")[0]
-        elif "```" in content:
-            content = content.split("```")[1].split("```")[0]
-
-        print(f"DEBUG AI OUTPUT: {content[:100]}...") # Print to console for debugging
-        return json.loads(content.strip())
-    except Exception as e:
-        print(f"DEBUG ERROR: {e}")
-        return None
-
-def generate_lateral_hypotheses(current_intel):
+def generate_lateral_hypotheses(current_intel, use_cache=True):
     system_prompt = """
     Apply 'Cui Bono' (Who Benefits?) logic.
     Return 3 short hypotheses. JSON: { "hypotheses": ["Hypothesis 1...", "Hypothesis 2..."] }
     """
     try:
         intel_context = json.dumps(current_intel)
-        response = client.chat.completions.create(
-            model="gpt-4o-mini",
-            messages=[{"role": "system", "content": system_prompt}, {"role": "user", "content": intel_context}],
-            response_format={"type": "json_object"}
-        )
-        return json.loads(response.choices[0].message.content)
+        content = chat(system_prompt, intel_context, response_format={"type": "json_object"}, use_cache=use_cache)
+        return json.loads(content)
     except:
         return None
 
@@ -191,26 +74,37 @@ st.divider()
 
 # Sidebar
 st.sidebar.header("🗂️ Case Files")
-try:
-    response = supabase.table("investigations").select("*").order("created_at", desc=True).execute()
-    cases = response.data
-except:
-    cases = []
+cases = fetch_case_files()
 case_titles = [c['title'] for c in cases]
 selected_case_name = st.sidebar.selectbox("Open Case File:", ["-- New Case --"] + case_titles)
+cache_stats = get_response_cache().stats()
+st.sidebar.caption(f"🧠 AI cache: {cache_stats['hits']} hits · {cache_stats['misses']} misses · {cache_stats['entries']} stored")
+http_stats = get_http_cache().stats()
+st.sidebar.caption(f"🌐 Web cache: {http_stats['hit_rate']:.0%} hit rate · {http_stats['hits'] + http_stats['revalidated']} hits "
+                   f"({http_stats['revalidated']} revalidated) · {http_stats['misses']} misses · {http_stats['bytes'] / 1e6:.1f} MB")
 
 active_case = None
 if selected_case_name != "-- New Case --":
     active_case = next((c for c in cases if c['title'] == selected_case_name), None)
+    # ONE SHARED SNAPSHOT PER CASE: case row + ledger, reused by every tab and session
+    snapshot = load_case_snapshot(active_case['id'])
+    active_case = snapshot.case or active_case
+    intel_items = snapshot.items
 
     # PDF EXPORT BUTTON
     st.sidebar.markdown("---")
     st.sidebar.write("🔒 **Classified Actions**")
-    intel_res = supabase.table("intel_ledger").select("*").eq("investigation_id", active_case['id']).execute()
-    intel_items = intel_res.data
 
     if st.sidebar.button("🖨️ Export Dossier (PDF)"):
-        pdf_bytes = create_case_dossier(active_case, intel_items)
+        # Rendered once per ledger version; an unchanged case is served from disk
+        version = snapshot.version
+        pdf_path = cached_dossier(active_case, version)
+        if pdf_path is None:
+            graph = case_graph(active_case['id'], version, intel_items, case_entity_index(active_case['id'], version, intel_items))
+            key_players = case_analytics(active_case['id'], version, graph).key_players(10)
+            pdf_path = build_dossier(active_case, intel_items, version, key_players)
+        with open(pdf_path, "rb") as pdf_file:
+            pdf_bytes = pdf_file.read()
         st.sidebar.download_button(
             label="📥 Download PDF",
             data=pdf_bytes,
@@ -226,8 +120,8 @@ if selected_case_name == "-- New Case --":
         new_desc = st.text_area("Mission Objective / Context")
         submitted = st.form_submit_button("🚀 Initialize Case")
         if submitted and new_title:
-            data = {"title": new_title, "description": new_desc, "status": "Active"}
-            supabase.table("investigations").insert(data).execute()
+            repository.create_case(new_title, new_desc)
+            invalidate_cases()
             st.success(f"Case '{new_title}' opened.")
             time.sleep(1)
             st.rerun()
@@ -238,15 +132,15 @@ elif active_case:
     with c2: st.metric("Status", active_case['status'])
     with c3:
         if st.button("🗑️ Archive"):
-            supabase.table("investigations").delete().eq("id", active_case['id']).execute()
+            repository.delete_case(active_case['id'])
+            invalidate_cases(active_case['id'])
             st.rerun()
 
     tab1, tab2 = st.tabs(["📝 Intelligence Ledger", "🕸️ Network Graph"])
 
-    # FETCH DATA AGAIN FOR TABS
-    intel_res = supabase.table("intel_ledger").select("*").eq("investigation_id", active_case['id']).order("created_at", desc=True).execute()
-    intel_items = intel_res.data
-    existing_entities = [i['content'] for i in intel_items if "Entity" in i['type']]
+    # Canonical entities + alias hash index: "Putin" and "V. Putin" resolve to "Vladimir Putin".
+    # Built once per ledger version and shared, like the graph.
+    entity_index = case_entity_index(active_case['id'], snapshot.version, intel_items)
 
     with tab1:
         col_input, col_view = st.columns([1, 1])
@@ -258,6 +152,7 @@ elif active_case:
             with st.container(border=True):
                 st.markdown("### ✨ AI Auto-Analyst")
                 input_content = st.text_area("Source Material (Paste Text, URL, or YouTube Transcript):", height=100)
+                fresh_extract = st.checkbox("🔁 Fresh analysis (skip cache)", key="fresh_extract")
 
                 if st.button("🔍 Analyze Source"):
                     if not input_content:
@@ -277,29 +172,16 @@ elif active_case:
                              st.warning(final_text)
                         elif len(final_text) > 20:
                             with st.spinner("Extracting Intelligence..."):
-                                data = extract_intel_from_text(final_text)
+                                data = extract_intel_from_text(final_text, use_cache=not fresh_extract)
                                 if data:
-                                    # INSERT ENTITIES
-                                    new_count = 0
-                                    for ent in data.get('entities', []):
-                                        if ent['name'] not in existing_entities:
-                                            supabase.table("intel_ledger").insert({
-                                                "investigation_id": active_case['id'],
-                                                "type": f"Entity: {ent['type']}",
-                                                "content": ent['name']
-                                            }).execute()
-                                            new_count += 1
-
-                                    # INSERT RELATIONSHIPS
-                                    for rel in data.get('relationships', []):
-                                        content = f"{rel['source']}|{rel['label']}|{rel['target']}"
-                                        supabase.table("intel_ledger").insert({
-                                            "investigation_id": active_case['id'],
-                                            "type": "Relationship",
-                                            "content": content
-                                        }).execute()
-
-                                    st.success(f"Extraction Complete. Added {new_count} new entities.")
+                                    # ONE BULK, IDEMPOTENT WRITE FOR THE WHOLE EXTRACTION
+                                    try:
+                                        counts = write_extraction(active_case['id'], data, index=entity_index.copy())
+                                        apply_insert(active_case['id'], counts['rows'])
+                                        st.success(f"Extraction Complete. Added {counts['entities']} new entities, {counts['aliases']} aliases and {counts['relationships']} new links ({counts['skipped']} already on file).")
+                                    except Exception as e:
+                                        st.error(f"Ledger write failed: {e}")
+                                        st.stop()
                                     time.sleep(1)
                                     st.rerun()
                                 else:
@@ -311,12 +193,13 @@ elif active_case:
             st.markdown("---")
             with st.container(border=True):
                 st.markdown("### 🧠 Lateral Thinking Engine")
+                fresh_hyp = st.checkbox("🔁 Fresh hypotheses (skip cache)", key="fresh_hyp")
                 if st.button("🔮 Generate Hypotheses"):
                     if not intel_items:
                         st.warning("Add data first.")
                     else:
                         with st.spinner("Applying 'Cui Bono' Logic..."):
-                            analysis = generate_lateral_hypotheses(intel_items)
+                            analysis = generate_lateral_hypotheses(intel_items, use_cache=not fresh_hyp)
                             if analysis:
                                 st.session_state['generated_hypotheses'] = analysis['hypotheses']
 
@@ -326,18 +209,45 @@ elif active_case:
                         with col_h: st.info(hyp)
                         with col_s:
                             if st.button("Save", key=f"save_{idx}"):
-                                supabase.table("intel_ledger").insert({
-                                    "investigation_id": active_case['id'],
-                                    "type": "Hypothesis",
-                                    "content": hyp
-                                }).execute()
-                                st.rerun()
+                                # Idempotent: saving the same hypothesis twice is a no-op
+                                try:
+                                    saved, _ = write_rows([{
+                                        "investigation_id": active_case['id'],
+                                        "type": "Hypothesis",
+                                        "content": hyp
+                                    }])
+                                    apply_insert(active_case['id'], saved)
+                                except Exception as e:
+                                    st.error(f"Ledger write failed: {e}")
+                                else:
+                                    st.rerun()
 
         with col_view:
             st.subheader("2. Verified Ledger")
             if not intel_items:
                 st.info("No intelligence gathered yet.")
             else:
+                # DIG ALL: up to MAX_DIG_ENTITIES canonical entities through a bounded worker pool, one bulk write
+                entity_names = [e['name'] for e in entity_index.entities.values()][:MAX_DIG_ENTITIES]
+                total = len(entity_index.entities)
+                dig_label = f"⛏️ Dig all {total} entities" if total <= MAX_DIG_ENTITIES else f"⛏️ Dig the first {MAX_DIG_ENTITIES} of {total} entities"
+                if entity_names and st.button(dig_label):
+                    with st.spinner(f"Hunting intel on {len(entity_names)} entities..."):
+                        found = dig_entities(entity_names)
+                        leads = [lead for entity_leads in found.values() for lead in entity_leads]
+                        if leads:
+                            try:
+                                inserted, _ = write_rows(lead_rows(active_case['id'], leads))
+                                apply_insert(active_case['id'], inserted)
+                            except Exception as e:
+                                st.error(f"Ledger write failed: {e}")
+                            else:
+                                st.success(f"Hunter Report: Found {len(inserted)} new leads across {sum(1 for v in found.values() if v)} entities.")
+                                time.sleep(1)
+                                st.rerun()
+                        else:
+                            st.error("No archives found.")
+
                 for item in intel_items:
                     icon = "📄"
                     display_text = item['content']
@@ -347,6 +257,10 @@ elif active_case:
                     elif "Event" in item['type']: icon = "📅"
                     elif "Hypothesis" in item['type']: icon = "🤔"
                     elif "Lead" in item['type']: icon = "📍"
+                    elif item['type'] == ALIAS_TYPE:
+                        icon = "🪪"
+                        alias, _, canonical = item['content'].rpartition('|')
+                        display_text = f"*{alias}* = **{canonical}**"
                     elif "Relationship" in item['type']:
                         icon = "🔗"
                         parts = item['content'].split('|')
@@ -362,49 +276,68 @@ elif active_case:
                                 with st.spinner(f"Hunting intel on {item['content']}..."):
                                     results = perform_deep_search(item['content'], active_case['title'])
                                     if results:
-                                        count = 0
-                                        for res in results:
-                                            lead_text = f"[{res['title']}]({res['href']})"
-                                            supabase.table("intel_ledger").insert({
-                                                "investigation_id": active_case['id'],
-                                                "type": "Lead",
-                                                "content": lead_text
-                                            }).execute()
-                                            count += 1
-                                        st.success(f"Hunter Report: Found {count} new leads.")
-                                        time.sleep(1)
-                                        st.rerun()
+                                        try:
+                                            inserted, _ = write_rows(lead_rows(active_case['id'], results))
+                                            apply_insert(active_case['id'], inserted)
+                                        except Exception as e:
+                                            st.error(f"Ledger write failed: {e}")
+                                        else:
+                                            st.success(f"Hunter Report: Found {len(inserted)} new leads.")
+                                            time.sleep(1)
+                                            st.rerun()
                                     else:
                                         st.error("No archives found.")
 
                         if st.button("Delete", key=item['id']):
-                            supabase.table("intel_ledger").delete().eq("id", item['id']).execute()
+                            repository.delete_ledger_rows([item['id']])
+                            apply_delete(active_case['id'], [item['id']])
                             st.rerun()
 
     # GRAPH TAB
     with tab2:
         st.subheader("Interactive Entity Map")
-        nodes = []
-        edges = []
+        from streamlit_agraph import agraph, Node, Edge, Config
 
         if not intel_items:
             st.warning("Add data to generate graph.")
         else:
-            for item in intel_items:
-                if "Entity" in item['type']:
-                    img_url = "[https://cdn-icons-png.flaticon.com/512/3135/3135715.png](https://cdn-icons-png.flaticon.com/512/3135/3135715.png)"
-                    if "Organization" in item['type']:
-                        img_url = "[https://cdn-icons-png.flaticon.com/512/4300/4300059.png](https://cdn-icons-png.flaticon.com/512/4300/4300059.png)"
-                    elif "Event" in item['type']:
-                        img_url = "[https://cdn-icons-png.flaticon.com/512/747/747310.png](https://cdn-icons-png.flaticon.com/512/747/747310.png)"
-                    nodes.append(Node(id=item['content'], label=item['content'], size=25, shape="circularImage", image=img_url))
-
-            for item in intel_items:
-                if "Relationship" in item['type']:
-                    parts = item['content'].split('|')
-                    if len(parts) == 3:
-                        edges.append(Edge(source=parts[0], target=parts[2], label=parts[1], color="#ff4b4b"))
+            # CACHED PER LEDGER VERSION; ONLY A BOUNDED VIEW IS SENT TO THE BROWSER
+            version = snapshot.version
+            graph = case_graph(active_case['id'], version, intel_items, entity_index)
+            analytics = case_analytics(active_case['id'], version, graph)
+            c_view, c_focus, c_cap = st.columns([1, 2, 1])
+            with c_view:
+                view = st.radio("View", ["🏆 Top entities", "🎯 Neighbourhood"], key="graph_view")
+            with c_cap:
+                max_nodes = st.slider("Max nodes", 10, 500, MAX_NODES, step=10, key="graph_cap")
+            if view == "🎯 Neighbourhood" and graph.nodes:
+                with c_focus:
+                    center = st.selectbox("Entity", graph.top_by_degree(len(graph.nodes)), key="graph_center")
+                    hops = st.slider("Hops", 1, 3, 1, key="graph_hops")
+                names = graph.k_hop(center, hops, max_nodes)
+            else:
+                names = graph.top_by_degree(max_nodes)
+
+            view_nodes, view_edges = graph.subgraph(names)
+            st.caption(f"Showing {len(view_nodes)} of {len(graph.nodes)} entities · {len(view_edges)} of {len(graph.edges)} links · "
+                       f"{analytics.n_communities} clusters in {analytics.n_components} components · size = PageRank, colour = cluster")
+
+            nodes = []
+            for node in view_nodes:
+                img_url = "[https://cdn-icons-png.flaticon.com/512/3135/3135715.png](https://cdn-icons-png.flaticon.com/512/3135/3135715.png)"
+                if "Organization" in node['type']:
+                    img_url = "[https://cdn-icons-png.flaticon.com/512/4300/4300059.png](https://cdn-icons-png.flaticon.com/512/4300/4300059.png)"
+                elif "Event" in node['type']:
+                    img_url = "[https://cdn-icons-png.flaticon.com/512/747/747310.png](https://cdn-icons-png.flaticon.com/512/747/747310.png)"
+                nodes.append(Node(id=node['id'], label=node['id'], size=analytics.node_size(node['id']), shape="circularImage",
+                                  image=img_url, color=analytics.node_color(node['id']), borderWidth=4))
+            edges = [Edge(source=e['source'], target=e['target'], color="#ff4b4b",
+                          label=e['label'] if e['count'] == 1 else f"{e['label']} (×{e['count']})")
+                     for e in view_edges]
 
             config = Config(width=900, height=650, directed=True, nodeHighlightBehavior=True, highlightColor="#F7A7A6")
             if nodes:
                 agraph(nodes=nodes, edges=edges, config=config)
+
+# --- TRACE ---
+trace_panel()
@@ -1,78 +1,45 @@
 import streamlit as st
-from supabase import create_client, Client
 import datetime
 import time
-import os
+from daylight.futures import (GRACE_DAYS, PAGE_SIZE, STARTING_SCORE, fetch_open_positions, invalidate_positions,
+                              place_prediction, resolve_prediction, resolve_predictions)
+from daylight.repository import get_repository
+from daylight.tracing import begin_rerun, trace_panel
 
 st.set_page_config(page_title="Daylight: Futures Desk", page_icon="🔮", layout="wide")
+begin_rerun("futures")
 
-# --- CREDENTIALS (Robust for Replit & Cloud) ---
-try:
-    supabase_url = st.secrets["SUPABASE_URL"]
-    supabase_key = st.secrets["SUPABASE_KEY"]
-except:
-    # Fallback for Replit environment variables
-    supabase_url = os.environ.get("SUPABASE_URL")
-    supabase_key = os.environ.get("SUPABASE_KEY")
+# --- CREDENTIALS ---
+repository = get_repository()
 
-if not supabase_url:
+if not repository:
     st.error("🚨 System Offline: Database Credentials Missing.")
     st.stop()
 
-supabase: Client = create_client(supabase_url, supabase_key)
-
 # --- HELPER FUNCTIONS ---
 def get_user_score(username):
     """Fetch user score or create if new."""
     try:
-        data = supabase.table("analyst_scores").select("score").eq("user_name", username).execute().data
-        if data:
-            return data[0]['score']
+        score = repository.analyst_score(username)
+        if score is not None:
+            return score
         else:
             # New user gets 1000 points
-            supabase.table("analyst_scores").insert({"user_name": username, "score": 1000}).execute()
-            return 1000
+            repository.open_account(username, STARTING_SCORE)
+            return STARTING_SCORE
     except Exception as e:
-        return 1000
+        return STARTING_SCORE
 
 def place_bet(username, claim, deadline, confidence, wager):
-    """Record the prediction and deduct points."""
-    current_score = get_user_score(username)
-    if wager > current_score:
+    """Record the prediction and deduct points (one atomic escrow call)."""
+    result = place_prediction(username, claim, deadline, confidence, wager)
+    if not result['ok']:
         return False, "Insufficient funds! You cannot bet what you do not have."
-
-    # 1. Deduct points immediately (Escrow)
-    new_score = current_score - wager
-    supabase.table("analyst_scores").update({"score": new_score}).eq("user_name", username).execute()
-
-    # 2. Record Prediction
-    data = {
-        "user_name": username,
-        "claim": claim,
-        "deadline": str(deadline),
-        "confidence": confidence,
-        "wager": wager,
-        "status": "Open"
-    }
-    supabase.table("predictions").insert(data).execute()
     return True, "Prediction Locked."
 
 def resolve_bet(pred_id, won: bool):
-    """Payout if correct, simply close if wrong."""
-    # Fetch prediction details
-    pred = supabase.table("predictions").select("*").eq("id", pred_id).execute().data[0]
-    user = pred['user_name']
-    wager = pred['wager']
-
-    if won:
-        # User gets wager back + profit (Simple 1:1 payout for MVP)
-        winnings = wager * 2
-        current = get_user_score(user)
-        supabase.table("analyst_scores").update({"score": current + winnings}).eq("user_name", user).execute()
-        supabase.table("predictions").update({"status": "Resolved", "outcome": "Correct"}).eq("id", pred_id).execute()
-    else:
-        # User already paid the wager, just mark as lost
-        supabase.table("predictions").update({"status": "Resolved", "outcome": "Incorrect"}).eq("id", pred_id).execute()
+    """Payout if correct, simply close if wrong. Already-resolved bets are left alone."""
+    return resolve_prediction(pred_id, won)['ok']
 
 # --- UI ---
 st.title("🔮 THE FUTURES DESK")
@@ -111,6 +78,7 @@ with tab1:
                 else:
                     success, msg = place_bet(username, claim, deadline, confidence, wager)
                     if success:
+                        invalidate_positions()
                         st.success(f"Bet Placed! {wager} points deducted.")
                         time.sleep(1)
                         st.rerun()
@@ -126,13 +94,35 @@ with tab1:
         """)
 
 with tab2:
+    # OVERDUE: past the deadline, judged together in one bulk resolution
+    overdue, _ = fetch_open_positions(overdue_before=datetime.date.today())
+    if overdue:
+        st.subheader(f"⏰ Overdue Verdicts ({len(overdue)}{'+' if len(overdue) == PAGE_SIZE else ''})")
+        st.caption(f"Unjudged predictions expire {GRACE_DAYS} days after their deadline.")
+        skip, correct, incorrect = "Skip", "✅ Correct", "❌ Incorrect"
+        with st.form("overdue_form"):
+            choices = {}
+            for p in overdue:
+                choices[p['id']] = st.radio(f"{p['user_name']}: {p['claim']} (due {p['deadline']}, {p['wager']} pts)",
+                                            [skip, correct, incorrect], horizontal=True, key=f"v_{p['id']}")
+            if st.form_submit_button("⚖️ Resolve judged predictions"):
+                # Only judged bets are sent; skipped ones stay open until judged or expired.
+                verdicts = {pid: choice == correct for pid, choice in choices.items() if choice != skip}
+                if not verdicts:
+                    st.warning("Mark at least one prediction ✅ or ❌.")
+                else:
+                    result = resolve_predictions(verdicts)
+                    invalidate_positions()
+                    st.success(f"Resolved {result['resolved']} predictions: {result['won']} correct, {result['paid_out']} pts paid out.")
+                    time.sleep(1)
+                    st.rerun()
+        st.divider()
+
     st.subheader("Active Positions")
 
-    # Active Bets
-    try:
-        active = supabase.table("predictions").select("*").eq("status", "Open").order("created_at", desc=True).execute().data
-    except:
-        active = []
+    # Active Bets, one page at a time (cursor stack: the last entry is the page shown)
+    cursors = st.session_state.setdefault("positions_cursors", [None])
+    active, next_cursor = fetch_open_positions(cursors[-1])
 
     if not active:
         st.info("No active predictions.")
@@ -152,19 +142,37 @@ with tab2:
                 with b1:
                     if st.button("✅", key=f"t_{p['id']}"):
                         resolve_bet(p['id'], True)
+                        invalidate_positions()
                         st.rerun()
                 with b2:
                     if st.button("❌", key=f"f_{p['id']}"):
                         resolve_bet(p['id'], False)
+                        invalidate_positions()
                         st.rerun()
 
+    if len(cursors) > 1 or next_cursor:
+        p1, p2, p3 = st.columns([1, 2, 1])
+        with p1:
+            if len(cursors) > 1 and st.button("◀ Newer", key="positions_newer"):
+                cursors.pop()
+                st.rerun()
+        with p2:
+            st.caption(f"Page {len(cursors)}")
+        with p3:
+            if next_cursor and st.button("Older ▶", key="positions_older"):
+                cursors.append(next_cursor)
+                st.rerun()
+
     st.divider()
     st.subheader("Resolved History")
     try:
-        history = supabase.table("predictions").select("*").eq("status", "Resolved").order("created_at", desc=True).limit(10).execute().data
+        history = repository.resolved_predictions(10)
     except:
         history = []
 
     for h in history:
         color = "green" if h['outcome'] == "Correct" else "red"
-        st.markdown(f":{color}[**{h['outcome']}**]: {h['user_name']} - {h['claim']}")
\ No newline at end of file
+        st.markdown(f":{color}[**{h['outcome']}**]: {h['user_name']} - {h['claim']}")
+
+# --- TRACE ---
+trace_panel()
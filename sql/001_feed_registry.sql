@@ -0,0 +1,27 @@
+-- Feed registry read by the ingestion worker (python -m daylight.ingest_worker).
+-- Scheduling state (next poll, observed publish rate, failures, HTTP validators)
+-- lives on the row so the worker can restart without losing its place.
+
+create table if not exists feed_registry (
+    id               bigint generated by default as identity primary key,
+    source           text        not null,
+    country          text        not null,
+    region           text        not null,
+    url              text        not null unique,
+    active           boolean     not null default true,
+    item_limit       integer     not null default 20,
+    poll_interval_s  integer     not null default 900,
+    next_poll_at     timestamptz not null default now(),
+    last_polled_at   timestamptz,
+    publish_rate     double precision not null default 0,  -- EWMA of new items per hour
+    failure_count    integer     not null default 0,
+    last_error       text,
+    etag             text,
+    last_modified    text,
+    created_at       timestamptz not null default now()
+);
+
+create index if not exists feed_registry_due_idx on feed_registry (next_poll_at) where active;
+
+-- The worker upserts on url; make sure the archive enforces it.
+create unique index if not exists news_archive_url_key on news_archive (url);
@@ -0,0 +1,7 @@
+-- Keyset pagination for the Vault (daylight.vault.fetch_vault_page):
+-- ORDER BY created_at DESC, id DESC with an optional region filter.
+
+create index if not exists news_archive_created_idx on news_archive (created_at desc, id desc);
+create index if not exists news_archive_region_created_idx on news_archive (region, created_at desc, id desc);
+
+create index if not exists investigations_status_idx on investigations (status, created_at desc);
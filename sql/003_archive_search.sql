@@ -0,0 +1,25 @@
+-- Ranked full-text search over the Vault for the Narrative Prism
+-- (daylight.vault.search_vault). The tsvector is a generated column, so every
+-- row the ingestion worker writes is indexed on insert.
+
+alter table news_archive add column if not exists fts tsvector
+    generated always as (
+        setweight(to_tsvector('english', coalesce(title, '')), 'A') ||
+        setweight(to_tsvector('english', coalesce(description, '')), 'B')
+    ) stored;
+
+create index if not exists news_archive_fts_idx on news_archive using gin (fts);
+
+-- websearch syntax: multi-term (AND), "quoted phrases", OR, and -exclusions.
+create or replace function search_archive(query text, max_results integer default 25, region_filter text default null)
+returns table (id bigint, created_at timestamptz, source text, country text, region text,
+               title text, url text, description text, rank real)
+language sql stable as $$
+    select a.id, a.created_at, a.source, a.country, a.region, a.title, a.url, a.description,
+           ts_rank_cd(a.fts, q, 32) as rank
+    from news_archive a, websearch_to_tsquery('english', query) q
+    where a.fts @@ q
+      and (region_filter is null or a.region = region_filter)
+    order by rank desc, a.created_at desc
+    limit max_results;
+$$;
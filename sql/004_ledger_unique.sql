@@ -0,0 +1,13 @@
+-- One ledger row per (case, type, content): lets daylight.ledger write a whole
+-- extraction as a single idempotent upsert (ON CONFLICT DO NOTHING).
+
+-- Drop duplicates left by earlier per-row inserts, keeping the oldest.
+delete from intel_ledger a
+using intel_ledger b
+where a.investigation_id = b.investigation_id
+  and a.type = b.type
+  and a.content = b.content
+  and a.id > b.id;
+
+alter table intel_ledger
+    add constraint intel_ledger_case_type_content_key unique (investigation_id, type, content);
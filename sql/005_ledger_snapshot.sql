@@ -0,0 +1,6 @@
+-- Case snapshots (daylight.cases): the full load reads a case's ledger
+-- ORDER BY created_at DESC, id DESC, and the freshness probe reads its row count
+-- and highest id. Both are served from these indexes.
+
+create index if not exists intel_ledger_case_created_idx on intel_ledger (investigation_id, created_at desc, id desc);
+create index if not exists intel_ledger_case_id_idx on intel_ledger (investigation_id, id desc);
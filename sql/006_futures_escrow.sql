@@ -0,0 +1,73 @@
+-- Points escrow for the Futures Desk (daylight.futures). Placing and resolving a
+-- prediction are each one transaction behind one RPC, so two tabs betting at once
+-- cannot both spend the same points, and a prediction cannot be paid out twice.
+
+-- One score row per analyst. Drop duplicates left by concurrent sign-ups, keeping one.
+delete from analyst_scores a
+using analyst_scores b
+where a.user_name = b.user_name
+  and a.ctid > b.ctid;
+
+create unique index if not exists analyst_scores_user_name_key on analyst_scores (user_name);
+
+-- Debits the wager and records the prediction. The conditional update locks the
+-- analyst's row, so concurrent bets are serialized and the balance never goes negative.
+-- Returns {"ok", "score", "prediction_id"}; ok is false (and nothing is written) when
+-- the balance is too low.
+create or replace function place_prediction(p_user text, p_claim text, p_deadline date, p_confidence integer,
+                                            p_wager integer, p_starting_score integer default 1000)
+returns jsonb
+language plpgsql as $$
+declare
+    v_score integer;
+    v_id bigint;
+begin
+    if p_wager is null or p_wager <= 0 then
+        raise exception 'wager must be positive';
+    end if;
+    insert into analyst_scores (user_name, score) values (p_user, p_starting_score)
+    on conflict (user_name) do nothing;
+
+    update analyst_scores set score = score - p_wager
+    where user_name = p_user and score >= p_wager
+    returning score into v_score;
+    if not found then
+        select score into v_score from analyst_scores where user_name = p_user;
+        return jsonb_build_object('ok', false, 'score', v_score, 'prediction_id', null);
+    end if;
+
+    insert into predictions (user_name, claim, deadline, confidence, wager, status)
+    values (p_user, p_claim, p_deadline, p_confidence, p_wager, 'Open')
+    returning id into v_id;
+    return jsonb_build_object('ok', true, 'score', v_score, 'prediction_id', v_id);
+end;
+$$;
+
+-- Closes an open prediction and, if it was correct, pays out twice the wager.
+-- Only the first call for a prediction changes anything; later or concurrent calls
+-- return {"ok": false}. Returns {"ok", "user_name", "payout", "score"}.
+create or replace function resolve_prediction(p_id bigint, p_won boolean)
+returns jsonb
+language plpgsql as $$
+declare
+    v_user text;
+    v_wager integer;
+    v_payout integer := 0;
+    v_score integer;
+begin
+    update predictions
+    set status = 'Resolved', outcome = case when p_won then 'Correct' else 'Incorrect' end
+    where id = p_id and status = 'Open'
+    returning user_name, wager into v_user, v_wager;
+    if not found then
+        return jsonb_build_object('ok', false, 'user_name', null, 'payout', 0, 'score', null);
+    end if;
+
+    if p_won then
+        v_payout := v_wager * 2;
+    end if;
+    update analyst_scores set score = score + v_payout where user_name = v_user
+    returning score into v_score;
+    return jsonb_build_object('ok', true, 'user_name', v_user, 'payout', v_payout, 'score', v_score);
+end;
+$$;
@@ -0,0 +1,59 @@
+-- Bulk resolution of Futures Desk predictions (daylight.futures,
+-- python -m daylight.resolution_job) and keyset pagination of open positions.
+
+-- Open predictions by deadline: the overdue queue and the expiry job.
+create index if not exists predictions_open_deadline_idx on predictions (deadline, id) where status = 'Open';
+-- Open predictions newest first: the Active Positions pages.
+create index if not exists predictions_open_created_idx on predictions (created_at desc, id desc) where status = 'Open';
+create index if not exists predictions_resolved_created_idx on predictions (created_at desc) where status = 'Resolved';
+
+-- Resolves many predictions in one statement: p_won[i] is the verdict for p_ids[i].
+-- Only predictions still Open change; winners are paid 2x their wager with one
+-- update per analyst. Returns {"resolved", "won", "paid_out", "analysts_paid"}.
+create or replace function resolve_predictions(p_ids bigint[], p_won boolean[])
+returns jsonb
+language sql as $$
+    with verdicts as (
+        select distinct on (id) id, won from unnest(p_ids, p_won) as v(id, won)
+    ), closed as (
+        update predictions p
+        set status = 'Resolved', outcome = case when v.won then 'Correct' else 'Incorrect' end
+        from verdicts v
+        where p.id = v.id and p.status = 'Open'
+        returning p.user_name, p.wager, v.won
+    ), payouts as (
+        select user_name, sum(wager * 2) as payout from closed where won group by user_name
+    ), paid as (
+        update analyst_scores s set score = s.score + payouts.payout
+        from payouts where s.user_name = payouts.user_name
+        returning s.user_name
+    )
+    select jsonb_build_object(
+        'resolved', (select count(*) from closed),
+        'won', (select count(*) from closed where won),
+        'paid_out', coalesce((select sum(payout) from payouts), 0),
+        'analysts_paid', (select count(*) from paid));
+$$;
+
+-- Closes up to p_limit predictions whose deadline passed more than p_grace_days
+-- before p_as_of without a verdict. They are resolved as 'Expired': the claim was
+-- not confirmed in time, so the escrowed wager is kept, as for a wrong call.
+-- Rows locked by a concurrent run are skipped. Returns {"expired"}.
+create or replace function resolve_expired_predictions(p_as_of date default current_date,
+                                                       p_grace_days integer default 7,
+                                                       p_limit integer default 1000)
+returns jsonb
+language sql as $$
+    with due as (
+        select id from predictions
+        where status = 'Open' and deadline < p_as_of - p_grace_days
+        order by deadline, id
+        limit p_limit
+        for update skip locked
+    ), closed as (
+        update predictions p set status = 'Resolved', outcome = 'Expired'
+        from due where p.id = due.id
+        returning p.id
+    )
+    select jsonb_build_object('expired', (select count(*) from closed));
+$$;
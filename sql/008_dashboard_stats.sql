@@ -0,0 +1,116 @@
+-- Command Center counters (daylight.dashboard): one RPC returns every number and
+-- list on the landing page. The counts come from a small counters table kept
+-- current by statement-level triggers, so they cost the same however large the
+-- tables grow.
+
+create table if not exists dashboard_counters (
+    name  text primary key,
+    value bigint not null default 0
+);
+
+-- Recounts everything from scratch; run once after install, or to repair drift.
+create or replace function refresh_dashboard_counters()
+returns void
+language sql as $$
+    insert into dashboard_counters (name, value) values
+        ('active_cases', (select count(*) from investigations where status = 'Active')),
+        ('signals',      (select count(*) from news_archive)),
+        ('evidence',     (select count(*) from evidence_locker))
+    on conflict (name) do update set value = excluded.value;
+$$;
+
+create or replace function bump_dashboard_counter(p_name text, p_delta bigint)
+returns void
+language sql as $$
+    update dashboard_counters set value = value + p_delta where name = p_name and p_delta <> 0;
+$$;
+
+-- news_archive / evidence_locker: one counter each, named by the trigger argument.
+create or replace function dashboard_count_rows()
+returns trigger
+language plpgsql as $$
+begin
+    if tg_op = 'INSERT' then
+        perform bump_dashboard_counter(tg_argv[0], (select count(*) from new_rows));
+    elsif tg_op = 'DELETE' then
+        perform bump_dashboard_counter(tg_argv[0], -(select count(*) from old_rows));
+    elsif tg_op = 'TRUNCATE' then
+        update dashboard_counters set value = 0 where name = tg_argv[0];
+    end if;
+    return null;
+end;
+$$;
+
+-- investigations: only Active cases are counted, so status changes move the counter too.
+create or replace function dashboard_count_cases()
+returns trigger
+language plpgsql as $$
+declare
+    v_delta bigint := 0;
+begin
+    if tg_op = 'TRUNCATE' then
+        update dashboard_counters set value = 0 where name = 'active_cases';
+        return null;
+    end if;
+    if tg_op in ('INSERT', 'UPDATE') then
+        v_delta := v_delta + (select count(*) from new_rows where status = 'Active');
+    end if;
+    if tg_op in ('DELETE', 'UPDATE') then
+        v_delta := v_delta - (select count(*) from old_rows where status = 'Active');
+    end if;
+    perform bump_dashboard_counter('active_cases', v_delta);
+    return null;
+end;
+$$;
+
+drop trigger if exists news_archive_count_ins on news_archive;
+drop trigger if exists news_archive_count_del on news_archive;
+drop trigger if exists news_archive_count_trunc on news_archive;
+create trigger news_archive_count_ins after insert on news_archive
+    referencing new table as new_rows for each statement execute function dashboard_count_rows('signals');
+create trigger news_archive_count_del after delete on news_archive
+    referencing old table as old_rows for each statement execute function dashboard_count_rows('signals');
+create trigger news_archive_count_trunc after truncate on news_archive
+    for each statement execute function dashboard_count_rows('signals');
+
+drop trigger if exists evidence_locker_count_ins on evidence_locker;
+drop trigger if exists evidence_locker_count_del on evidence_locker;
+drop trigger if exists evidence_locker_count_trunc on evidence_locker;
+create trigger evidence_locker_count_ins after insert on evidence_locker
+    referencing new table as new_rows for each statement execute function dashboard_count_rows('evidence');
+create trigger evidence_locker_count_del after delete on evidence_locker
+    referencing old table as old_rows for each statement execute function dashboard_count_rows('evidence');
+create trigger evidence_locker_count_trunc after truncate on evidence_locker
+    for each statement execute function dashboard_count_rows('evidence');
+
+drop trigger if exists investigations_count_ins on investigations;
+drop trigger if exists investigations_count_upd on investigations;
+drop trigger if exists investigations_count_del on investigations;
+drop trigger if exists investigations_count_trunc on investigations;
+create trigger investigations_count_ins after insert on investigations
+    referencing new table as new_rows for each statement execute function dashboard_count_cases();
+create trigger investigations_count_upd after update on investigations
+    referencing old table as old_rows new table as new_rows for each statement execute function dashboard_count_cases();
+create trigger investigations_count_del after delete on investigations
+    referencing old table as old_rows for each statement execute function dashboard_count_cases();
+create trigger investigations_count_trunc after truncate on investigations
+    for each statement execute function dashboard_count_cases();
+
+select refresh_dashboard_counters();
+
+-- Everything the landing page shows, in one round trip: the three counters, the
+-- latest headlines and the newest active cases (investigations_status_idx, 002).
+create or replace function dashboard_stats(recent_limit integer default 3, case_limit integer default 24)
+returns jsonb
+language sql stable as $$
+    select jsonb_build_object(
+        'active_cases', coalesce((select value from dashboard_counters where name = 'active_cases'), 0),
+        'signals',      coalesce((select value from dashboard_counters where name = 'signals'), 0),
+        'evidence',     coalesce((select value from dashboard_counters where name = 'evidence'), 0),
+        'flash', coalesce((select jsonb_agg(n) from (
+            select source, title, created_at from news_archive
+            order by created_at desc, id desc limit recent_limit) n), '[]'::jsonb),
+        'cases', coalesce((select jsonb_agg(c) from (
+            select id, title, status from investigations
+            where status = 'Active' order by created_at desc limit case_limit) c), '[]'::jsonb));
+$$;
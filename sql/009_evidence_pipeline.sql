@@ -0,0 +1,69 @@
+-- Evidence pipeline (daylight.evidence, python -m daylight.evidence_worker).
+-- Files are stored once per content hash; each locker row records the file's
+-- media metadata and extracted text once the background worker has processed
+-- it, and all of it is full-text searchable.
+
+alter table evidence_locker
+    add column if not exists content_hash     text,
+    add column if not exists storage_key      text,
+    add column if not exists size_bytes       bigint,
+    add column if not exists mime_type        text,
+    -- Rows from before the pipeline have nothing to process, so they start 'ready'.
+    add column if not exists status           text not null default 'ready',
+    add column if not exists thumbnail_url    text,
+    add column if not exists metadata         jsonb not null default '{}'::jsonb,
+    add column if not exists extracted_text   text,
+    add column if not exists claimed_at       timestamptz,
+    add column if not exists processed_at     timestamptz,
+    add column if not exists processing_error text;
+
+-- One row (and one stored object) per distinct file.
+create unique index if not exists evidence_locker_content_hash_key on evidence_locker (content_hash);
+
+-- The worker's queue.
+create index if not exists evidence_locker_queue_idx on evidence_locker (created_at, id)
+    where status in ('pending', 'processing');
+
+alter table evidence_locker add column if not exists fts tsvector
+    generated always as (
+        setweight(to_tsvector('english', coalesce(filename, '') || ' ' || coalesce(description, '')), 'A') ||
+        setweight(jsonb_to_tsvector('english', metadata, '["string"]'), 'B') ||
+        setweight(to_tsvector('english', left(coalesce(extracted_text, ''), 200000)), 'C')
+    ) stored;
+
+create index if not exists evidence_locker_fts_idx on evidence_locker using gin (fts);
+
+-- Hands up to p_limit rows to one worker: pending rows, plus rows whose worker
+-- stopped more than p_stale_after ago. Rows claimed by a concurrent worker are
+-- skipped. Returns the claimed rows.
+create or replace function claim_evidence(p_limit integer default 10, p_stale_after interval default '15 minutes')
+returns setof evidence_locker
+language sql as $$
+    with due as (
+        select id from evidence_locker
+        where status = 'pending' or (status = 'processing' and claimed_at < now() - p_stale_after)
+        order by created_at, id
+        limit p_limit
+        for update skip locked
+    )
+    update evidence_locker e set status = 'processing', claimed_at = now()
+    from due where e.id = due.id
+    returning e.*;
+$$;
+
+-- websearch syntax over name, notes, metadata and extracted text. Returns the
+-- best matches with a `rank` and a short highlighted `snippet` of the text.
+drop function if exists search_evidence(text, integer);   -- `create or replace` cannot change its columns
+create or replace function search_evidence(query text, max_results integer default 20)
+returns table (id bigint, created_at timestamptz, filename text, file_url text, storage_key text, media_type text,
+               description text, mime_type text, size_bytes bigint, status text, thumbnail_url text,
+               metadata jsonb, rank real, snippet text)
+language sql stable as $$
+    select e.id, e.created_at, e.filename, e.file_url, e.storage_key, e.media_type, e.description, e.mime_type, e.size_bytes,
+           e.status, e.thumbnail_url, e.metadata, ts_rank_cd(e.fts, q, 32) as rank,
+           ts_headline('english', left(coalesce(e.extracted_text, ''), 20000), q, 'MaxFragments=1, MaxWords=30, MinWords=10')
+    from evidence_locker e, websearch_to_tsquery('english', query) q
+    where e.fts @@ q
+    order by rank desc, e.created_at desc
+    limit max_results;
+$$;